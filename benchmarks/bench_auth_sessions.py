@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+登入驗證效能測試：每個請求的驗證成本
+
+比較三種方式（皆為 require_permission 保護的 API，扣除未保護 API 的基準時間）：
+- 資料庫會話（不使用快取，每個請求查詢 user_sessions）
+- 資料庫會話 + 會話快取
+- 簽章令牌（AUTH_SESSION_MODE = 'token'）
+
+量測穩定狀態：會話快取的 ttl 與令牌撤銷資料的重新載入間隔都縮短為 reload 秒，
+每種方式各執行 duration 秒（涵蓋多次快取過期與重新載入），暖機後才開始計時。
+
+使用方式（於專案根目錄執行）：
+    python benchmarks/bench_auth_sessions.py [秒數] [會話數] [重新載入間隔秒數]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask, jsonify
+from src.models.user import db
+from src.models.auth_user import AuthUser, UserSession
+from src.routes.auth import auth_bp, require_permission
+from src.services.session_cache import session_cache
+from src.services.session_tokens import get_session_tokens
+from src.services.sqlite_tuning import init_sqlite
+
+
+def create_app(path, mode, reload_interval):
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'bench-secret'
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLITE_CHECKPOINT_INTERVAL'] = 0
+    app.config['AUTH_SESSION_MODE'] = mode
+    app.config['AUTH_TOKEN_REFRESH_INTERVAL'] = reload_interval
+    db.init_app(app)
+    init_sqlite(app, db)
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+
+    @app.route('/api/open')
+    def open_view():
+        return jsonify({'ok': True})
+
+    @app.route('/api/protected')
+    @require_permission('customer_management')
+    def protected_view():
+        return jsonify({'ok': True})
+
+    return app
+
+
+def setup(app, sessions):
+    """建立用戶與大量歷史會話（模擬持續成長的 user_sessions）"""
+    with app.app_context():
+        db.create_all()
+        user = AuthUser(username='sales', email='sales@example.com', full_name='業務', role='sales')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+        expires_at = datetime.utcnow() + timedelta(hours=24)
+        db.session.execute(UserSession.__table__.insert(), [
+            {'user_id': user.id, 'session_token': f'old-{i}', 'expires_at': expires_at, 'is_active': False}
+            for i in range(sessions)
+        ])
+        db.session.commit()
+
+
+def per_request(client, path, duration, before=None):
+    """持續請求 duration 秒，回傳 (平均每個請求的時間（微秒）, 請求數)"""
+    requests = 0
+    start = time.perf_counter()
+    while True:
+        if before:
+            before()
+        assert client.get(path).status_code == 200
+        requests += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= duration:
+            return elapsed / requests * 1e6, requests
+
+
+def run(mode, duration, sessions, reload_interval, use_cache=True):
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(os.path.join(directory, 'bench.db'), mode, reload_interval)
+        setup(app, sessions)
+        client = app.test_client()
+        response = client.post('/api/auth/login',
+                               data=json.dumps({'username': 'sales', 'password': 'password123'}),
+                               content_type='application/json')
+        assert response.status_code == 200
+        session_cache.clear()
+
+        # 計算量測期間查詢資料庫的次數：資料庫會話為快取未命中，簽章令牌為撤銷資料重新載入
+        reloads = [0]
+        manager = get_session_tokens(app)
+        refresh = manager.refresh
+
+        def counted_refresh():
+            reloads[0] += 1
+            refresh()
+        manager.refresh = counted_refresh
+
+        before = None if use_cache else session_cache.clear
+        # 暖機（至少一個重新載入週期）
+        per_request(client, '/api/protected', reload_interval, before)
+        baseline, _ = per_request(client, '/api/open', duration, before)
+        misses = session_cache.misses
+        reloads[0] = 0
+        protected, requests = per_request(client, '/api/protected', duration, before)
+        reloads = reloads[0] if mode == 'token' else session_cache.misses - misses
+
+        with app.app_context():
+            db.engine.dispose()
+        return protected, protected - baseline, requests, reloads
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    reload_interval = float(sys.argv[3]) if len(sys.argv) > 3 else 0.5
+
+    default_ttl = session_cache.ttl
+    session_cache.ttl = reload_interval
+    print(f'🔐 每種方式 {duration:g} 秒，user_sessions 共 {sessions} 筆，'
+          f'快取 ttl／撤銷資料重新載入間隔 {reload_interval:g} 秒')
+    print(f"{'方式':<20}{'每請求(µs)':>12}{'驗證成本(µs)':>14}{'請求數':>10}{'資料庫查詢':>12}")
+    try:
+        for label, mode, use_cache in (
+            ('資料庫會話', 'database', False),
+            ('資料庫會話+快取', 'database', True),
+            ('簽章令牌', 'token', True),
+        ):
+            total, overhead, requests, reloads = run(mode, duration, sessions, reload_interval, use_cache)
+            print(f'{label:<20}{total:>12.1f}{overhead:>14.1f}{requests:>10}{reloads:>12}')
+    finally:
+        session_cache.ttl = default_ttl
+
+
+if __name__ == '__main__':
+    main()
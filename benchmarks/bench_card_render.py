@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+名片頁渲染效能測試：每次請求建立 jinja2.Template vs 預先編譯的樣板
+
+使用方式（於專案根目錄執行）：
+    python benchmarks/bench_card_render.py [次數]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask, current_app, render_template
+from src.routes.card_display import card_display_bp
+
+CUSTOMER = {
+    'name': '鍾師富',
+    'position': '負責人',
+    'company': '詠順工程行',
+    'phone': '0986372099',
+    'email': 'service@example.com',
+    'website': 'https://example.com',
+    'facebook_url': 'https://facebook.com/example',
+    'google_map_url': None,
+    'address': '台中市西屯區'
+}
+
+
+RENDER_ARGS = {'customer': CUSTOMER, 'share_url': 'http://localhost/card/abc', 'card_id': 'abc', 'vcard': ''}
+
+
+def per_request_template(source):
+    """舊做法：每次請求重新解析與編譯樣板"""
+    return current_app.jinja_env.from_string(source).render(**RENDER_ARGS)
+
+
+def precompiled_template():
+    """新做法：使用應用程式樣板環境的編譯快取"""
+    return render_template('card_display/card.html', **RENDER_ARGS)
+
+
+def measure(func, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    app = Flask(__name__)
+    app.register_blueprint(card_display_bp)
+
+    with app.test_request_context():
+        source = app.jinja_env.loader.get_source(app.jinja_env, 'card_display/card.html')[0]
+        before = measure(lambda: per_request_template(source), rounds)
+        after = measure(precompiled_template, rounds)
+
+    print(f"{'方式':<16}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    print(f"{'每次建立 Template':<16}{before[0]:>10.3f}{before[1]:>10.3f}")
+    print(f"{'預先編譯樣板':<16}{after[0]:>10.3f}{after[1]:>10.3f}")
+    print(f'⚡ p50 加速 {before[0] / after[0]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+客戶匯出效能測試
+
+建立大量客戶後，比較「Customer.query.all() 再組成整份 CSV」與串流匯出端點
+（yield_per 分批讀取，CSV / NDJSON / vCard，可選 gzip）的時間、首位元組時間與記憶體用量。
+記憶體以 tracemalloc 量測 Python 物件的峰值（另跑一次，不計入時間）。
+
+使用方式（於專案根目錄執行）：
+    python benchmarks/bench_customer_export.py [客戶數]
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask
+from src.models.user import db
+from src.models.auth_user import AuthUser
+from src.models.customer import Customer
+from src.routes.auth import auth_bp
+from src.routes.customer import customer_bp
+from src.services.passwords import PasswordHasher, set_password_hasher
+from src.services.sqlite_tuning import init_sqlite
+
+
+def create_app(path, count):
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'bench-secret'
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLITE_CHECKPOINT_INTERVAL'] = 0
+    db.init_app(app)
+    init_sqlite(app, db)
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(customer_bp, url_prefix='/api')
+
+    with app.app_context():
+        db.create_all()
+        user = AuthUser(username='admin', email='admin@example.com', full_name='管理員', role='admin')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+
+        now = datetime.utcnow()
+        table = Customer.__table__
+        for start in range(0, count, 10000):
+            db.session.execute(table.insert(), [{
+                'name': f'客戶{i}', 'phone': f'09{i:08d}', 'email': f'user{i}@example.com',
+                'company': f'測試公司{i % 500}', 'position': '經理', 'address': f'台北市信義區測試路{i}號',
+                'website': 'https://example.com', 'notes': '定期聯絡，偏好 LINE 訊息',
+                'contract_end_date': date(2026, i % 12 + 1, 1), 'created_at': now, 'updated_at': now
+            } for i in range(start, min(start + 10000, count))])
+        db.session.commit()
+    return app
+
+
+def login(app):
+    client = app.test_client()
+    response = client.post('/api/auth/login', data=json.dumps({'username': 'admin', 'password': 'password123'}),
+                           content_type='application/json')
+    assert response.status_code == 200
+    return client
+
+
+def naive_export(app):
+    """一次載入所有客戶再組成整份 CSV"""
+    with app.app_context():
+        customers = Customer.query.order_by(Customer.id).all()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for customer in customers:
+            writer.writerow(customer.to_dict().values())
+        data = buffer.getvalue().encode('utf-8')
+        db.session.remove()
+    return len(data)
+
+
+def streaming_export(client, file_format, compress):
+    headers = {'Accept-Encoding': 'gzip'} if compress else {}
+    start = time.perf_counter()
+    response = client.get(f'/api/customers/export?format={file_format}', headers=headers, buffered=False)
+    assert response.status_code == 200, response.data
+    first_byte = None
+    size = 0
+    for chunk in response.response:
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        size += len(chunk)
+    response.close()
+    return size, first_byte
+
+
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    set_password_hasher(PasswordHasher(method='scrypt', max_workers=0))
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        app = create_app(os.path.join(directory, 'bench.db'), count)
+        print(f'📇 建立 {count:,} 位客戶：{time.perf_counter() - start:.1f}s')
+        client = login(app)
+
+        print(f"\n{'方式':<24}{'大小':>10}{'時間':>9}{'首位元組':>10}{'筆/秒':>12}{'Python 峰值':>14}")
+        size, elapsed, peak = measure(naive_export, app)
+        print(f"{'query.all() + CSV':<24}{size / 1024 / 1024:>8.1f}MB{elapsed:>8.2f}s{'-':>10}"
+              f'{count / elapsed:>12,.0f}{peak / 1024 / 1024:>12.1f}MB')
+
+        for file_format in ('csv', 'ndjson', 'vcf'):
+            for compress in (False, True):
+                (size, first_byte), elapsed, peak = measure(streaming_export, client, file_format, compress)
+                label = f"串流 {file_format}{' + gzip' if compress else ''}"
+                print(f'{label:<24}{size / 1024 / 1024:>8.1f}MB{elapsed:>8.2f}s{first_byte * 1000:>8.0f}ms'
+                      f'{count / elapsed:>12,.0f}{peak / 1024 / 1024:>12.1f}MB')
+
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+客戶批次匯入效能測試
+
+比較逐筆呼叫 POST /api/customers（每筆各自提交）與 POST /api/customers/bulk
+（串流解析、分批 executemany）的吞吐量，並以不同大小的檔案觀察記憶體用量是否固定。
+記憶體以 tracemalloc 量測 Python 物件的峰值；行程 RSS 另含 SQLite 頁面快取與 mmap，會隨資料庫變大而增加。
+
+使用方式（於專案根目錄執行）：
+    python benchmarks/bench_customer_import.py [最大筆數]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask
+from src.models.user import db
+from src.models.auth_user import AuthUser
+from src.models.customer import Customer
+from src.routes.auth import auth_bp
+from src.routes.customer import customer_bp
+from src.services.sqlite_tuning import init_sqlite
+
+
+def create_app(path):
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'bench-secret'
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLITE_CHECKPOINT_INTERVAL'] = 0
+    db.init_app(app)
+    init_sqlite(app, db)
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(customer_bp, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+        user = AuthUser(username='sales', email='sales@example.com', full_name='業務', role='sales')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+    return app
+
+
+def login(app):
+    """批次匯入需要客戶管理權限"""
+    client = app.test_client()
+    response = client.post('/api/auth/login',
+                           data=json.dumps({'username': 'sales', 'password': 'password123'}),
+                           content_type='application/json')
+    assert response.status_code == 200
+    return client
+
+
+def write_csv(path, count):
+    """逐列寫出測試檔案，約 5% 的資料列日期格式錯誤"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write('姓名,電話,Email,公司,地址,合約到期日\n')
+        for i in range(count):
+            end_date = 'not-a-date' if i % 20 == 0 else f'2026/{i % 12 + 1:02d}/{i % 28 + 1:02d}'
+            f.write(f'客戶{i},09{i:08d},user{i}@example.com,測試公司{i % 500},台北市信義區測試路{i}號,{end_date}\n')
+
+
+def bench_single(app, count):
+    client = app.test_client()
+    start = time.perf_counter()
+    for i in range(count):
+        client.post('/api/customers', data=json.dumps({
+            'name': f'客戶{i}', 'phone': f'09{i:08d}', 'email': f'user{i}@example.com',
+            'company': f'測試公司{i % 500}', 'contract_end_date': '2026-01-01'
+        }), content_type='application/json')
+    return time.perf_counter() - start
+
+
+def bench_bulk(app, path, trace=False):
+    client = login(app)
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        response = client.post('/api/customers/bulk', input_stream=f, content_type='text/csv',
+                               content_length=os.path.getsize(path))
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    assert response.status_code == 200, response.data
+    return elapsed, peak, json.loads(response.data)
+
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    sizes = sorted({min(largest, n) for n in (10000, 50000, largest)})
+
+    with tempfile.TemporaryDirectory() as directory:
+        single_count = 2000
+        app = create_app(os.path.join(directory, 'single.db'))
+        elapsed = bench_single(app, single_count)
+        with app.app_context():
+            db.engine.dispose()
+        print(f'🐢 逐筆 POST /api/customers：{single_count} 筆 {elapsed:.2f}s，{single_count / elapsed:,.0f} 筆/秒')
+
+        print(f"\n{'筆數':>10}{'檔案':>10}{'時間':>9}{'筆/秒':>12}{'寫入':>10}{'錯誤':>8}{'Python 峰值':>14}")
+        for count in sizes:
+            csv_path = os.path.join(directory, f'customers_{count}.csv')
+            write_csv(csv_path, count)
+            app = create_app(os.path.join(directory, f'bulk_{count}.db'))
+            elapsed, _, result = bench_bulk(app, csv_path)
+            with app.app_context():
+                assert Customer.query.count() == result['inserted']
+                db.engine.dispose()
+            # 另以 tracemalloc 重跑一次量測記憶體（追蹤會拖慢速度，不計入吞吐量）
+            app = create_app(os.path.join(directory, f'traced_{count}.db'))
+            _, peak, _ = bench_bulk(app, csv_path, trace=True)
+            with app.app_context():
+                db.engine.dispose()
+            size_mb = os.path.getsize(csv_path) / 1024 / 1024
+            print(f'{count:>10,}{size_mb:>8.1f}MB{elapsed:>8.2f}s{count / elapsed:>12,.0f}'
+                  f"{result['inserted']:>10,}{result['failed']:>8,}{peak / 1024 / 1024:>12.1f}MB")
+            os.remove(csv_path)
+
+
+if __name__ == '__main__':
+    main()
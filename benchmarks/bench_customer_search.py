@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+客戶搜尋效能測試：LIKE 全表掃描 vs FTS5 全文索引
+
+使用方式（於專案根目錄執行）：
+    python benchmarks/bench_customer_search.py [筆數]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask
+from sqlalchemy import insert
+from src.models.user import db
+from src.models.customer import Customer
+from src.services.customer_search import search_customer_ids
+
+SURNAMES = '陳林黃張李王吳劉蔡楊許鄭謝郭洪曾邱廖賴徐'
+GIVEN = '家豪志明俊傑建宏雅婷怡君淑芬美玲詠順師富大華小明'
+INDUSTRIES = ['工程行', '科技有限公司', '貿易股份有限公司', '設計工作室', '餐飲企業社', '建設公司']
+CITIES = ['台北市', '新北市', '桃園市', '台中市', '台南市', '高雄市']
+QUERIES = ['詠順工程行', '科技有限', '0912', '台中市', 'example']
+
+
+def random_customer(i):
+    name = random.choice(SURNAMES) + ''.join(random.sample(GIVEN, 2))
+    return {
+        'name': name,
+        'company': random.choice(GIVEN[::2]) + random.choice(GIVEN[1::2]) + random.choice(INDUSTRIES),
+        'phone': f'09{random.randint(0, 99999999):08d}',
+        'email': f'user{i}@example.com',
+        'address': random.choice(CITIES) + f'中正路{random.randint(1, 500)}號',
+        'notes': None
+    }
+
+
+def like_search(query, limit=None):
+    return [c.id for c in Customer.query.filter(
+        Customer.name.contains(query) |
+        Customer.company.contains(query) |
+        Customer.phone.contains(query) |
+        Customer.email.contains(query) |
+        Customer.address.contains(query) |
+        Customer.notes.contains(query)
+    ).limit(limit)]
+
+
+def fts_search(query, limit=None):
+    return search_customer_ids(db.session, Customer.__table__, query, limit=limit)
+
+
+def measure(func, query, limit=None, rounds=5):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(query, limit)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        db.init_app(app)
+
+        with app.app_context():
+            db.create_all()
+            print(f'📥 建立 {count} 筆客戶資料...')
+            for offset in range(0, count, 5000):
+                rows = [random_customer(i) for i in range(offset, min(offset + 5000, count))]
+                db.session.execute(insert(Customer), rows)
+            db.session.commit()
+
+            # LIKE 取前50筆遇到常見詞可以提早結束，FTS5 則需先依相關度排序全部結果
+            for limit in (None, 50):
+                print(f"\n🔍 {'全部結果' if limit is None else f'前 {limit} 筆'}")
+                print(f"{'查詢':<12}{'符合':>8}{'LIKE (ms)':>12}{'FTS5 (ms)':>12}{'加速':>8}")
+                for query in QUERIES:
+                    matches = len(like_search(query))
+                    like_ms = measure(like_search, query, limit)
+                    fts_ms = measure(fts_search, query, limit)
+                    print(f'{query:<12}{matches:>8}{like_ms:>12.2f}{fts_ms:>12.2f}{like_ms / fts_ms:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
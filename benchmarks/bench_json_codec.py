@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+JSON 序列化效能測試：標準函式庫 json vs json_codec（orjson）
+
+使用方式（於專案根目錄執行）：
+    python benchmarks/bench_json_codec.py [名片數]
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask, jsonify
+from src.services import json_codec
+from src.services.flex_builder import build_business_card_flex_message
+
+CUSTOMER = {
+    'name': '鍾師富',
+    'position': '負責人',
+    'company': '詠順工程行',
+    'phone': '0986372099',
+    'website': 'https://example.com',
+    'facebook_url': 'https://facebook.com/example',
+    'google_map_url': 'https://maps.google.com/?q=台中市西屯區'
+}
+
+
+def best_of(func, rounds=5):
+    """重複執行取最快的一次（秒）"""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    card = build_business_card_flex_message(CUSTOMER)
+    card_text = json.dumps(card, ensure_ascii=False)
+    loops = 10000
+
+    print(f'🧩 JSON 後端：{json_codec.BACKEND}')
+    print(f"{'項目':<28}{'json':>10}{'json_codec':>12}{'倍數':>8}")
+
+    def row(label, old, new, unit):
+        print(f'{label:<28}{old:>10.2f}{new:>12.2f}{old / new:>7.1f}x  {unit}')
+
+    old = best_of(lambda: [json.dumps(card, ensure_ascii=False) for _ in range(loops)]) / loops * 1e6
+    new = best_of(lambda: [json_codec.dumps(card) for _ in range(loops)]) / loops * 1e6
+    row('名片序列化', old, new, 'µs/張')
+
+    old = best_of(lambda: [json.loads(card_text) for _ in range(loops)]) / loops * 1e6
+    new = best_of(lambda: [json_codec.loads(card_text) for _ in range(loops)]) / loops * 1e6
+    row('名片解析', old, new, 'µs/張')
+
+    # 名片列表：每張名片解析 card_data，再由 Flask 產生 JSON 回應
+    # 與 PublishedCard.to_dict() 相同的欄位
+    now = datetime.now()
+    rows = [
+        {'id': i, 'customer_id': i, 'card_id': f'card{i:05d}', 'title': f'名片{i}', 'card_data': card_text,
+         'share_url': f'http://localhost/card/card{i:05d}', 'view_count': i, 'is_active': True,
+         'created_at': now, 'updated_at': now}
+        for i in range(count)
+    ]
+    default_app = Flask('default')
+    codec_app = Flask('codec')
+    json_codec.init_app(codec_app)
+
+    def listing(app, parse):
+        with app.app_context():
+            payload = []
+            for row_data in rows:
+                data = dict(row_data)
+                data['card_data'] = parse(row_data['card_data'])
+                data['created_at'] = row_data['created_at'].isoformat()
+                data['updated_at'] = row_data['updated_at'].isoformat()
+                payload.append(data)
+            return jsonify({'cards': payload}).get_data()
+
+    old = best_of(lambda: listing(default_app, json.loads)) * 1000
+    new = best_of(lambda: listing(codec_app, json_codec.loads)) * 1000
+    row(f'{count} 張名片列表', old, new, 'ms/次')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+LINE 批量推播效能測試：逐一發送 vs 並行限速發送 vs multicast（本機模擬 LINE 伺服器）
+
+使用方式（於專案根目錄執行）：
+    python benchmarks/bench_line_push.py [收件人數] [模擬延遲毫秒]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask
+from src.services.line_service import LineService
+from src.services.line_http import LineHTTPClient
+from src.services.line_push import PushSender
+from tests.line_mock_server import MockLineServer
+
+MESSAGES = [{'type': 'text', 'text': '電子名片'}]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+
+    with MockLineServer(latency=latency) as server:
+        app = Flask(__name__)
+        app.config['LINE_CHANNEL_ACCESS_TOKEN'] = 'bench-token'
+        app.config['LINE_API_BASE_URL'] = server.base_url
+
+        with app.app_context():
+            line_service = LineService()
+            jobs = [{'key': i, 'to': f'U{i:06d}', 'messages': MESSAGES} for i in range(count)]
+
+            start = time.perf_counter()
+            for job in jobs:
+                line_service.send_push_message(job['to'], job['messages'])
+            sequential = time.perf_counter() - start
+            pooled_stats = line_service.http.stats()
+
+            print(f'📤 {count} 位收件人，模擬延遲 {latency * 1000:.0f} ms')
+            print(f"{'方式':<20}{'秒數':>8}{'每秒訊息':>10}")
+            print(f"{'逐一發送':<20}{sequential:>8.2f}{count / sequential:>10.0f}")
+
+            # 對照：每個請求都建立新連線（不共用連線池）
+            pooled = line_service.http
+            start = time.perf_counter()
+            for job in jobs:
+                line_service.http = LineHTTPClient()
+                line_service.send_push_message(job['to'], job['messages'])
+                line_service.http.close()
+            unpooled = time.perf_counter() - start
+            line_service.http = pooled
+            print(f"{'逐一發送（不重用連線）':<20}{unpooled:>8.2f}{count / unpooled:>10.0f}")
+
+            for workers in (4, 16, 32):
+                sender = PushSender(line_service, max_workers=workers, use_multicast=False)
+                start = time.perf_counter()
+                results = sender.send(jobs)
+                elapsed = time.perf_counter() - start
+                assert all(result['success'] for result in results)
+                print(f"{f'並行 {workers} 執行緒':<20}{elapsed:>8.2f}{count / elapsed:>10.0f}")
+
+            # 相同內容：合併為每 500 人一次的 multicast
+            sender = PushSender(line_service)
+            before = len(server.requests)
+            start = time.perf_counter()
+            results = sender.send(jobs)
+            elapsed = time.perf_counter() - start
+            assert all(result['success'] for result in results)
+            print(f"{'multicast':<20}{elapsed:>8.2f}{count / elapsed:>10.0f}"
+                  f"  （{len(server.requests) - before} 次請求）")
+
+            stats = line_service.http.stats()
+            print(f"🔌 逐一發送：{pooled_stats['requests']} 次請求使用 {pooled_stats['connections']} 條連線；"
+                  f"全部：{stats['requests']} 次請求、{stats['connections']} 條連線、重用 {stats['reused']} 次")
+
+
+if __name__ == '__main__':
+    main()
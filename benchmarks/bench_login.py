@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+登入效能測試：併發登入時的延遲分布
+
+比較在請求執行緒中直接雜湊與使用有上限的雜湊執行緒池（passwords.PasswordHasher）；
+同時以另一個執行緒持續呼叫輕量 API，觀察大量登入是否拖慢其他請求。
+
+使用方式（於專案根目錄執行）：
+    python benchmarks/bench_login.py [併發數] [每執行緒登入次數]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask, jsonify
+from src.models.user import db
+from src.models.auth_user import AuthUser
+from src.routes.auth import auth_bp
+from src.services import passwords
+from src.services.passwords import PasswordHasher
+from src.services.sqlite_tuning import init_sqlite
+
+
+def create_app(path, users):
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'bench-secret'
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLITE_CHECKPOINT_INTERVAL'] = 0
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_size': users + 4}
+    db.init_app(app)
+    init_sqlite(app, db)
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+
+    @app.route('/api/health')
+    def health():
+        return jsonify({'status': 'ok'})
+
+    with app.app_context():
+        db.create_all()
+        for i in range(users):
+            user = AuthUser(username=f'user{i}', email=f'user{i}@example.com', full_name=f'用戶{i}', role='sales')
+            user.set_password('password123')
+            db.session.add(user)
+        db.session.commit()
+    return app
+
+
+def percentile(values, p):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(app, concurrency, rounds):
+    login_times = []
+    health_times = []
+    busy = [0]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def login_worker(i):
+        client = app.test_client()
+        body = json.dumps({'username': f'user{i}', 'password': 'password123'})
+        for _ in range(rounds):
+            start = time.perf_counter()
+            response = client.post('/api/auth/login', data=body, content_type='application/json')
+            elapsed = time.perf_counter() - start
+            with lock:
+                if response.status_code == 503:
+                    busy[0] += 1
+                else:
+                    assert response.status_code == 200, response.data
+                    login_times.append(elapsed)
+
+    def health_worker():
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get('/api/health')
+            health_times.append(time.perf_counter() - start)
+            time.sleep(0.005)
+
+    probe = threading.Thread(target=health_worker)
+    probe.start()
+    threads = [threading.Thread(target=login_worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    probe.join()
+    return login_times, busy[0], health_times, elapsed
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    workers = min(4, os.cpu_count() or 1)
+
+    print(f'🔑 {concurrency} 個併發登入 × {rounds} 次，scrypt N=32768，CPU {os.cpu_count()} 核')
+    print(f"{'方式':<18}{'登入 p50':>10}{'登入 p99':>10}{'503':>6}{'健康檢查 p50':>14}{'健康檢查 p99':>14}{'總時間':>8}")
+
+    for label, hasher in (
+        ('請求執行緒雜湊', PasswordHasher(method='scrypt', max_workers=0)),
+        (f'執行緒池({workers})', PasswordHasher(method='scrypt', max_workers=workers, max_pending=workers * 8)),
+    ):
+        previous = passwords.set_password_hasher(hasher)
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                app = create_app(os.path.join(directory, 'bench.db'), concurrency)
+                login_times, busy, health_times, elapsed = run(app, concurrency, rounds)
+                with app.app_context():
+                    db.engine.dispose()
+        finally:
+            passwords.set_password_hasher(previous)
+            hasher.shutdown()
+        print(f'{label:<18}{percentile(login_times, 50) * 1000:>8.0f}ms{percentile(login_times, 99) * 1000:>8.0f}ms'
+              f'{busy:>6}{percentile(health_times, 50) * 1000:>12.1f}ms{percentile(health_times, 99) * 1000:>12.1f}ms'
+              f'{elapsed:>7.1f}s')
+
+
+if __name__ == '__main__':
+    main()
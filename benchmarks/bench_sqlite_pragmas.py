@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+SQLite 並行讀寫效能測試：預設設定 vs WAL 連線設定（sqlite_tuning）
+
+模擬公開名片頁（讀取名片並累加瀏覽次數）與後台編輯（更新客戶資料）同時進行。
+
+使用方式（於專案根目錄執行）：
+    python benchmarks/bench_sqlite_pragmas.py [秒數] [讀取執行緒數] [寫入執行緒數]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from src.services.sqlite_tuning import DEFAULT_PRAGMAS, install_pragmas
+
+CARDS = 1000
+
+
+def setup(engine):
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE cards (id INTEGER PRIMARY KEY, card_id TEXT UNIQUE, '
+                          'title TEXT, card_data TEXT, view_count INTEGER DEFAULT 0)'))
+        conn.execute(text('INSERT INTO cards (card_id, title, card_data) VALUES (:card_id, :title, :data)'),
+                     [{'card_id': f'card{i}', 'title': f'名片{i}', 'data': '{"type":"flex"}' * 20}
+                      for i in range(CARDS)])
+
+
+def run(engine, duration, readers, writers):
+    counts = {'read': 0, 'write': 0, 'locked': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def add(name):
+        with lock:
+            counts[name] += 1
+
+    def reader(seed):
+        i = seed
+        while time.monotonic() < deadline:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text('SELECT * FROM cards WHERE card_id = :card_id'),
+                                 {'card_id': f'card{i % CARDS}'}).fetchone()
+                add('read')
+            except OperationalError:
+                add('locked')
+            i += 7
+
+    def writer(seed):
+        i = seed
+        while time.monotonic() < deadline:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text('UPDATE cards SET view_count = view_count + 1 WHERE card_id = :card_id'),
+                                 {'card_id': f'card{i % CARDS}'})
+                add('write')
+            except OperationalError:
+                add('locked')
+            i += 13
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    print(f'🗄️ {duration:.0f} 秒，讀取 {readers} 執行緒、寫入 {writers} 執行緒')
+    print(f"{'設定':<16}{'讀取/秒':>10}{'寫入/秒':>10}{'鎖定錯誤':>10}")
+
+    for label, pragmas in (('預設', None), ('WAL 設定', DEFAULT_PRAGMAS)):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f'sqlite:///{os.path.join(directory, "bench.db")}',
+                                   pool_size=readers + writers, connect_args={'timeout': 1})
+            if pragmas:
+                install_pragmas(engine, dict(pragmas, busy_timeout=1000))
+            setup(engine)
+            counts = run(engine, duration, readers, writers)
+            engine.dispose()
+        print(f"{label:<16}{counts['read'] / duration:>10.0f}{counts['write'] / duration:>10.0f}{counts['locked']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+LINE電子名片管理系統 - 批量發送 worker
+從資料庫佇列領取批量發送工作並發送，可同時啟動多個程序。
+網站（POST /api/line/send-jobs）只負責建立工作，必須另外啟動 worker 才會實際發送；
+單一程序部署可設定 LINE_SEND_WORKERS，由網站程序在背景執行緒中一併處理。
+
+使用方式（於專案根目錄執行）：
+    python -m src.line_worker [worker數]
+"""
+
+import atexit
+import os
+import sys
+import threading
+from flask import Flask
+
+from src.models.user import db
+from src.models.send_job import SendJob, SendTask  # noqa: F401 註冊工作佇列資料表
+from src.services.line_service import LineService
+from src.services.send_queue import SendJobWorker
+from src.services.database import configure_database, init_database
+from src.services.migrations import run_migrations
+
+
+def create_worker_app():
+    """建立 worker 使用的應用程式（與 main_fixed 共用同一個資料庫）"""
+    app = Flask(__name__)
+    configure_database(app, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'app_fixed.db'))
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['LINE_CHANNEL_ACCESS_TOKEN'] = os.getenv('LINE_CHANNEL_ACCESS_TOKEN', '')
+    app.config['LINE_CHANNEL_SECRET'] = os.getenv('LINE_CHANNEL_SECRET', '')
+    if os.getenv('LINE_API_BASE_URL'):
+        app.config['LINE_API_BASE_URL'] = os.getenv('LINE_API_BASE_URL')
+    db.init_app(app)
+    init_database(app, db)
+
+    with app.app_context():
+        run_migrations(db)
+    return app
+
+
+def run_worker(app, stop_event=None):
+    """在應用程式 context 中持續處理工作"""
+    with app.app_context():
+        SendJobWorker(app, LineService).run_forever(stop_event=stop_event)
+
+
+def start_workers(app, count, stop_event=None):
+    """以背景執行緒啟動 count 個 worker，程序結束時停止；回傳執行緒列表"""
+    stop_event = stop_event or threading.Event()
+    threads = [
+        threading.Thread(target=run_worker, args=(app, stop_event), name=f'line-worker-{i}', daemon=True)
+        for i in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    atexit.register(stop_event.set)
+    return threads
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    app = create_worker_app()
+    print(f'📮 啟動 {count} 個批量發送 worker')
+
+    threads = start_workers(app, count)
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        print('👋 worker 已停止')
+
+
+if __name__ == '__main__':
+    main()
@@ -7,28 +7,62 @@ LINE電子名片管理系統 - 簡化版主程式
 import os
 import sys
 import time
-import hashlib
 import secrets
 from datetime import datetime, timedelta
 from flask import Flask, jsonify, send_from_directory, request, session
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 
+try:
+    from src.services.pagination import (
+        model_columns, is_paginated, parse_limit, parse_fields,
+        keyset_paginate, row_to_dict, get_count_cache
+    )
+    from src.services.customer_search import (
+        register_customer_fts, ensure_customer_fts, fts_available,
+        fts_match_clause, fts_id_subquery
+    )
+    from src.services.view_counter import ViewCounter
+    from src.services import json_codec
+    from src.services.migrations import run_migrations
+    from src.services.database import configure_database, init_database
+    from src.services import permissions
+    from src.services.permissions import load_permission_table
+    from src.services.passwords import get_password_hasher
+except ImportError:  # 以 python src/main.py 直接執行時
+    from services.pagination import (
+        model_columns, is_paginated, parse_limit, parse_fields,
+        keyset_paginate, row_to_dict, get_count_cache
+    )
+    from services.customer_search import (
+        register_customer_fts, ensure_customer_fts, fts_available,
+        fts_match_clause, fts_id_subquery
+    )
+    from services.view_counter import ViewCounter
+    from services import json_codec
+    from services.migrations import run_migrations
+    from services.database import configure_database, init_database
+    from services import permissions
+    from services.permissions import load_permission_table
+    from services.passwords import get_password_hasher
+
 # 建立Flask應用
 app = Flask(__name__, static_folder='static', static_url_path='')
-CORS(app)
+CORS(app, expose_headers=['X-Total-Count', 'X-Next-Cursor'])
+json_codec.init_app(app)
 
 # 基本設定
 app.config['SECRET_KEY'] = 'line-card-manager-secret-key'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['PERMISSIONS_FILE'] = os.getenv('PERMISSIONS_FILE')
 
-# 資料庫設定
+# 資料庫設定（DATABASE_URL 未設定時使用 src/database/app.db）
 db_path = os.path.join(os.path.dirname(__file__), 'database', 'app.db')
-os.makedirs(os.path.dirname(db_path), exist_ok=True)
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+configure_database(app, db_path)
 
-# 初始化資料庫
+# 初始化資料庫（PostgreSQL 使用連線池；SQLite 使用 WAL 等連線設定，讀寫可同時進行）
 db = SQLAlchemy(app)
+init_database(app, db)
 
 # 簡化的客戶資料模型
 class Customer(db.Model):
@@ -63,6 +97,14 @@ class Customer(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+register_customer_fts(Customer.__table__, ('name', 'company', 'phone', 'email', 'address'))
+
+# 角色權限（啟動時編譯一次；未知角色視為業務員）
+# 權限名稱與藍圖版不同，PERMISSIONS_FILE 未設定時使用單體版的 config/permissions_monolith.json
+MONOLITH_PERMISSIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'permissions_monolith.json')
+permissions.init_app(app)
+permission_table = load_permission_table(app.config['PERMISSIONS_FILE'] or MONOLITH_PERMISSIONS_FILE, default_role='sales')
+
 # 簡化的用戶認證模型
 class AuthUser(db.Model):
     __tablename__ = 'auth_users'
@@ -79,49 +121,22 @@ class AuthUser(db.Model):
     
     def set_password(self, password):
         """設定密碼"""
-        self.password_hash = hashlib.sha256(password.encode()).hexdigest()
+        self.password_hash = get_password_hasher().hash(password)
     
     def check_password(self, password):
-        """檢查密碼"""
-        return self.password_hash == hashlib.sha256(password.encode()).hexdigest()
+        """檢查密碼；舊的 SHA-256 雜湊或參數已變更時順便更新 password_hash（由呼叫端提交）"""
+        valid, new_hash = get_password_hasher().verify_and_update(password, self.password_hash)
+        if new_hash:
+            self.password_hash = new_hash
+        return valid
     
     def get_permissions(self):
         """獲取角色權限"""
-        permissions = {
-            'admin': {
-                'customer_management': True,
-                'card_design': True,
-                'card_import': True,
-                'user_management': True,
-                'system_config': True,
-                'statistics': True
-            },
-            'developer': {
-                'customer_management': True,
-                'card_design': True,
-                'card_import': True,
-                'user_management': False,
-                'system_config': True,
-                'statistics': True
-            },
-            'sales': {
-                'customer_management': True,
-                'card_design': False,
-                'card_import': False,
-                'user_management': False,
-                'system_config': False,
-                'statistics': True
-            },
-            'designer': {
-                'customer_management': False,
-                'card_design': True,
-                'card_import': True,
-                'user_management': False,
-                'system_config': False,
-                'statistics': False
-            }
-        }
-        return permissions.get(self.role, permissions['sales'])
+        return dict(permission_table.view(self.role))
+    
+    def has_permission(self, permission):
+        """檢查是否有特定權限"""
+        return permission_table.has(self.role, permission)
     
     def to_dict(self):
         return {
@@ -130,12 +145,7 @@ class AuthUser(db.Model):
             'email': self.email,
             'full_name': self.full_name,
             'role': self.role,
-            'role_name': {
-                'admin': '管理員',
-                'developer': '程序員', 
-                'sales': '業務員',
-                'designer': '美工人員'
-            }.get(self.role, '未知'),
+            'role_name': permission_table.role_name(self.role, '未知'),
             'is_active': self.is_active,
             'last_login': self.last_login.isoformat() if self.last_login else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
@@ -161,10 +171,17 @@ class PublishedCard(db.Model):
             'title': self.title,
             'card_data': self.card_data,
             'share_url': self.share_url,
-            'view_count': self.view_count,
+            'view_count': self.current_view_count(),
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+    def current_view_count(self):
+        """已寫入資料庫的次數加上尚未寫回的次數"""
+        return (self.view_count or 0) + view_counter.pending(self.share_url)
+
+# 名片瀏覽次數寫回緩衝
+view_counter = ViewCounter(db, PublishedCard.__table__, 'share_url')
+
 # 健康檢查API
 @app.route('/api/health')
 def health_check():
@@ -176,23 +193,84 @@ def health_check():
     })
 
 # 客戶管理API
+CUSTOMER_SORT_COLUMNS = {'id': None, 'updated_at': Customer.updated_at}
+
+# 前端與藍圖版（main_fixed）共用同一組 fields=：藍圖版才有的欄位略過不回傳
+BLUEPRINT_ONLY_FIELDS = ('facebook_url', 'google_map_url', 'notes', 'contract_end_date')
+
+def customer_list_columns(fields, columns):
+    """列表查詢的欄位；has_published_card 以 EXISTS 子查詢計算，整頁只需一次SQL"""
+    selected = []
+    for name in fields:
+        if name == 'has_published_card':
+            selected.append(db.session.query(PublishedCard.id).filter(
+                PublishedCard.customer_id == Customer.id
+            ).exists().label('has_published_card'))
+        else:
+            selected.append(columns[name])
+    return selected
+
 @app.route('/api/customers', methods=['GET'])
 def get_customers():
+    """取得客戶列表
+
+    支援 fields= 欄位投影（含 has_published_card），以及 limit/cursor keyset 分頁
+    （總筆數於 X-Total-Count，下一頁游標於 X-Next-Cursor）
+    """
     try:
         search = request.args.get('search', '')
-        customers = Customer.query.all()
+        columns = model_columns(Customer)
+        fields = list(columns)
+        if request.args.get('fields'):
+            fields = parse_fields(request.args.get('fields'), fields + ['has_published_card'],
+                                  ignored=BLUEPRINT_ONLY_FIELDS)
+        sort = request.args.get('sort', 'id')
+        if sort not in CUSTOMER_SORT_COLUMNS:
+            return jsonify({'error': f'不支援的排序欄位: {sort}'}), 400
+        sort_column = CUSTOMER_SORT_COLUMNS[sort]
+        
+        query_fields = fields
+        if sort_column is not None and sort not in fields:
+            query_fields = fields + [sort]
+        query = db.session.query(*customer_list_columns(query_fields, columns))
         
         if search:
-            customers = Customer.query.filter(
-                db.or_(
-                    Customer.name.contains(search),
-                    Customer.company.contains(search),
-                    Customer.phone.contains(search),
-                    Customer.email.contains(search)
+            match = fts_match_clause(search)
+            if match and fts_available(db.session):
+                query = query.filter(Customer.id.in_(fts_id_subquery(match)))
+            else:
+                query = query.filter(
+                    db.or_(
+                        Customer.name.icontains(search),
+                        Customer.company.icontains(search),
+                        Customer.phone.icontains(search),
+                        Customer.email.icontains(search),
+                        Customer.address.icontains(search)
+                    )
                 )
-            ).all()
         
-        return jsonify([customer.to_dict() for customer in customers])
+        if not is_paginated(request.args):
+            return jsonify([row_to_dict(row, fields) for row in query.order_by(Customer.id).all()])
+        
+        rows, next_cursor = keyset_paginate(
+            query,
+            Customer.id,
+            sort_column=sort_column,
+            cursor=request.args.get('cursor'),
+            limit=parse_limit(request.args.get('limit'))
+        )
+        total = get_count_cache(app, 'customers').get(
+            search,
+            lambda: query.with_entities(db.func.count(Customer.id)).order_by(None).scalar()
+        )
+        
+        response = jsonify([row_to_dict(row, fields) for row in rows])
+        response.headers['X-Total-Count'] = str(total)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -215,6 +293,7 @@ def create_customer():
         
         db.session.add(customer)
         db.session.commit()
+        get_count_cache(app, 'customers').invalidate()
         
         return jsonify(customer.to_dict()), 201
     except Exception as e:
@@ -250,6 +329,7 @@ def delete_customer(customer_id):
         customer = Customer.query.get_or_404(customer_id)
         db.session.delete(customer)
         db.session.commit()
+        get_count_cache(app, 'customers').invalidate()
         
         return jsonify({'message': '客戶已刪除'})
     except Exception as e:
@@ -578,9 +658,9 @@ def show_card(share_id):
     try:
         card = PublishedCard.query.filter_by(share_url=f'/card/{share_id}').first_or_404()
         
-        # 增加瀏覽次數
-        card.view_count += 1
-        db.session.commit()
+        # 增加瀏覽次數（先寫入緩衝，定期批次寫回）
+        view_counter.increment(card.share_url)
+        view_count = card.current_view_count()
         
         # 返回簡單的名片展示頁面
         return f"""
@@ -602,7 +682,7 @@ def show_card(share_id):
         <body>
             <div class="card">
                 <div class="title">{card.title}</div>
-                <div class="info">瀏覽次數: {card.view_count}</div>
+                <div class="info">瀏覽次數: {view_count}</div>
                 <div class="info">建立時間: {card.created_at.strftime('%Y-%m-%d %H:%M') if card.created_at else ''}</div>
             </div>
         </body>
@@ -632,7 +712,8 @@ def init_db():
     """初始化資料庫"""
     try:
         with app.app_context():
-            db.create_all()
+            run_migrations(db)
+            ensure_customer_fts(db.engine, Customer.__table__)
             print("✅ 資料庫初始化完成")
             return True
     except Exception as e:
@@ -1,54 +1,73 @@
 from flask import Flask, render_template, request, jsonify, send_from_directory
-from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 import os
 import sys
 import time
 
-# 添加 src 目錄到 Python 路徑
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# 添加專案根目錄到 Python 路徑（模型與路由以 src. 匯入）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.user import db
+from src.services import json_codec, permissions
+from src.services.migrations import run_migrations
+from src.services.database import configure_database, init_database
+from src.services.session_sweeper import init_session_sweeper
 
 app = Flask(__name__, static_folder='static', static_url_path='')
 CORS(app)
+json_codec.init_app(app)
 
-# 資料庫設定
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database/app.db'
+# 資料庫設定（DATABASE_URL 未設定時使用 src/database/app_fixed.db）
+# 資料表欄位與單體版 src/main.py 不同，不可與其共用 src/database/app.db
+db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'app_fixed.db')
+configure_database(app, db_path)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = 'your-secret-key-here'
+app.config['PERMISSIONS_FILE'] = os.getenv('PERMISSIONS_FILE')
 
-db = SQLAlchemy(app)
+db.init_app(app)
+init_database(app, db)
 
-# 確保資料庫目錄存在
-os.makedirs(os.path.join(os.path.dirname(__file__), 'database'), exist_ok=True)
+# 角色權限（設定了 PERMISSIONS_FILE 時改用該設定檔）
+permissions.init_app(app)
 
-# 匯入模型 - 注意順序很重要！
-from models.user import User
-from models.customer import Customer
-from models.card_template import CardTemplate
+# 匯入模型（註冊資料表）
+from src.models.user import User
+from src.models.customer import Customer
+from src.models.card_template import CardTemplate
+from src.models.published_card import PublishedCard
+from src.models.auth_user import AuthUser, UserSession
+from src.models.send_job import SendJob, SendTask
 
-# 建立基本資料表
+# 建立資料表並套用遷移（索引等）
 with app.app_context():
-    db.create_all()
+    run_migrations(db)
 
-# 匯入有外鍵關聯的模型
-from models.published_card import PublishedCard
+# 定期刪除超過保留期限的登入會話
+init_session_sweeper(app, db)
 
-# 再次建立所有資料表（包含外鍵關聯）
-with app.app_context():
-    db.create_all()
+# 批量發送工作由 worker 處理：LINE_SEND_WORKERS > 0 時在本程序背景執行，
+# 否則需另外執行 python -m src.line_worker
+app.config['LINE_SEND_WORKERS'] = int(os.getenv('LINE_SEND_WORKERS', '0'))
+if app.config['LINE_SEND_WORKERS']:
+    from src.line_worker import start_workers
+    start_workers(app, app.config['LINE_SEND_WORKERS'])
+    app.logger.info('已在背景啟動 %d 個批量發送 worker', app.config['LINE_SEND_WORKERS'])
 
 # 匯入路由
-from routes.user import user_bp
-from routes.customer import customer_bp
-from routes.line_service import line_service_bp
-from routes.line_config import line_config_bp
-from routes.card_publisher import card_publisher_bp
-from routes.card_display import card_display_bp
+from src.routes.user import user_bp
+from src.routes.auth import auth_bp
+from src.routes.customer import customer_bp
+from src.routes.line_service import line_bp
+from src.routes.line_config import line_config_bp
+from src.routes.card_publisher import card_publisher_bp
+from src.routes.card_display import card_display_bp
 
 # 註冊藍圖
 app.register_blueprint(user_bp, url_prefix='/api')
+app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(customer_bp, url_prefix='/api')
-app.register_blueprint(line_service_bp, url_prefix='/api')
+app.register_blueprint(line_bp, url_prefix='/api')
 app.register_blueprint(line_config_bp, url_prefix='/api')
 app.register_blueprint(card_publisher_bp, url_prefix='/api')
 app.register_blueprint(card_display_bp)
@@ -79,5 +98,7 @@ def serve(path):
             return "index.html not found", 404
 
 if __name__ == '__main__':
+    if not app.config['LINE_SEND_WORKERS']:
+        print('📮 批量發送工作（/api/line/send-jobs）需另外啟動 worker：python -m src.line_worker')
     app.run(host='0.0.0.0', port=5000, debug=True)
 
@@ -1,7 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from src.models.user import db
+from src.services.permissions import get_permission_table
+from src.services.passwords import get_password_hasher
+
+def role_has_permission(role, permission):
+    """檢查角色是否有特定權限"""
+    return get_permission_table().has(role, permission)
+
 
 class AuthUser(db.Model):
     """用戶認證模型"""
@@ -17,78 +23,34 @@ class AuthUser(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
     created_by = db.Column(db.Integer, db.ForeignKey('auth_users.id'))
+    session_generation = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # 遞增後舊的簽章令牌全部失效
     
     def set_password(self, password):
         """設定密碼"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = get_password_hasher().hash(password)
     
     def check_password(self, password):
-        """檢查密碼"""
-        return check_password_hash(self.password_hash, password)
+        """檢查密碼；雜湊參數已變更時順便更新 password_hash（由呼叫端提交）"""
+        valid, new_hash = get_password_hasher().verify_and_update(password, self.password_hash)
+        if new_hash:
+            self.password_hash = new_hash
+        return valid
+    
+    def revoke_sessions(self):
+        """讓此用戶已簽發的簽章令牌全部失效（停用、修改密碼或角色時）"""
+        self.session_generation = (self.session_generation or 0) + 1
     
     def get_role_name(self):
         """取得角色中文名稱"""
-        role_names = {
-            'admin': '管理員',
-            'developer': '程序員', 
-            'sales': '業務員',
-            'designer': '美工人員'
-        }
-        return role_names.get(self.role, '未知角色')
+        return get_permission_table().role_name(self.role)
     
     def get_permissions(self):
         """取得角色權限"""
-        permissions = {
-            'admin': {
-                'customer_management': True,
-                'card_design': True,
-                'card_publish': True,
-                'card_import': True,
-                'line_config': True,
-                'user_management': True,
-                'system_settings': True,
-                'view_statistics': True,
-                'export_data': True
-            },
-            'developer': {
-                'customer_management': True,
-                'card_design': True,
-                'card_publish': True,
-                'card_import': True,
-                'line_config': True,
-                'user_management': False,
-                'system_settings': True,
-                'view_statistics': True,
-                'export_data': True
-            },
-            'sales': {
-                'customer_management': True,
-                'card_design': False,
-                'card_publish': True,
-                'card_import': False,
-                'line_config': False,
-                'user_management': False,
-                'system_settings': False,
-                'view_statistics': True,
-                'export_data': False
-            },
-            'designer': {
-                'customer_management': False,
-                'card_design': True,
-                'card_publish': True,
-                'card_import': True,
-                'line_config': False,
-                'user_management': False,
-                'system_settings': False,
-                'view_statistics': False,
-                'export_data': False
-            }
-        }
-        return permissions.get(self.role, {})
+        return dict(get_permission_table().view(self.role))
     
     def has_permission(self, permission):
         """檢查是否有特定權限"""
-        return self.get_permissions().get(permission, False)
+        return role_has_permission(self.role, permission)
     
     def to_dict(self):
         """轉換為字典"""
@@ -135,3 +97,10 @@ class UserSession(db.Model):
             'ip_address': self.ip_address
         }
 
+class RevokedSessionToken(db.Model):
+    """已登出的簽章令牌（到期後即可刪除）"""
+    __tablename__ = 'revoked_session_tokens'
+    
+    jti = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
@@ -1,8 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from src.models.user import db
+from src.services.customer_search import register_customer_fts
 
 class Customer(db.Model):
+    __tablename__ = 'customers'
+    
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     phone = db.Column(db.String(20), nullable=True)
@@ -41,3 +44,6 @@ class Customer(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+# 全文檢索鏡像的欄位
+SEARCH_FIELDS = ('name', 'company', 'phone', 'email', 'address', 'notes')
+register_customer_fts(Customer.__table__, SEARCH_FIELDS)
@@ -1,6 +1,10 @@
 from src.models.user import db
+from src.services import json_codec
+from src.services.view_counter import ViewCounter
 from datetime import datetime
-import json
+
+# 名片列表回傳的客戶欄位
+SUMMARY_CUSTOMER_FIELDS = ('id', 'name', 'position', 'company', 'phone', 'email', 'website', 'facebook_url', 'address')
 
 class PublishedCard(db.Model):
     """上架名片資料模型"""
@@ -20,6 +24,10 @@ class PublishedCard(db.Model):
     # 關聯到客戶資料
     customer = db.relationship('Customer', backref=db.backref('published_cards', lazy=True))
     
+    def current_view_count(self):
+        """已寫入資料庫的次數加上尚未寫回的次數"""
+        return (self.view_count or 0) + view_counter.pending(self.card_id)
+    
     def to_dict(self):
         """轉換為字典格式"""
         return {
@@ -27,15 +35,31 @@ class PublishedCard(db.Model):
             'customer_id': self.customer_id,
             'card_id': self.card_id,
             'title': self.title,
-            'card_data': json.loads(self.card_data) if self.card_data else {},
+            'card_data': json_codec.loads(self.card_data) if self.card_data else {},
             'share_url': self.share_url,
-            'view_count': self.view_count,
+            'view_count': self.current_view_count(),
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'customer': self.customer.to_dict() if self.customer else None
         }
     
+    def to_summary_dict(self):
+        """列表用的精簡格式：不含 card_data，客戶只含名片牆顯示的欄位"""
+        customer = self.customer
+        return {
+            'id': self.id,
+            'customer_id': self.customer_id,
+            'card_id': self.card_id,
+            'title': self.title,
+            'share_url': self.share_url,
+            'view_count': self.current_view_count(),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'customer': {
+                field: getattr(customer, field) for field in SUMMARY_CUSTOMER_FIELDS
+            } if customer else None
+        }
+    
     @staticmethod
     def from_dict(data):
         """從字典建立物件"""
@@ -43,9 +67,11 @@ class PublishedCard(db.Model):
             customer_id=data.get('customer_id'),
             card_id=data.get('card_id'),
             title=data.get('title'),
-            card_data=json.dumps(data.get('card_data', {}), ensure_ascii=False),
+            card_data=json_codec.dumps(data.get('card_data', {})),
             share_url=data.get('share_url'),
             view_count=data.get('view_count', 0),
             is_active=data.get('is_active', True)
         )
 
+# 公開名片頁的瀏覽次數寫回緩衝
+view_counter = ViewCounter(db, PublishedCard.__table__, 'card_id')
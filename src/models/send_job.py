@@ -0,0 +1,89 @@
+from src.models.user import db
+from datetime import datetime
+import json
+
+class SendJob(db.Model):
+    """批量發送工作資料模型"""
+    __tablename__ = 'send_jobs'
+
+    id = db.Column(db.String(32), primary_key=True)  # 工作ID（uuid hex）
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued / running / completed
+    total = db.Column(db.Integer, nullable=False, default=0)  # 收件人總數
+    customer_order = db.Column(db.Text, nullable=False, default='[]')  # 請求中的客戶ID順序（JSON）
+    locked_by = db.Column(db.String(100))  # 處理中的 worker
+    locked_until = db.Column(db.DateTime)  # 租約到期時間，逾期可由其他 worker 接手
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    tasks = db.relationship('SendTask', backref='job', lazy='dynamic', cascade='all, delete-orphan')
+
+    def progress(self):
+        """依發送單位狀態統計收件人數"""
+        counts = dict(
+            db.session.query(SendTask.status, db.func.sum(SendTask.recipient_count))
+            .filter(SendTask.job_id == self.id)
+            .group_by(SendTask.status)
+        )
+        sent = counts.get('sent') or 0
+        failed = counts.get('failed') or 0
+        return {
+            'total': self.total,
+            'sent': sent,
+            'failed': failed,
+            'pending': self.total - sent - failed
+        }
+
+    def results(self):
+        """每位收件人的發送結果（依加入工作的順序）"""
+        results = []
+        for task in self.tasks.order_by(SendTask.id):
+            for recipient in json.loads(task.recipients):
+                result = {
+                    'customer_id': recipient['customer_id'],
+                    'customer_name': recipient.get('customer_name'),
+                    'status': task.status,
+                    'method': task.method
+                }
+                if task.error:
+                    result['error'] = task.error
+                results.append(result)
+        order = {customer_id: index for index, customer_id in enumerate(json.loads(self.customer_order))}
+        results.sort(key=lambda result: order.get(result['customer_id'], len(order)))
+        return results
+
+    def to_dict(self, include_results=False):
+        """轉換為字典格式"""
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': self.progress(),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+        if include_results:
+            data['results'] = self.results()
+        return data
+
+    def __repr__(self):
+        return f'<SendJob {self.id} {self.status}>'
+
+class SendTask(db.Model):
+    """批量發送工作中的單一發送請求（一次 push 或一次 multicast）"""
+    __tablename__ = 'send_tasks'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(32), db.ForeignKey('send_jobs.id'), nullable=False, index=True)
+    method = db.Column(db.String(20), nullable=False)  # push / multicast / skip（不需發送的無效收件人）
+    recipients = db.Column(db.Text, nullable=False)  # [{customer_id, customer_name, to}]（JSON）
+    recipient_count = db.Column(db.Integer, nullable=False, default=1)
+    messages = db.Column(db.Text)  # 訊息內容（JSON）
+    retry_key = db.Column(db.String(36), nullable=False)  # X-Line-Retry-Key，重送時 LINE 不會重複投遞
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending / sending / sent / failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SendTask {self.id} {self.method} {self.status}>'
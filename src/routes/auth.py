@@ -1,36 +1,98 @@
-from flask import Blueprint, request, jsonify, session, redirect, url_for
+from flask import Blueprint, request, jsonify, session, redirect, url_for, g, current_app
 from datetime import datetime, timedelta
 from src.models.auth_user import AuthUser, UserSession, db
+from src.services.session_cache import CachedSession, session_cache
+from src.services.session_tokens import get_session_tokens, session_mode
+from src.services.permissions import get_permission_table
+from src.services.passwords import HashingBusy
+from src.services.session_sweeper import SessionSweeper
 import secrets
 import hashlib
 
 auth_bp = Blueprint('auth', __name__)
 
+SESSION_LIFETIME = timedelta(hours=24)
+
+_UNRESOLVED = object()
+
 def generate_session_token():
     """生成會話令牌"""
     return secrets.token_urlsafe(32)
 
+def token_mode():
+    """是否使用簽章令牌（AUTH_SESSION_MODE = 'token'）"""
+    return session_mode(current_app.config) == 'token'
+
+def _request_token():
+    """取得請求中的會話令牌；簽章令牌模式另接受 Authorization: Bearer"""
+    if not token_mode():
+        return session.get('session_token')
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith('Bearer '):
+        return authorization[7:].strip()
+    return session.get('auth_token')
+
+def _request_auth():
+    """本次請求已解析的登入資訊（記錄在 flask.g，以令牌區分）"""
+    session_token = _request_token()
+    auth = g.get('auth')
+    if auth is None or auth['token'] != session_token:
+        auth = g.auth = {'token': session_token, 'session': _UNRESOLVED, 'user': _UNRESOLVED}
+    return auth
+
+def get_current_session():
+    """取得當前登入會話 (用戶ID, 角色, 到期時間)
+
+    簽章令牌模式只驗證簽章與撤銷資料；資料庫模式優先使用會話快取，
+    未命中時以一次查詢同時確認會話與用戶皆有效。同一個請求只解析一次
+    """
+    auth = _request_auth()
+    if auth['session'] is not _UNRESOLVED:
+        return auth['session']
+
+    current = None
+    session_token = auth['token']
+    if session_token and token_mode():
+        current = get_session_tokens(current_app).verify(session_token)
+    elif session_token:
+        current = session_cache.get(session_token)
+        if current is None:
+            row = db.session.query(
+                UserSession.user_id, AuthUser.role, UserSession.expires_at
+            ).join(AuthUser, UserSession.user_id == AuthUser.id).filter(
+                UserSession.session_token == session_token,
+                UserSession.is_active == True,
+                AuthUser.is_active == True
+            ).first()
+            if row and datetime.utcnow() <= row.expires_at:
+                current = CachedSession(*row)
+                session_cache.set(session_token, current)
+
+    auth['session'] = current
+    return current
+
 def get_current_user():
     """取得當前登入用戶"""
-    session_token = session.get('session_token')
-    if not session_token:
-        return None
-    
-    user_session = UserSession.query.filter_by(
-        session_token=session_token,
-        is_active=True
-    ).first()
-    
-    if not user_session or user_session.is_expired():
-        return None
-    
-    return user_session.user
+    auth = _request_auth()
+    if auth['user'] is _UNRESOLVED:
+        current = get_current_session()
+        auth['user'] = db.session.get(AuthUser, current.user_id) if current else None
+    return auth['user']
+
+def invalidate_sessions(session_token=None, user=None):
+    """會話或用戶狀態變更並提交後清除快取（登出、停用用戶、修改密碼或角色）"""
+    if session_token:
+        session_cache.invalidate(session_token)
+    if user is not None:
+        session_cache.invalidate_user(user.id)
+        if token_mode():
+            get_session_tokens(current_app).set_generation(user.id, user.session_generation, user.is_active)
+    g.pop('auth', None)
 
 def require_login(f):
     """登入裝飾器"""
     def decorated_function(*args, **kwargs):
-        user = get_current_user()
-        if not user:
+        if not get_current_session():
             return jsonify({'error': '請先登入', 'redirect': '/login.html'}), 401
         return f(*args, **kwargs)
     decorated_function.__name__ = f.__name__
@@ -40,10 +102,10 @@ def require_permission(permission):
     """權限檢查裝飾器"""
     def decorator(f):
         def decorated_function(*args, **kwargs):
-            user = get_current_user()
-            if not user:
+            current = get_current_session()
+            if not current:
                 return jsonify({'error': '請先登入', 'redirect': '/login.html'}), 401
-            if not user.has_permission(permission):
+            if not get_permission_table().has(current.role, permission):
                 return jsonify({'error': '權限不足'}), 403
             return f(*args, **kwargs)
         decorated_function.__name__ = f.__name__
@@ -61,14 +123,29 @@ def login():
         if not username or not password:
             return jsonify({'error': '請輸入用戶名和密碼'}), 400
         
-        # 查找用戶
+        # 查找用戶（密碼使用舊的雜湊參數時，check_password 會更新雜湊並隨登入時間一起提交）
         user = AuthUser.query.filter_by(username=username, is_active=True).first()
         if not user or not user.check_password(password):
             return jsonify({'error': '用戶名或密碼錯誤'}), 401
         
+        if token_mode():
+            # 簽章令牌不寫入 user_sessions
+            user.last_login = datetime.utcnow()
+            db.session.commit()
+            token, expires_at = get_session_tokens(current_app).issue(user)
+            session['auth_token'] = token
+            session['user_id'] = user.id
+            return jsonify({
+                'message': '登入成功',
+                'user': user.to_dict(),
+                'token': token,
+                'expires_at': expires_at.isoformat(),
+                'redirect': '/'
+            })
+        
         # 創建會話
         session_token = generate_session_token()
-        expires_at = datetime.utcnow() + timedelta(hours=24)  # 24小時過期
+        expires_at = datetime.utcnow() + SESSION_LIFETIME  # 24小時過期
         
         user_session = UserSession(
             user_id=user.id,
@@ -94,6 +171,8 @@ def login():
             'redirect': '/'
         })
         
+    except HashingBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -101,13 +180,17 @@ def login():
 def logout():
     """用戶登出"""
     try:
-        session_token = session.get('session_token')
-        if session_token:
+        session_token = _request_token()
+        if session_token and token_mode():
+            if get_session_tokens(current_app).revoke(session_token):
+                db.session.commit()
+        elif session_token:
             # 停用會話
             user_session = UserSession.query.filter_by(session_token=session_token).first()
             if user_session:
                 user_session.is_active = False
                 db.session.commit()
+            invalidate_sessions(session_token=session_token)
         
         # 清除會話
         session.clear()
@@ -168,8 +251,7 @@ def create_user():
             return jsonify({'error': '郵箱已存在'}), 400
         
         # 檢查角色是否有效
-        valid_roles = ['admin', 'developer', 'sales', 'designer']
-        if data['role'] not in valid_roles:
+        if data['role'] not in get_permission_table().roles:
             return jsonify({'error': '無效的角色'}), 400
         
         # 建立新用戶
@@ -190,6 +272,8 @@ def create_user():
             'user': user.to_dict()
         })
         
+    except HashingBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -213,8 +297,7 @@ def update_user(user_id):
             user.full_name = data['full_name']
         
         if 'role' in data:
-            valid_roles = ['admin', 'developer', 'sales', 'designer']
-            if data['role'] not in valid_roles:
+            if data['role'] not in get_permission_table().roles:
                 return jsonify({'error': '無效的角色'}), 400
             user.role = data['role']
         
@@ -224,13 +307,20 @@ def update_user(user_id):
         if 'password' in data and data['password']:
             user.set_password(data['password'])
         
+        # 角色、啟用狀態或密碼變更時，已簽發的令牌需重新登入
+        if any(field in data for field in ('role', 'is_active', 'password')):
+            user.revoke_sessions()
+        
         db.session.commit()
+        invalidate_sessions(user=user)
         
         return jsonify({
             'message': '用戶更新成功',
             'user': user.to_dict()
         })
         
+    except HashingBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -252,7 +342,9 @@ def delete_user(user_id):
         
         # 軟刪除（設為非活躍）
         user.is_active = False
+        user.revoke_sessions()
         db.session.commit()
+        invalidate_sessions(user=user)
         
         return jsonify({'message': '用戶已停用'})
         
@@ -280,10 +372,29 @@ def change_password():
             return jsonify({'error': '新密碼至少需要6個字符'}), 400
         
         current_user.set_password(new_password)
+        current_user.revoke_sessions()
         db.session.commit()
+        invalidate_sessions(user=current_user)
+        
+        # 其他裝置的令牌失效，目前的裝置換發新令牌
+        if token_mode():
+            token, expires_at = get_session_tokens(current_app).issue(current_user)
+            session['auth_token'] = token
+            return jsonify({'message': '密碼修改成功', 'token': token, 'expires_at': expires_at.isoformat()})
         
         return jsonify({'message': '密碼修改成功'})
         
+    except HashingBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@auth_bp.route('/sessions/metrics', methods=['GET'])
+@require_permission('system_settings')
+def session_metrics():
+    """會話資料表與過期會話清理統計"""
+    try:
+        sweeper = current_app.extensions.get('session_sweeper') or SessionSweeper(db.engine, interval=0)
+        return jsonify(sweeper.metrics())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
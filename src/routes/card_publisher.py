@@ -1,10 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy.orm import defer, joinedload
 from src.models.user import db
 from src.models.customer import Customer
-from src.models.published_card import PublishedCard
+from src.models.published_card import PublishedCard, SUMMARY_CUSTOMER_FIELDS
+from src.services import json_codec
+from src.services.flex_builder import flex_fields
 from src.services.line_service import LineService
+from src.services.page_cache import card_page_cache
 import uuid
-import json
 import base64
 import gzip
 from urllib.parse import quote
@@ -29,14 +32,14 @@ def publish_card():
         
         # 生成名片資料
         line_service = LineService()
-        card_data = line_service.create_business_card_flex_message(customer.to_dict())
+        card_bytes = line_service.create_business_card_flex_json(flex_fields(customer))
         
         # 生成唯一的名片ID
         card_id = str(uuid.uuid4())[:8]
         
         # 壓縮名片資料
-        card_json = json.dumps(card_data, ensure_ascii=False)
-        compressed_data = gzip.compress(card_json.encode('utf-8'))
+        card_json = card_bytes.decode('utf-8')
+        compressed_data = gzip.compress(card_bytes)
         encoded_data = base64.b64encode(compressed_data).decode('utf-8')
         
         # 生成分享連結
@@ -52,6 +55,7 @@ def publish_card():
             existing_card.share_url = share_url
             existing_card.updated_at = db.func.now()
             card_id = existing_card.card_id
+            card_page_cache.invalidate(card_id)
         else:
             # 建立新的上架名片
             published_card = PublishedCard(
@@ -78,14 +82,35 @@ def publish_card():
 
 @card_publisher_bp.route('/cards/published', methods=['GET'])
 def get_published_cards():
-    """取得所有上架的名片"""
+    """取得所有上架的名片（精簡格式）
+    
+    include=card_data 時附上名片內容，直接拼接資料庫中的 JSON 文字而不重新解析；
+    單張名片的完整資料請使用 /cards/published/<customer_id>
+    """
     try:
-        cards = PublishedCard.query.filter_by(is_active=True).order_by(PublishedCard.created_at.desc()).all()
-        
-        return jsonify({
-            'success': True,
-            'cards': [card.to_dict() for card in cards]
-        })
+        include_card_data = 'card_data' in request.args.get('include', '').split(',')
+        
+        # 一次查詢載入客戶資料，未要求時不讀取 card_data 欄位
+        customer_columns = [getattr(Customer, field) for field in SUMMARY_CUSTOMER_FIELDS]
+        query = PublishedCard.query.options(
+            joinedload(PublishedCard.customer).load_only(*customer_columns)
+        )
+        if not include_card_data:
+            query = query.options(defer(PublishedCard.card_data))
+        cards = query.filter_by(is_active=True).order_by(PublishedCard.created_at.desc()).all()
+        
+        if not include_card_data:
+            return jsonify({
+                'success': True,
+                'cards': [card.to_summary_dict() for card in cards]
+            })
+        
+        items = [
+            json_codec.dumps_with_raw(card.to_summary_dict(), {'card_data': card.card_data or '{}'})
+            for card in cards
+        ]
+        body = b'{"success":true,"cards":[' + b','.join(items) + b']}'
+        return current_app.response_class(body, mimetype='application/json')
         
     except Exception as e:
         return jsonify({'error': f'取得上架名片失敗: {str(e)}'}), 500
@@ -118,6 +143,7 @@ def unpublish_card(customer_id):
         
         card.is_active = False
         db.session.commit()
+        card_page_cache.invalidate(card.card_id)
         
         return jsonify({
             'success': True,
@@ -172,6 +198,7 @@ def create_card_from_designer():
                 if value:  # 只更新有值的欄位
                     setattr(existing_customer, key, value)
             customer = existing_customer
+            card_page_cache.invalidate_customer(customer.id)
         else:
             # 建立新客戶
             customer = Customer(**customer_data)
@@ -185,7 +212,7 @@ def create_card_from_designer():
         # 處理名片資料
         card_data = data.get('card_data')
         if isinstance(card_data, dict):
-            card_json = json.dumps(card_data, ensure_ascii=False)
+            card_json = json_codec.dumps(card_data)
         else:
             card_json = card_data
         
@@ -256,7 +283,7 @@ def update_card_from_designer():
         
         # 處理名片資料
         if isinstance(card_data, dict):
-            card_json = json.dumps(card_data, ensure_ascii=False)
+            card_json = json_codec.dumps(card_data)
         else:
             card_json = card_data
         
@@ -266,6 +293,7 @@ def update_card_from_designer():
         if published_card:
             published_card.card_data = card_json
             published_card.updated_at = datetime.now()
+            card_page_cache.invalidate(published_card.card_id)
         else:
             # 如果沒有現有名片，建立新的
             card_id = str(uuid.uuid4())[:8]
@@ -310,7 +338,7 @@ def get_card_by_customer(customer_id):
         
         # 解析名片資料
         try:
-            card_data = json.loads(published_card.card_data)
+            card_data = json_codec.loads(published_card.card_data)
         except:
             card_data = published_card.card_data
         
@@ -320,7 +348,7 @@ def get_card_by_customer(customer_id):
             'card_data': card_data,
             'card_id': published_card.card_id,
             'share_url': published_card.share_url,
-            'view_count': published_card.view_count,
+            'view_count': published_card.current_view_count(),
             'created_at': published_card.created_at.isoformat() if published_card.created_at else None,
             'updated_at': published_card.updated_at.isoformat() if published_card.updated_at else None
         })
@@ -1,28 +1,84 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from datetime import datetime
 from src.models.customer import Customer, db
 from src.models.published_card import PublishedCard
+from src.services.pagination import (
+    model_columns, is_paginated, parse_limit, parse_fields,
+    keyset_paginate, row_to_dict, get_count_cache
+)
+from src.services.customer_search import search_customer_ids
+from src.services.customer_import import (
+    CustomerImporter, ImportFormatError, iter_csv, iter_xlsx, DEFAULT_CHUNK_SIZE, DEFAULT_ENCODING
+)
+from src.services.customer_export import EXPORT_FORMATS, DEFAULT_BATCH_SIZE, DEFAULT_GZIP_LEVEL, export_stream
+from src.services.page_cache import card_page_cache
+from src.routes.auth import require_permission
 
 customer_bp = Blueprint('customer', __name__)
 
+CUSTOMER_COLUMNS = model_columns(Customer)
+LIST_FIELDS = list(CUSTOMER_COLUMNS) + ['has_published_card']
+SORT_COLUMNS = {'id': None, 'updated_at': Customer.updated_at}
+
+def query_customers_with_card_flag(fields=None):
+    """建立客戶列表查詢，同時以 EXISTS 子查詢計算是否有已發布的名片
+
+    只查詢 fields 指定的欄位，整頁只需一次SQL
+    """
+    fields = fields or LIST_FIELDS
+    columns = [CUSTOMER_COLUMNS[name] for name in fields if name in CUSTOMER_COLUMNS]
+    
+    if 'has_published_card' in fields:
+        columns.append(db.session.query(PublishedCard.id).filter(
+            PublishedCard.customer_id == Customer.id,
+            PublishedCard.is_active == True
+        ).exists().label('has_published_card'))
+    
+    return db.session.query(*columns)
+
 @customer_bp.route('/customers', methods=['GET'])
 def get_customers():
-    """取得所有客戶列表"""
+    """取得客戶列表
+
+    查詢參數：
+    - fields: 以逗號分隔的欄位，只查詢並回傳這些欄位（id 一律包含）
+    - limit / cursor: keyset 分頁，下一頁游標放在 X-Next-Cursor 標頭
+    - sort: id（預設，遞增）或 updated_at（最近更新優先）
+    """
     try:
-        customers = Customer.query.all()
-        customer_list = []
+        fields = parse_fields(request.args.get('fields'), LIST_FIELDS)
+        sort = request.args.get('sort', 'id')
+        if sort not in SORT_COLUMNS:
+            return jsonify({'error': f'不支援的排序欄位: {sort}'}), 400
+        sort_column = SORT_COLUMNS[sort]
         
-        for customer in customers:
-            customer_data = customer.to_dict()
-            # 檢查是否有已發布的名片
-            published_card = PublishedCard.query.filter_by(
-                customer_id=customer.id, 
-                is_active=True
-            ).first()
-            customer_data['has_published_card'] = published_card is not None
-            customer_list.append(customer_data)
+        query_fields = fields
+        if sort_column is not None and sort not in fields:
+            query_fields = fields + [sort]
+        query = query_customers_with_card_flag(query_fields)
         
-        return jsonify(customer_list)
+        if not is_paginated(request.args):
+            rows = query.order_by(Customer.id).all()
+            return jsonify([row_to_dict(row, fields) for row in rows])
+        
+        rows, next_cursor = keyset_paginate(
+            query,
+            Customer.id,
+            sort_column=sort_column,
+            cursor=request.args.get('cursor'),
+            limit=parse_limit(request.args.get('limit'))
+        )
+        total = get_count_cache(current_app, 'customers').get(
+            'all', lambda: db.session.query(db.func.count(Customer.id)).scalar()
+        )
+        
+        response = jsonify([row_to_dict(row, fields) for row in rows])
+        response.headers['X-Total-Count'] = str(total)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -54,12 +110,94 @@ def create_customer():
         
         db.session.add(customer)
         db.session.commit()
+        get_count_cache(current_app, 'customers').invalidate()
         return jsonify(customer.to_dict()), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
+@customer_bp.route('/customers/bulk', methods=['POST'])
+@require_permission('customer_management')
+def bulk_import_customers():
+    """批次匯入客戶
+
+    上傳方式：multipart 表單欄位 file（.csv 或 .xlsx），或直接以 text/csv 作為請求內容。
+    查詢參數：
+    - format: csv / xlsx（預設依副檔名判斷）
+    - encoding: CSV 編碼（預設 utf-8-sig，舊版 Excel 匯出可用 cp950）
+    - dry_run: 1 表示只驗證不寫入
+    每列的錯誤會列在回應的 errors 中，其餘資料列照常匯入
+    """
+    upload = request.files.get('file')
+    if upload is not None:
+        stream, filename = upload.stream, upload.filename or ''
+    elif request.mimetype in ('text/csv', 'application/octet-stream'):
+        stream, filename = request.stream, ''
+    else:
+        return jsonify({'error': '請上傳 CSV 或 XLSX 檔案（表單欄位 file）'}), 400
+
+    file_format = request.args.get('format') or ('xlsx' if filename.lower().endswith('.xlsx') else 'csv')
+    try:
+        if file_format == 'csv':
+            rows = iter_csv(stream, request.args.get('encoding', DEFAULT_ENCODING))
+        elif file_format == 'xlsx':
+            rows = iter_xlsx(stream)
+        else:
+            return jsonify({'error': f'不支援的檔案格式: {file_format}'}), 400
+
+        importer = CustomerImporter(
+            db.engine,
+            Customer.__table__,
+            chunk_size=current_app.config.get('CUSTOMER_IMPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE),
+            dry_run=request.args.get('dry_run') in ('1', 'true')
+        )
+        result = importer.run(rows)
+    except ImportFormatError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if result['inserted'] and not result['dry_run']:
+        get_count_cache(current_app, 'customers').invalidate()
+    return jsonify(result)
+
+@customer_bp.route('/customers/export', methods=['GET'])
+@require_permission('export_data')
+def export_customers():
+    """串流匯出客戶資料（需要 export_data 權限）
+
+    查詢參數：
+    - format: csv（預設）/ ndjson / vcf
+    - fields: 以逗號分隔的欄位（僅 csv、ndjson；vcf 固定輸出聯絡資訊）
+    資料以 yield_per 分批讀取並邊查詢邊輸出；用戶端接受 gzip 時即時壓縮。
+    CSV 中以公式字元開頭的文字會加上 ' 前綴（CUSTOMER_EXPORT_CSV_ESCAPE_FORMULAS = False 時關閉）
+    """
+    file_format = request.args.get('format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'不支援的匯出格式: {file_format}'}), 400
+    try:
+        fields = list(CUSTOMER_COLUMNS)
+        if file_format != 'vcf':
+            fields = parse_fields(request.args.get('fields'), fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    rows = db.session.query(*[CUSTOMER_COLUMNS[name] for name in fields]).order_by(Customer.id).yield_per(
+        current_app.config.get('CUSTOMER_EXPORT_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    )
+    compress = request.accept_encodings['gzip'] > 0
+    body = export_stream(rows, file_format, fields, compress=compress,
+                         level=current_app.config.get('CUSTOMER_EXPORT_GZIP_LEVEL', DEFAULT_GZIP_LEVEL),
+                         escape_formulas=current_app.config.get('CUSTOMER_EXPORT_CSV_ESCAPE_FORMULAS', True))
+
+    _, mimetype, extension = EXPORT_FORMATS[file_format]
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    filename = f"customers-{datetime.utcnow().strftime('%Y%m%d')}.{extension}"
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.vary.add('Accept-Encoding')
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
 @customer_bp.route('/customers/<int:customer_id>', methods=['GET'])
 def get_customer(customer_id):
     """取得單一客戶資料"""
@@ -95,6 +233,7 @@ def update_customer(customer_id):
         customer.updated_at = datetime.utcnow()
         
         db.session.commit()
+        card_page_cache.invalidate_customer(customer_id)
         return jsonify(customer.to_dict())
         
     except Exception as e:
@@ -108,6 +247,8 @@ def delete_customer(customer_id):
         customer = Customer.query.get_or_404(customer_id)
         db.session.delete(customer)
         db.session.commit()
+        get_count_cache(current_app, 'customers').invalidate()
+        card_page_cache.invalidate_customer(customer_id)
         return '', 204
         
     except Exception as e:
@@ -116,17 +257,33 @@ def delete_customer(customer_id):
 
 @customer_bp.route('/customers/search', methods=['GET'])
 def search_customers():
-    """搜尋客戶"""
-    query = request.args.get('q', '')
+    """搜尋客戶（優先使用全文索引並依相關度排序）"""
+    query = request.args.get('q', '').strip()
     if not query:
         return jsonify([])
     
-    customers = Customer.query.filter(
-        Customer.name.contains(query) |
-        Customer.company.contains(query) |
-        Customer.phone.contains(query) |
-        Customer.email.contains(query)
-    ).all()
+    try:
+        limit = parse_limit(request.args.get('limit'), default=None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    customer_ids = search_customer_ids(db.session, Customer.__table__, query, limit=limit)
+    
+    if customer_ids is None:
+        # 查詢詞太短或無法使用全文索引時，改用 LIKE 比對
+        customers = Customer.query.filter(
+            Customer.name.icontains(query) |
+            Customer.company.icontains(query) |
+            Customer.phone.icontains(query) |
+            Customer.email.icontains(query) |
+            Customer.address.icontains(query) |
+            Customer.notes.icontains(query)
+        ).order_by(Customer.id).limit(limit).all()
+    else:
+        customers_by_id = {
+            customer.id: customer
+            for customer in Customer.query.filter(Customer.id.in_(customer_ids))
+        }
+        customers = [customers_by_id[i] for i in customer_ids if i in customers_by_id]
     
     return jsonify([customer.to_dict() for customer in customers])
-
@@ -1,46 +1,22 @@
 from flask import Blueprint, request, jsonify, current_app
-import os
-import json
+import requests
+from src.services.line_http import get_line_http
+from src.services.line_service import DEFAULT_API_BASE_URL
+from src.services.line_config_store import line_config_store, get_line_config as load_config_with_fallback
 
 line_config_bp = Blueprint('line_config', __name__)
 
-# 設定檔案路徑
-CONFIG_FILE = os.path.join(os.path.dirname(__file__), '..', 'config', 'line_config.json')
-
-def ensure_config_dir():
-    """確保設定目錄存在"""
-    config_dir = os.path.dirname(CONFIG_FILE)
-    if not os.path.exists(config_dir):
-        os.makedirs(config_dir)
-
 def load_line_config():
     """載入LINE設定"""
-    ensure_config_dir()
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            pass
-    return {}
+    return line_config_store.load()
 
 def save_line_config(config):
     """儲存LINE設定"""
-    ensure_config_dir()
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(config, f, ensure_ascii=False, indent=2)
+    line_config_store.save(config)
 
 def get_line_config():
     """取得LINE設定（優先使用檔案設定，其次環境變數）"""
-    config = load_line_config()
-    
-    # 如果檔案中沒有設定，嘗試從環境變數取得
-    if not config.get('access_token'):
-        config['access_token'] = os.getenv('LINE_CHANNEL_ACCESS_TOKEN', '')
-    if not config.get('channel_secret'):
-        config['channel_secret'] = os.getenv('LINE_CHANNEL_SECRET', '')
-    
-    return config
+    return load_config_with_fallback(current_app.config)
 
 @line_config_bp.route('/line/config', methods=['GET'])
 def get_config():
@@ -100,8 +76,6 @@ def update_config():
 def test_connection():
     """測試LINE API連線"""
     try:
-        import requests
-        
         config = get_line_config()
         access_token = config.get('access_token')
         
@@ -115,10 +89,10 @@ def test_connection():
         }
         
         # 使用 LINE Bot Info API 測試連線
-        response = requests.get(
-            'https://api.line.me/v2/bot/info',
-            headers=headers,
-            timeout=10
+        api_base_url = current_app.config.get('LINE_API_BASE_URL', DEFAULT_API_BASE_URL)
+        response = get_line_http(current_app._get_current_object()).get(
+            f'{api_base_url}/info',
+            headers=headers
         )
         
         if response.status_code == 200:
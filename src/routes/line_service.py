@@ -1,6 +1,11 @@
 from flask import Blueprint, jsonify, request, current_app
+from src.models.user import db
 from src.models.customer import Customer
+from src.models.send_job import SendJob
+from src.services.flex_builder import flex_fields
 from src.services.line_service import LineService
+from src.services.line_push import PushSender
+from src.services.send_queue import enqueue_card_batch, prepare_card_jobs
 
 line_bp = Blueprint('line', __name__)
 
@@ -47,6 +52,8 @@ def send_business_card_batch():
     try:
         data = request.json
         customer_ids = data.get('customer_ids', [])
+        # 選填：所有收件人共用的 Flex Message（範本），內容相同時以 multicast 發送
+        shared_message = data.get('flex_message')
         
         if not customer_ids:
             return jsonify({'error': '請提供客戶ID列表'}), 400
@@ -58,48 +65,30 @@ def send_business_card_batch():
             }), 500
         
         line_service = LineService()
-        results = []
-        success_count = 0
-        error_count = 0
-        
-        for customer_id in customer_ids:
-            try:
-                customer = Customer.query.get(customer_id)
-                if not customer:
-                    results.append({
-                        'customer_id': customer_id,
-                        'success': False,
-                        'error': '客戶不存在'
-                    })
-                    error_count += 1
-                    continue
-                
-                if not customer.line_user_id:
-                    results.append({
-                        'customer_id': customer_id,
-                        'customer_name': customer.name,
-                        'success': False,
-                        'error': '客戶沒有設定LINE User ID'
-                    })
-                    error_count += 1
-                    continue
-                
-                line_service.send_business_card(customer)
-                results.append({
-                    'customer_id': customer_id,
-                    'customer_name': customer.name,
-                    'success': True,
-                    'message': '發送成功'
-                })
-                success_count += 1
-                
-            except Exception as e:
-                results.append({
-                    'customer_id': customer_id,
-                    'success': False,
-                    'error': str(e)
-                })
-                error_count += 1
+        
+        # 一次查詢所有客戶，並在送出前建立好訊息（工作執行緒不存取資料庫）
+        customers, results, jobs = prepare_card_jobs(customer_ids, line_service, shared_message)
+        
+        # 並行、限速發送（相同內容合併為 multicast）
+        sender = PushSender.from_config(line_service, current_app.config)
+        for outcome in sender.send(jobs):
+            customer_id = outcome['key']
+            result = {
+                'customer_id': customer_id,
+                'customer_name': customers[customer_id].name,
+                'success': outcome['success'],
+                'attempts': outcome['attempts'],
+                'method': outcome['method']
+            }
+            if outcome['success']:
+                result['message'] = '發送成功'
+            else:
+                result['error'] = outcome['error']
+            results[customer_id] = result
+        
+        results = [results[customer_id] for customer_id in customer_ids]
+        success_count = sum(1 for result in results if result['success'])
+        error_count = len(results) - success_count
         
         return jsonify({
             'success': True,
@@ -114,6 +103,41 @@ def send_business_card_batch():
     except Exception as e:
         return jsonify({'error': f'批量發送失敗: {str(e)}'}), 500
 
+@line_bp.route('/line/send-jobs', methods=['POST'])
+def create_send_job():
+    """建立背景批量發送工作，立即回傳工作ID（由 worker 發送）"""
+    try:
+        data = request.json
+        customer_ids = data.get('customer_ids', [])
+        shared_message = data.get('flex_message')
+        
+        if not customer_ids:
+            return jsonify({'error': '請提供客戶ID列表'}), 400
+        
+        if not current_app.config.get('LINE_CHANNEL_ACCESS_TOKEN'):
+            return jsonify({
+                'error': 'LINE Channel Access Token 未設定，請檢查環境變數'
+            }), 500
+        
+        line_service = LineService()
+        sender = PushSender.from_config(line_service, current_app.config)
+        job = enqueue_card_batch(customer_ids, line_service, sender, shared_message)
+        
+        return jsonify(job.to_dict()), 202
+        
+    except Exception as e:
+        return jsonify({'error': f'建立發送工作失敗: {str(e)}'}), 500
+
+@line_bp.route('/line/send-jobs/<job_id>', methods=['GET'])
+def get_send_job(job_id):
+    """查詢批量發送工作的進度；results=1 時附上每位收件人的結果"""
+    job = db.session.get(SendJob, job_id)
+    if not job:
+        return jsonify({'error': '發送工作不存在'}), 404
+    
+    include_results = request.args.get('results') in ('1', 'true')
+    return jsonify(job.to_dict(include_results=include_results))
+
 @line_bp.route('/line/preview-card/<int:customer_id>', methods=['GET'])
 def preview_business_card(customer_id):
     """預覽客戶的電子名片Flex Message"""
@@ -121,17 +145,7 @@ def preview_business_card(customer_id):
         customer = Customer.query.get_or_404(customer_id)
         
         line_service = LineService()
-        customer_data = {
-            'name': customer.name,
-            'position': customer.position,
-            'company': customer.company,
-            'phone': customer.phone,
-            'website': customer.website,
-            'facebook_url': customer.facebook_url,
-            'google_map_url': customer.google_map_url
-        }
-        
-        flex_message = line_service.create_business_card_flex_message(customer_data)
+        flex_message = line_service.create_business_card_flex_message(flex_fields(customer))
         
         return jsonify({
             'customer_id': customer_id,
@@ -0,0 +1,171 @@
+"""
+客戶資料匯出
+以串流方式輸出 CSV、NDJSON 或多聯絡人 vCard（.vcf）。資料列由資料庫分批讀取（yield_per），
+輸出累積到固定大小後才交給回應，可再即時以 gzip 壓縮；記憶體用量與客戶數量無關。
+CSV 的欄位名稱與批次匯入相同，匯出的檔案可直接重新匯入。
+CSV 中以 = + - @ 開頭的文字前面加上 '，試算表開啟時不會當成公式執行（CSV injection）；
+批次匯入會去掉這個前綴。可由 CUSTOMER_EXPORT_CSV_ESCAPE_FORMULAS = False 關閉。
+"""
+
+import csv
+import functools
+import io
+import zlib
+
+from src.services.json_codec import dumps_bytes
+from src.services.pagination import row_to_dict, serialize_value
+
+DEFAULT_BATCH_SIZE = 1000  # 每次向資料庫取回的筆數
+DEFAULT_CHUNK_SIZE = 64 * 1024  # 累積多少位元組才送出一次
+DEFAULT_GZIP_LEVEL = 6
+
+VCARD_LINE_LIMIT = 75  # RFC 6350：每行最多 75 個位元組，超過須折行
+
+# 試算表視為公式開頭的字元（Tab 與 CR 在部分軟體中也會觸發）
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def csv_escape_formula(value):
+    """以公式字元開頭的文字前面加上 '，試算表會當成純文字顯示"""
+    if value and value[0] in FORMULA_PREFIXES:
+        return "'" + value
+    return value
+
+
+def csv_unescape_formula(value):
+    """還原 csv_escape_formula 加上的前綴（批次匯入時）"""
+    if len(value) > 1 and value[0] == "'" and value[1] in FORMULA_PREFIXES:
+        return value[1:]
+    return value
+
+
+def csv_cell(value, escape_formulas=True):
+    """CSV 儲存格內容"""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return csv_escape_formula(value) if escape_formulas else value
+    return serialize_value(value)
+
+
+def export_csv(rows, fields, escape_formulas=True):
+    """CSV（UTF-8 含 BOM，Excel 可直接開啟）；escape_formulas 為 False 時原樣輸出文字"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(fields)
+    for row in rows:
+        mapping = row._mapping
+        writer.writerow([csv_cell(mapping[name], escape_formulas) for name in fields])
+        if buffer.tell() >= DEFAULT_CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def export_ndjson(rows, fields):
+    """每行一筆 JSON"""
+    for row in rows:
+        yield dumps_bytes(row_to_dict(row, fields)) + b'\n'
+
+
+def vcard_escape(value):
+    """跳脫 vCard 文字值中的特殊字元"""
+    return (str(value).replace('\\', '\\\\').replace('\r\n', '\n').replace('\n', '\\n')
+            .replace(',', '\\,').replace(';', '\\;'))
+
+
+def vcard_fold(line):
+    """超過 75 個位元組的行折成多行（續行以空白開頭），不會切斷多位元組字元"""
+    if len(line.encode('utf-8')) <= VCARD_LINE_LIMIT:
+        return line + '\r\n'
+    parts = []
+    current = []
+    size = 0
+    limit = VCARD_LINE_LIMIT
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > limit:
+            parts.append(''.join(current))
+            current = []
+            size = 0
+            limit = VCARD_LINE_LIMIT - 1  # 續行開頭的空白也算在內
+        current.append(char)
+        size += char_size
+    parts.append(''.join(current))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def vcard_lines(customer):
+    """單一客戶的 vCard 3.0 內容"""
+    name = vcard_escape(customer['name'])
+    lines = ['BEGIN:VCARD', 'VERSION:3.0', f'FN:{name}', f'N:{name};;;;']
+    if customer.get('company'):
+        lines.append(f"ORG:{vcard_escape(customer['company'])}")
+    if customer.get('position'):
+        lines.append(f"TITLE:{vcard_escape(customer['position'])}")
+    if customer.get('phone'):
+        lines.append(f"TEL;TYPE=CELL:{vcard_escape(customer['phone'])}")
+    if customer.get('email'):
+        lines.append(f"EMAIL;TYPE=INTERNET:{vcard_escape(customer['email'])}")
+    if customer.get('address'):
+        lines.append(f"ADR;TYPE=WORK:;;{vcard_escape(customer['address'])};;;;")
+    for field in ('website', 'facebook_url'):
+        if customer.get(field):
+            # URL 的值型別不是文字，逗號與分號不需跳脫
+            lines.append(f'URL:{customer[field]}')
+    if customer.get('notes'):
+        lines.append(f"NOTE:{vcard_escape(customer['notes'])}")
+    if customer.get('updated_at'):
+        lines.append(f"REV:{serialize_value(customer['updated_at'])}")
+    lines.append('END:VCARD')
+    return lines
+
+
+def export_vcard(rows, fields=None):
+    """多聯絡人 vCard，每位客戶一張"""
+    for row in rows:
+        yield ''.join(vcard_fold(line) for line in vcard_lines(row._mapping)).encode('utf-8')
+
+
+def buffered(chunks, size=DEFAULT_CHUNK_SIZE):
+    """將零碎的輸出合併為約 size 位元組的區塊"""
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= size:
+            yield b''.join(pending)
+            pending = []
+            pending_size = 0
+    if pending:
+        yield b''.join(pending)
+
+
+def gzip_stream(chunks, level=DEFAULT_GZIP_LEVEL):
+    """即時以 gzip 壓縮串流"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# 格式：(產生器, MIME 類型, 副檔名)
+EXPORT_FORMATS = {
+    'csv': (export_csv, 'text/csv; charset=utf-8', 'csv'),
+    'ndjson': (export_ndjson, 'application/x-ndjson', 'ndjson'),
+    'vcf': (export_vcard, 'text/vcard; charset=utf-8', 'vcf')
+}
+
+
+def export_stream(rows, file_format, fields, compress=False, level=DEFAULT_GZIP_LEVEL, escape_formulas=True):
+    """依格式產生匯出內容的 bytes 串流"""
+    generate = EXPORT_FORMATS[file_format][0]
+    if generate is export_csv:
+        generate = functools.partial(export_csv, escape_formulas=escape_formulas)
+    chunks = buffered(generate(rows, fields))
+    return gzip_stream(chunks, level) if compress else chunks
@@ -0,0 +1,243 @@
+"""
+客戶批次匯入
+逐列讀取上傳的 CSV（或 XLSX），驗證並正規化欄位後，每 chunk_size 筆以一次 executemany
+寫入並提交。檔案不會整個載入記憶體，錯誤訊息也有數量上限，記憶體用量與檔案大小無關。
+新增的資料列由觸發器同步到全文索引，不需額外處理。
+"""
+
+import codecs
+import csv
+import io
+from datetime import date, datetime
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.services.customer_export import csv_unescape_formula
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_MAX_ERRORS = 1000
+DEFAULT_ENCODING = 'utf-8-sig'  # Excel 匯出的 UTF-8 CSV 會帶 BOM
+
+# 不接受匯入的欄位
+EXCLUDED_FIELDS = ('id', 'created_at', 'updated_at')
+
+# 中文標題對應的欄位
+HEADER_ALIASES = {
+    '姓名': 'name',
+    '名稱': 'name',
+    '電話': 'phone',
+    '手機': 'phone',
+    '電子郵件': 'email',
+    'email': 'email',
+    'e-mail': 'email',
+    '公司': 'company',
+    '職稱': 'position',
+    'line id': 'line_user_id',
+    '地址': 'address',
+    '網站': 'website',
+    'facebook': 'facebook_url',
+    '地圖': 'google_map_url',
+    'google 地圖': 'google_map_url',
+    '備註': 'notes',
+    '合約到期日': 'contract_end_date',
+    '合約到期日期': 'contract_end_date'
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%Y.%m.%d', '%Y%m%d')
+
+
+class ImportFormatError(ValueError):
+    """檔案格式無法匯入（缺少必要欄位、不支援的格式等）"""
+
+
+def parse_date(value):
+    """解析合約到期日，接受 date / datetime（XLSX 儲存格）與常見的日期字串"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    value = str(value)
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'無法解析的日期: {value}（請使用 YYYY-MM-DD）')
+
+
+def map_headers(headers, fields):
+    """將標題列對應到欄位，回傳 (各欄位置對應的欄位名稱或 None, 無法對應的標題)"""
+    mapping = []
+    ignored = []
+    seen = set()
+    for header in headers:
+        key = str(header).strip().lower() if header is not None else ''
+        field = key if key in fields else HEADER_ALIASES.get(key)
+        if field is None or field in seen:
+            mapping.append(None)
+            if key:
+                ignored.append(str(header).strip())
+            continue
+        seen.add(field)
+        mapping.append(field)
+    if 'name' not in seen:
+        raise ImportFormatError('缺少必要欄位: name（姓名）')
+    return mapping, ignored
+
+
+def iter_csv(stream, encoding=DEFAULT_ENCODING):
+    """逐列讀取二進位 CSV 串流，產生每列的值（list）"""
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        raise ImportFormatError(f'不支援的編碼: {encoding}')
+    text = io.TextIOWrapper(stream, encoding=encoding, newline='')
+    try:
+        yield from csv.reader(text)
+    finally:
+        # 不要連同上傳檔案一起關閉
+        text.detach()
+
+
+def iter_xlsx(stream):
+    """以唯讀模式逐列讀取第一個工作表（需要 openpyxl）"""
+    if openpyxl is None:
+        raise ImportFormatError('匯入 XLSX 需要安裝 openpyxl')
+    try:
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise ImportFormatError(f'無法讀取 XLSX 檔案: {e}')
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+
+class CustomerImporter:
+    """驗證並分批寫入客戶資料
+
+    run() 回傳匯入結果：
+        total    資料列數（不含標題與空白列）
+        inserted 成功寫入的筆數
+        failed   驗證或寫入失敗的筆數
+        errors   [{'row': 列號, 'error': 訊息}]，列號與試算表相同（標題為第 1 列），最多 max_errors 筆
+    """
+
+    def __init__(self, engine, table, chunk_size=DEFAULT_CHUNK_SIZE, max_errors=DEFAULT_MAX_ERRORS, dry_run=False):
+        self.engine = engine
+        self.table = table
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.dry_run = dry_run
+        self.fields = [c.name for c in table.columns if c.name not in EXCLUDED_FIELDS]
+        self._lengths = {
+            c.name: c.type.length for c in table.columns
+            if c.name in self.fields and getattr(c.type, 'length', None)
+        }
+
+    def run(self, rows):
+        """匯入 rows（第一列為標題）"""
+        rows = iter(rows)
+        try:
+            headers = next(rows)
+        except StopIteration:
+            raise ImportFormatError('檔案是空的')
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ImportFormatError(f'無法讀取檔案: {e}')
+        mapping, ignored = map_headers(headers, self.fields)
+
+        result = {
+            'total': 0,
+            'inserted': 0,
+            'failed': 0,
+            'errors': [],
+            'errors_truncated': False,
+            'ignored_columns': ignored,
+            'dry_run': self.dry_run
+        }
+        chunk = []
+        row_number = 1
+        try:
+            for row_number, values in enumerate(rows, start=2):
+                if not any(v not in (None, '') for v in values):
+                    continue
+                result['total'] += 1
+                try:
+                    chunk.append((row_number, self.normalize(mapping, values)))
+                except ValueError as e:
+                    self._error(result, row_number, str(e))
+                    continue
+                if len(chunk) >= self.chunk_size:
+                    self._flush(chunk, result)
+                    chunk = []
+        except (UnicodeDecodeError, csv.Error) as e:
+            # 後續的資料無法讀取，已提交的批次保留
+            result['aborted'] = f'第 {row_number + 1} 列之後無法讀取: {e}'
+        self._flush(chunk, result)
+        return result
+
+    def normalize(self, mapping, values):
+        """將一列的值轉為寫入用的 dict，驗證失敗時拋出 ValueError"""
+        record = dict.fromkeys(self.fields)
+        for field, value in zip(mapping, values):
+            if field is None or value is None:
+                continue
+            if isinstance(value, str):
+                # 匯出 CSV 時為防止公式執行加上的 ' 前綴
+                value = csv_unescape_formula(value.strip())
+                if not value:
+                    continue
+            if field == 'contract_end_date':
+                value = parse_date(value)
+            else:
+                if isinstance(value, float) and value.is_integer():
+                    # XLSX 會把電話等數字欄位讀成浮點數
+                    value = int(value)
+                value = str(value)
+                limit = self._lengths.get(field)
+                if limit and len(value) > limit:
+                    raise ValueError(f'{field} 超過 {limit} 個字元')
+            record[field] = value
+
+        if not record['name']:
+            raise ValueError('姓名為必填')
+        if record['email'] and '@' not in record['email']:
+            raise ValueError(f'電子郵件格式錯誤: {record["email"]}')
+        return record
+
+    def _flush(self, chunk, result):
+        """以一次 executemany 寫入一批；失敗時逐筆重試以找出有問題的資料列"""
+        if not chunk:
+            return
+        if self.dry_run:
+            result['inserted'] += len(chunk)
+            return
+        now = datetime.utcnow()
+        records = [dict(record, created_at=now, updated_at=now) for _, record in chunk]
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(self.table.insert(), records)
+            result['inserted'] += len(records)
+            return
+        except SQLAlchemyError:
+            pass
+        for (row_number, _), record in zip(chunk, records):
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(self.table.insert(), record)
+                result['inserted'] += 1
+            except SQLAlchemyError as e:
+                self._error(result, row_number, str(getattr(e, 'orig', None) or e))
+
+    def _error(self, result, row_number, message):
+        result['failed'] += 1
+        if len(result['errors']) < self.max_errors:
+            result['errors'].append({'row': row_number, 'error': message})
+        else:
+            result['errors_truncated'] = True
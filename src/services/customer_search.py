@@ -0,0 +1,123 @@
+"""
+客戶全文檢索
+以 SQLite FTS5（trigram 分詞器，可處理中文姓名與公司名稱）鏡像客戶欄位，
+並用觸發器在新增、修改、刪除時自動同步。
+"""
+
+from sqlalchemy import DDL, Integer, column, event, text
+from sqlalchemy.exc import OperationalError
+
+FTS_TABLE = 'customer_fts'
+
+# trigram 分詞器至少需要三個字元才能比對索引
+MIN_TERM_LENGTH = 3
+
+# 排序權重（bm25），姓名與公司最重要
+FIELD_WEIGHTS = {
+    'name': 10.0,
+    'company': 5.0,
+    'phone': 5.0,
+    'email': 2.0,
+    'address': 1.0,
+    'notes': 1.0
+}
+
+
+def fts_ddl(table_name, fields):
+    """產生建立 FTS5 索引與同步觸發器的 SQL"""
+    columns = ', '.join(fields)
+    new_values = ', '.join(f'new.{field}' for field in fields)
+    old_values = ', '.join(f'old.{field}' for field in fields)
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{columns}, content='{table_name}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {table_name} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+    ]
+
+
+def register_customer_fts(table, fields):
+    """讓 db.create_all() / db.drop_all() 一併建立與移除全文索引（僅 SQLite）"""
+    table.info['fts_fields'] = tuple(fields)
+    for statement in fts_ddl(table.name, fields):
+        event.listen(table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+    event.listen(table, 'before_drop', DDL(f'DROP TABLE IF EXISTS {FTS_TABLE}').execute_if(dialect='sqlite'))
+
+
+def ensure_customer_fts(engine, table):
+    """為既有資料庫補建全文索引，並以現有資料重建索引內容"""
+    if engine.dialect.name != 'sqlite':
+        return False
+
+    with engine.begin() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE}
+        ).first()
+        for statement in fts_ddl(table.name, table.info['fts_fields']):
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    return True
+
+
+def fts_available(session):
+    """檢查目前資料庫是否可使用全文索引"""
+    if session.get_bind().dialect.name != 'sqlite':
+        return False
+    try:
+        return session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE}
+        ).first() is not None
+    except OperationalError:
+        return False
+
+
+def fts_match_clause(query):
+    """將使用者輸入轉為 FTS5 MATCH 語法（每個詞以引號包住並以 AND 連接）
+
+    任一個詞少於三個字元時 trigram 無法比對，回傳 None 讓呼叫端改用 LIKE
+    """
+    terms = query.split()
+    if not terms or any(len(term) < MIN_TERM_LENGTH for term in terms):
+        return None
+    return ' AND '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def fts_id_subquery(match):
+    """符合 MATCH 條件的客戶ID子查詢，可用於 Customer.id.in_()"""
+    return text(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match'
+    ).bindparams(match=match).columns(column('rowid', Integer))
+
+
+def search_customer_ids(session, table, query, limit=None):
+    """以全文索引搜尋客戶，回傳依相關度排序的客戶ID
+
+    無法使用全文索引（非 SQLite、索引不存在或查詢詞太短）時回傳 None
+    """
+    match = fts_match_clause(query)
+    if match is None or not fts_available(session):
+        return None
+
+    weights = ', '.join(str(FIELD_WEIGHTS.get(field, 1.0)) for field in table.info['fts_fields'])
+    sql = (
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match '
+        f'ORDER BY bm25({FTS_TABLE}, {weights})'
+    )
+    params = {'match': match}
+    if limit:
+        sql += ' LIMIT :limit'
+        params['limit'] = limit
+
+    try:
+        return [row[0] for row in session.execute(text(sql), params)]
+    except OperationalError:
+        return None
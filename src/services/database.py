@@ -0,0 +1,105 @@
+"""
+資料庫連線設定
+連線字串由環境變數 DATABASE_URL（或 SQLALCHEMY_DATABASE_URI）指定，未設定時使用各入口指定的 SQLite 檔案（單體版 src/database/app.db，main_fixed 與 worker 為 src/database/app_fixed.db）。
+PostgreSQL 等伺服器型資料庫使用調整過的 QueuePool，讓多個 Gunicorn worker 與多台主機共用同一個資料庫；
+SQLite 則套用 sqlite_tuning 的 PRAGMA 設定與定期維護。
+"""
+
+import os
+import weakref
+
+from sqlalchemy.engine import make_url
+
+from .sqlite_tuning import init_sqlite
+
+URI_ENV_VARS = ('DATABASE_URL', 'SQLALCHEMY_DATABASE_URI')
+
+# 連線池預設值：每個程序最多 pool_size + max_overflow 條連線
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_RECYCLE = 1800  # 秒，早於一般防火牆／PgBouncer 的閒置斷線時間
+DEFAULT_POOL_TIMEOUT = 30  # 秒，連線池用盡時等待的時間
+DEFAULT_CONNECT_TIMEOUT = 10  # 秒
+
+
+def database_uri(default_path, environ=None):
+    """取得資料庫連線字串
+
+    依序讀取 DATABASE_URL、SQLALCHEMY_DATABASE_URI；未設定時使用 default_path 的 SQLite 檔案。
+    雲端平台常見的 postgres:// 轉為 SQLAlchemy 接受的 postgresql://
+    """
+    environ = os.environ if environ is None else environ
+    for name in URI_ENV_VARS:
+        uri = environ.get(name)
+        if uri:
+            if uri.startswith('postgres://'):
+                uri = 'postgresql://' + uri[len('postgres://'):]
+            return uri
+
+    os.makedirs(os.path.dirname(default_path), exist_ok=True)
+    return f'sqlite:///{default_path}'
+
+
+def _env_int(environ, name, default):
+    value = environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def engine_options(uri, environ=None):
+    """依資料庫種類產生 create_engine 參數
+
+    伺服器型資料庫使用 QueuePool，可由 DB_POOL_SIZE、DB_MAX_OVERFLOW、DB_POOL_RECYCLE、
+    DB_POOL_TIMEOUT、DB_CONNECT_TIMEOUT 環境變數調整；SQLite 沿用 SQLAlchemy 預設
+    """
+    environ = os.environ if environ is None else environ
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite':
+        return {}
+
+    options = {
+        'pool_size': _env_int(environ, 'DB_POOL_SIZE', DEFAULT_POOL_SIZE),
+        'max_overflow': _env_int(environ, 'DB_MAX_OVERFLOW', DEFAULT_MAX_OVERFLOW),
+        'pool_recycle': _env_int(environ, 'DB_POOL_RECYCLE', DEFAULT_POOL_RECYCLE),
+        'pool_timeout': _env_int(environ, 'DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT),
+        # 取用連線前先確認仍可使用，資料庫重啟或連線被切斷時自動重連
+        'pool_pre_ping': True,
+    }
+    if url.get_backend_name() == 'postgresql':
+        options['connect_args'] = {
+            'connect_timeout': _env_int(environ, 'DB_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT)
+        }
+    return options
+
+
+def configure_database(app, default_path, environ=None):
+    """設定應用程式的資料庫連線字串與連線池參數，需在初始化 SQLAlchemy 前呼叫
+
+    app.config 中已設定的 SQLALCHEMY_ENGINE_OPTIONS 優先於預設值
+    """
+    uri = database_uri(default_path, environ)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    options = engine_options(uri, environ)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    return uri
+
+
+def init_database(app, db):
+    """初始化資料庫連線：SQLite 套用 PRAGMA 與維護；程序 fork 後捨棄繼承的連線"""
+    with app.app_context():
+        engine = db.engine
+
+    # Gunicorn --preload 等先載入再 fork 的情況，子程序不可沿用父程序的連線
+    if hasattr(os, 'register_at_fork'):
+        engine_ref = weakref.ref(engine)
+
+        def dispose_in_child():
+            child_engine = engine_ref()
+            if child_engine is not None:
+                child_engine.dispose(close=False)
+
+        os.register_at_fork(after_in_child=dispose_in_child)
+
+    if engine.dialect.name == 'sqlite':
+        return init_sqlite(app, db)
+    return None
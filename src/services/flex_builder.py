@@ -0,0 +1,206 @@
+"""
+電子名片 Flex Message 建立與快取
+依名片實際使用的客戶欄位快取建立結果（LRU 淘汰），並保留序列化後的 JSON，
+發送與上架時不必重複建立巢狀 dict 與序列化 JSON。
+"""
+
+import threading
+from collections import OrderedDict
+
+from src.services import json_codec
+
+# Flex Message 會讀取的客戶欄位
+FLEX_FIELDS = ('name', 'position', 'company', 'phone', 'website', 'facebook_url', 'google_map_url')
+
+DEFAULT_MAX_ENTRIES = 2048
+
+_MISSING = object()
+
+
+def flex_fields(customer):
+    """從客戶模型取出 Flex Message 使用的欄位"""
+    return {field: getattr(customer, field, None) for field in FLEX_FIELDS}
+
+
+def build_business_card_flex_message(customer_data):
+    """建立電子名片的Flex Message"""
+    
+    # 基本的電子名片Flex Message模板
+    flex_message = {
+        "type": "flex",
+        "altText": f"{customer_data.get('name', '電子名片')}的電子名片",
+        "contents": {
+            "type": "bubble",
+            "size": "kilo",
+            "header": {
+                "type": "box",
+                "layout": "vertical",
+                "contents": [
+                    {
+                        "type": "text",
+                        "text": "電子名片",
+                        "weight": "bold",
+                        "size": "sm",
+                        "color": "#ffffff"
+                    }
+                ],
+                "backgroundColor": "#3C4142",
+                "paddingAll": "15px"
+            },
+            "body": {
+                "type": "box",
+                "layout": "vertical",
+                "contents": [
+                    {
+                        "type": "text",
+                        "text": customer_data.get('name', '姓名'),
+                        "weight": "bold",
+                        "size": "xl",
+                        "color": "#333333"
+                    },
+                    {
+                        "type": "text",
+                        "text": customer_data.get('position', '職稱'),
+                        "size": "md",
+                        "color": "#666666",
+                        "margin": "sm"
+                    },
+                    {
+                        "type": "text",
+                        "text": customer_data.get('company', '公司名稱'),
+                        "size": "md",
+                        "color": "#666666",
+                        "margin": "sm"
+                    },
+                    {
+                        "type": "separator",
+                        "margin": "lg"
+                    }
+                ],
+                "spacing": "sm",
+                "paddingAll": "20px"
+            },
+            "footer": {
+                "type": "box",
+                "layout": "vertical",
+                "contents": []
+            }
+        }
+    }
+    
+    # 動態添加聯絡方式按鈕
+    footer_contents = []
+    
+    # 電話按鈕
+    if customer_data.get('phone'):
+        footer_contents.append({
+            "type": "button",
+            "style": "primary",
+            "height": "sm",
+            "action": {
+                "type": "uri",
+                "label": "📞 撥打電話",
+                "uri": f"tel:{customer_data['phone']}"
+            }
+        })
+    
+    # 網站按鈕
+    if customer_data.get('website'):
+        footer_contents.append({
+            "type": "button",
+            "style": "secondary",
+            "height": "sm",
+            "action": {
+                "type": "uri",
+                "label": "🌐 官方網站",
+                "uri": customer_data['website']
+            },
+            "margin": "sm"
+        })
+    
+    # Facebook按鈕
+    if customer_data.get('facebook_url'):
+        footer_contents.append({
+            "type": "button",
+            "style": "secondary",
+            "height": "sm",
+            "action": {
+                "type": "uri",
+                "label": "📘 Facebook",
+                "uri": customer_data['facebook_url']
+            },
+            "margin": "sm"
+        })
+    
+    # Google地圖按鈕
+    if customer_data.get('google_map_url'):
+        footer_contents.append({
+            "type": "button",
+            "style": "secondary",
+            "height": "sm",
+            "action": {
+                "type": "uri",
+                "label": "📍 地圖位置",
+                "uri": customer_data['google_map_url']
+            },
+            "margin": "sm"
+        })
+    
+    # 如果有按鈕才加入footer
+    if footer_contents:
+        flex_message["contents"]["footer"]["contents"] = footer_contents
+        flex_message["contents"]["footer"]["spacing"] = "sm"
+        flex_message["contents"]["footer"]["paddingAll"] = "20px"
+    
+    return flex_message
+
+
+class FlexMessageCache:
+    """以名片欄位為鍵的 Flex Message LRU 快取
+
+    回傳的 dict 為多個呼叫端共用的物件，不可修改；需要修改時請先複製
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, customer_data):
+        """取得 Flex Message（dict）"""
+        return self._entry(customer_data)[0]
+
+    def get_json(self, customer_data):
+        """取得序列化後的 Flex Message（UTF-8 JSON bytes）"""
+        return self._entry(customer_data)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _entry(self, customer_data):
+        key = tuple(customer_data.get(field, _MISSING) for field in FLEX_FIELDS)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        message = build_business_card_flex_message(customer_data)
+        entry = (message, json_codec.dumps_bytes(message))
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+# 應用程式共用的 Flex Message 快取
+flex_message_cache = FlexMessageCache()
@@ -0,0 +1,98 @@
+"""
+JSON 編解碼
+有安裝 orjson 時使用 orjson，否則使用標準函式庫 json；輸出一律為不跳脫中文的精簡 UTF-8 JSON。
+orjson 無法處理的物件（超過 64 位元的整數等）自動改用標準函式庫。
+"""
+
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = 'orjson' if orjson else 'json'
+
+if orjson:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def dumps_bytes(obj, default=None, sort_keys=False):
+    """序列化為 UTF-8 JSON bytes"""
+    if orjson:
+        options = _ORJSON_OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, default=default, option=options)
+        except TypeError:
+            pass
+    return _stdlib_dumps(obj, default, sort_keys).encode('utf-8')
+
+
+def dumps(obj, default=None, sort_keys=False):
+    """序列化為 JSON 字串"""
+    if orjson:
+        return dumps_bytes(obj, default=default, sort_keys=sort_keys).decode('utf-8')
+    return _stdlib_dumps(obj, default, sort_keys)
+
+
+def dumps_with_raw(obj, raw_fields, default=None):
+    """序列化 dict，raw_fields 中已是 JSON 文字的值直接拼接，不經過解析再序列化
+
+    呼叫端須確保 raw_fields 的值為合法 JSON
+    """
+    body = dumps_bytes(obj, default=default)
+    if not raw_fields:
+        return body
+    parts = [body[:-1]]
+    separator = b',' if obj else b''
+    for key, raw in raw_fields.items():
+        if isinstance(raw, str):
+            raw = raw.encode('utf-8')
+        parts.append(separator + dumps_bytes(key) + b':' + raw)
+        separator = b','
+    parts.append(b'}')
+    return b''.join(parts)
+
+
+def loads(data):
+    """解析 JSON 字串或 bytes"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj, default, sort_keys):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=default, sort_keys=sort_keys)
+
+
+class CodecJSONProvider(DefaultJSONProvider):
+    """以 json_codec 產生 Flask JSON 回應（jsonify、request.get_json）"""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or self.ensure_ascii:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, default=self.default, sort_keys=self.sort_keys)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        # 除錯模式的縮排輸出沿用 Flask 預設
+        if self.ensure_ascii or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            dumps_bytes(obj, default=self.default, sort_keys=self.sort_keys),
+            mimetype=self.mimetype
+        )
+
+
+def init_app(app):
+    """讓應用程式的 JSON 回應使用 json_codec"""
+    app.json = CodecJSONProvider(app)
+    # DefaultJSONProvider 預設跳脫非 ASCII 字元，改為直接輸出 UTF-8
+    app.json.ensure_ascii = False
@@ -0,0 +1,84 @@
+"""
+LINE 設定檔存取
+解析後的設定快取在記憶體中，只有設定檔的 mtime／inode／大小改變時才重新讀取；
+寫入時先寫暫存檔再以 rename 取代，讀取端不會看到寫到一半的檔案。
+"""
+
+import json
+import os
+import tempfile
+import threading
+
+CONFIG_FILE = os.path.join(os.path.dirname(__file__), '..', 'config', 'line_config.json')
+
+
+class LineConfigStore:
+    """以檔案狀態為快取驗證的 LINE 設定存取器"""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self._lock = threading.Lock()
+        self._signature = None
+        self._config = {}
+        self.loads = 0
+
+    def load(self):
+        """取得設定（回傳副本）；檔案不存在或格式錯誤時回傳空設定"""
+        signature = self._stat()
+        with self._lock:
+            if signature != self._signature:
+                self._config = self._read() if signature else {}
+                self._signature = signature
+            return dict(self._config)
+
+    def save(self, config):
+        """以暫存檔加 rename 原子寫入設定"""
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix='.line_config.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(config, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self._config = dict(config)
+            self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _read(self):
+        self.loads += 1
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return config if isinstance(config, dict) else {}
+
+
+# 應用程式共用的 LINE 設定
+line_config_store = LineConfigStore(CONFIG_FILE)
+
+
+def get_line_config(app_config=None):
+    """取得LINE設定（優先使用檔案設定，其次應用程式設定，最後環境變數）"""
+    config = line_config_store.load()
+    app_config = app_config or {}
+
+    for key, name in (('access_token', 'LINE_CHANNEL_ACCESS_TOKEN'), ('channel_secret', 'LINE_CHANNEL_SECRET')):
+        if not config.get(key):
+            config[key] = app_config.get(name) or os.getenv(name, '')
+
+    return config
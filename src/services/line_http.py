@@ -0,0 +1,84 @@
+"""
+LINE API 共用 HTTP 連線
+所有 LINE API 呼叫共用同一個 requests.Session，以連線池保持 keep-alive，
+避免每則訊息都重新建立 TCP／TLS 連線，並統一設定連線與讀取逾時。
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 32
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10
+
+
+class LineHTTPClient:
+    """具連線池與逾時設定的 LINE HTTP 用戶端"""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT):
+        self.timeout = (connect_timeout, read_timeout)
+        # 重試由 PushSender 依 LINE 回應處理，連線層不自動重試
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """依應用程式設定建立用戶端"""
+        return cls(
+            pool_size=config.get('LINE_HTTP_POOL_SIZE', DEFAULT_POOL_SIZE),
+            connect_timeout=config.get('LINE_HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT),
+            read_timeout=config.get('LINE_HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT)
+        )
+
+    def request(self, method, url, **kwargs):
+        """送出請求，未指定逾時時套用預設值"""
+        kwargs.setdefault('timeout', self.timeout)
+        with self._lock:
+            self.requests += 1
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        """連線重用統計：請求數、建立的連線數與重用的請求數"""
+        pools = self.adapter.poolmanager.pools
+        connections = 0
+        for key in list(pools.keys()):
+            try:
+                connections += pools[key].num_connections
+            except KeyError:
+                continue
+        return {
+            'requests': self.requests,
+            'connections': connections,
+            'reused': max(0, self.requests - connections)
+        }
+
+    def close(self):
+        self.session.close()
+
+
+def get_line_http(app):
+    """取得應用程式共用的 LINE HTTP 用戶端（首次呼叫時建立）"""
+    client = app.extensions.get('line_http')
+    if client is None:
+        with _create_lock:
+            client = app.extensions.get('line_http')
+            if client is None:
+                client = LineHTTPClient.from_config(app.config)
+                app.extensions['line_http'] = client
+    return client
+
+
+_create_lock = threading.Lock()
@@ -0,0 +1,180 @@
+"""
+LINE 批量推播引擎
+以執行緒池限制並行數、以 token bucket 限制每秒請求數，
+遇到 429／5xx 或連線錯誤時以隨機抖動的指數退避重試，並回報每位收件人的結果。
+多位收件人的訊息內容完全相同時改用 multicast，每次請求最多 500 位。
+"""
+
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from src.services import json_codec
+from src.services.line_service import LineAPIError, MULTICAST_LIMIT
+
+# LINE push API 每個頻道每秒 2,000 次請求；multicast 另計，每秒 200 次
+DEFAULT_RATE_LIMIT = 2000
+DEFAULT_MULTICAST_RATE_LIMIT = 200
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_CAP = 8.0
+
+
+class TokenBucket:
+    """執行緒安全的 token bucket 速率限制器"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """取得一個 token，不足時等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class PushSender:
+    """有界並行、限速並自動重試的推播發送器"""
+
+    def __init__(self, line_service, max_workers=DEFAULT_MAX_WORKERS, rate_limit=DEFAULT_RATE_LIMIT,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff_base=DEFAULT_BACKOFF_BASE,
+                 backoff_cap=DEFAULT_BACKOFF_CAP, use_multicast=True,
+                 multicast_rate_limit=DEFAULT_MULTICAST_RATE_LIMIT):
+        self.line_service = line_service
+        self.use_multicast = use_multicast
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate_limit)
+        self.multicast_bucket = TokenBucket(multicast_rate_limit)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+    @classmethod
+    def from_config(cls, line_service, config):
+        """依應用程式設定建立發送器"""
+        return cls(
+            line_service,
+            max_workers=config.get('LINE_PUSH_MAX_WORKERS', DEFAULT_MAX_WORKERS),
+            rate_limit=config.get('LINE_PUSH_RATE_LIMIT', DEFAULT_RATE_LIMIT),
+            max_retries=config.get('LINE_PUSH_MAX_RETRIES', DEFAULT_MAX_RETRIES),
+            backoff_base=config.get('LINE_PUSH_BACKOFF_BASE', DEFAULT_BACKOFF_BASE),
+            backoff_cap=config.get('LINE_PUSH_BACKOFF_CAP', DEFAULT_BACKOFF_CAP),
+            use_multicast=config.get('LINE_USE_MULTICAST', True),
+            multicast_rate_limit=config.get('LINE_MULTICAST_RATE_LIMIT', DEFAULT_MULTICAST_RATE_LIMIT)
+        )
+
+    def send(self, jobs):
+        """並行發送推播
+
+        jobs 為 {'key': 識別值, 'to': LINE User ID, 'messages': [...] 或已序列化的 bytes} 的列表，
+        回傳與 jobs 順序相同的結果 {'key', 'success', 'attempts', 'method', 'error'}
+        """
+        if not jobs:
+            return []
+        units = self.plan(jobs)
+        results = {}
+        for unit, outcome in zip(units, self.run(units)):
+            for key in unit['keys']:
+                results[key] = dict(outcome, key=key, method=unit['method'])
+        return [results[job['key']] for job in jobs]
+
+    def plan(self, jobs):
+        """將訊息內容相同的收件人合併為 multicast 請求，其餘使用 push
+
+        回傳發送單位列表 {'method', 'keys', 'to', 'messages', 'retry_key'}；
+        同一單位重試時沿用相同的 retry_key，LINE 不會重複投遞
+        """
+        groups = {}
+        for job in jobs:
+            groups.setdefault(self._group_key(job) if self.use_multicast else job['key'], []).append(job)
+
+        units = []
+        for group in groups.values():
+            if len(group) == 1:
+                job = group[0]
+                units.append({
+                    'method': 'push',
+                    'keys': [job['key']],
+                    'to': job['to'],
+                    'messages': job['messages'],
+                    'retry_key': str(uuid.uuid4())
+                })
+                continue
+            for start in range(0, len(group), MULTICAST_LIMIT):
+                chunk = group[start:start + MULTICAST_LIMIT]
+                units.append({
+                    'method': 'multicast',
+                    'keys': [job['key'] for job in chunk],
+                    'to': [job['to'] for job in chunk],
+                    'messages': chunk[0]['messages'],
+                    'retry_key': str(uuid.uuid4())
+                })
+        return units
+
+    @staticmethod
+    def _group_key(job):
+        """訊息內容的比對鍵；已序列化的訊息直接比對 bytes"""
+        messages = job['messages']
+        if isinstance(messages, (bytes, bytearray)):
+            return bytes(messages)
+        return json_codec.dumps_bytes(messages, sort_keys=True)
+
+    def run(self, units):
+        """並行發送已規劃的發送單位，回傳與 units 順序相同的 {'success', 'attempts', 'error'}"""
+        if not units:
+            return []
+        workers = max(1, min(self.max_workers, len(units)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='line-push') as executor:
+            return list(executor.map(self._send_unit, units))
+
+    def _send_unit(self, unit):
+        if unit['method'] == 'multicast':
+            send = self.line_service.send_multicast_message
+            bucket = self.multicast_bucket
+        else:
+            send = self.line_service.send_push_message
+            bucket = self.bucket
+        return self._deliver(send, bucket, unit['to'], unit['messages'], unit.get('retry_key'))
+
+    def _deliver(self, send, bucket, to, messages, retry_key=None):
+        """發送一次請求，必要時退避重試；push 與 multicast 的速率限制各自計算"""
+        attempts = 0
+        while True:
+            attempts += 1
+            bucket.acquire()
+            try:
+                send(to, messages, retry_key=retry_key)
+                return {'success': True, 'attempts': attempts}
+            except LineAPIError as e:
+                if not e.retryable or attempts > self.max_retries:
+                    return {'success': False, 'attempts': attempts, 'error': str(e)}
+                time.sleep(self.backoff_delay(attempts, e.retry_after))
+            except requests.RequestException as e:
+                if attempts > self.max_retries:
+                    return {'success': False, 'attempts': attempts, 'error': str(e)}
+                time.sleep(self.backoff_delay(attempts))
+            except Exception as e:
+                return {'success': False, 'attempts': attempts, 'error': str(e)}
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """指數退避加上完整隨機抖動；LINE 指定 Retry-After 時以其為下限"""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** (attempt - 1))))
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
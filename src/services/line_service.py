@@ -1,27 +1,36 @@
-import requests
-import json
-import os
 from flask import current_app
+from src.services import json_codec
+from src.services.line_config_store import get_line_config as load_line_config
+from src.services.flex_builder import flex_fields, flex_message_cache
+from src.services.line_http import get_line_http
 
 def get_line_config():
-    """取得LINE設定（優先使用檔案設定，其次環境變數）"""
-    config_file = os.path.join(os.path.dirname(__file__), '..', 'config', 'line_config.json')
+    """取得LINE設定（優先使用檔案設定，其次應用程式設定或環境變數）"""
+    return load_line_config(current_app.config)
+
+DEFAULT_API_BASE_URL = 'https://api.line.me/v2/bot'
+
+# LINE multicast 每次請求最多的收件人數
+MULTICAST_LIMIT = 500
+
+def encode_message_body(to, messages):
+    """組成訊息 API 的請求內容；已序列化的 messages 直接拼接，不再重新序列化"""
+    if not isinstance(messages, (bytes, bytearray)):
+        messages = json_codec.dumps_bytes(messages)
+    return b'{"to":' + json_codec.dumps_bytes(to) + b',"messages":' + bytes(messages) + b'}'
+
+class LineAPIError(Exception):
+    """LINE API 回應錯誤"""
     
-    # 嘗試從檔案載入設定
-    if os.path.exists(config_file):
-        try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                if config.get('access_token') and config.get('channel_secret'):
-                    return config
-        except:
-            pass
+    def __init__(self, status_code, text, retry_after=None):
+        super().__init__(f"LINE API錯誤: {status_code} - {text}")
+        self.status_code = status_code
+        self.retry_after = retry_after
     
-    # 如果檔案中沒有設定，從應用程式設定或環境變數取得
-    return {
-        'access_token': current_app.config.get('LINE_CHANNEL_ACCESS_TOKEN', ''),
-        'channel_secret': current_app.config.get('LINE_CHANNEL_SECRET', '')
-    }
+    @property
+    def retryable(self):
+        """429（超過速率限制）與 5xx 錯誤可以重試"""
+        return self.status_code == 429 or self.status_code >= 500
 
 class LineService:
     """LINE Bot API服務類別"""
@@ -29,10 +38,28 @@ class LineService:
     def __init__(self):
         config = get_line_config()
         self.channel_access_token = config.get('access_token')
-        self.api_base_url = 'https://api.line.me/v2/bot'
+        self.api_base_url = current_app.config.get('LINE_API_BASE_URL', DEFAULT_API_BASE_URL)
+        self.http = get_line_http(current_app._get_current_object())
+        
+    def send_push_message(self, user_id, messages, retry_key=None):
+        """發送推播訊息給指定用戶
+
+        messages 可以是訊息列表，或已序列化的 JSON 陣列（bytes）
+        """
+        return self._post_message('push', user_id, messages, retry_key=retry_key)
+    
+    def send_multicast_message(self, user_ids, messages, retry_key=None):
+        """以 multicast 一次發送相同訊息給多位用戶（每次最多 500 位）"""
+        if len(user_ids) > MULTICAST_LIMIT:
+            raise ValueError(f"multicast 每次最多 {MULTICAST_LIMIT} 位用戶")
+        return self._post_message('multicast', list(user_ids), messages, retry_key=retry_key)
+    
+    def _post_message(self, endpoint, to, messages, retry_key=None):
+        """呼叫 LINE 訊息 API
         
-    def send_push_message(self, user_id, messages):
-        """發送推播訊息給指定用戶"""
+        retry_key 會以 X-Line-Retry-Key 送出：同一個 key 的請求 LINE 只會投遞一次，
+        重送已被接受的請求時回傳 409，視為已發送。
+        """
         if not self.channel_access_token:
             raise ValueError("LINE Channel Access Token 未設定")
             
@@ -40,175 +67,48 @@ class LineService:
             'Authorization': f'Bearer {self.channel_access_token}',
             'Content-Type': 'application/json'
         }
+        if retry_key:
+            headers['X-Line-Retry-Key'] = retry_key
         
-        data = {
-            'to': user_id,
-            'messages': messages
-        }
-        
-        response = requests.post(
-            f'{self.api_base_url}/message/push',
+        response = self.http.post(
+            f'{self.api_base_url}/message/{endpoint}',
             headers=headers,
-            data=json.dumps(data)
+            data=encode_message_body(to, messages)
         )
         
+        if response.status_code == 409 and retry_key:
+            return {'accepted_request_id': response.headers.get('X-Line-Accepted-Request-Id')}
+        
         if response.status_code != 200:
-            raise Exception(f"LINE API錯誤: {response.status_code} - {response.text}")
+            retry_after = response.headers.get('Retry-After')
+            raise LineAPIError(
+                response.status_code,
+                response.text,
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+            )
             
         return response.json() if response.text else {}
     
     def create_business_card_flex_message(self, customer_data):
-        """建立電子名片的Flex Message"""
-        
-        # 基本的電子名片Flex Message模板
-        flex_message = {
-            "type": "flex",
-            "altText": f"{customer_data.get('name', '電子名片')}的電子名片",
-            "contents": {
-                "type": "bubble",
-                "size": "kilo",
-                "header": {
-                    "type": "box",
-                    "layout": "vertical",
-                    "contents": [
-                        {
-                            "type": "text",
-                            "text": "電子名片",
-                            "weight": "bold",
-                            "size": "sm",
-                            "color": "#ffffff"
-                        }
-                    ],
-                    "backgroundColor": "#3C4142",
-                    "paddingAll": "15px"
-                },
-                "body": {
-                    "type": "box",
-                    "layout": "vertical",
-                    "contents": [
-                        {
-                            "type": "text",
-                            "text": customer_data.get('name', '姓名'),
-                            "weight": "bold",
-                            "size": "xl",
-                            "color": "#333333"
-                        },
-                        {
-                            "type": "text",
-                            "text": customer_data.get('position', '職稱'),
-                            "size": "md",
-                            "color": "#666666",
-                            "margin": "sm"
-                        },
-                        {
-                            "type": "text",
-                            "text": customer_data.get('company', '公司名稱'),
-                            "size": "md",
-                            "color": "#666666",
-                            "margin": "sm"
-                        },
-                        {
-                            "type": "separator",
-                            "margin": "lg"
-                        }
-                    ],
-                    "spacing": "sm",
-                    "paddingAll": "20px"
-                },
-                "footer": {
-                    "type": "box",
-                    "layout": "vertical",
-                    "contents": []
-                }
-            }
-        }
-        
-        # 動態添加聯絡方式按鈕
-        footer_contents = []
-        
-        # 電話按鈕
-        if customer_data.get('phone'):
-            footer_contents.append({
-                "type": "button",
-                "style": "primary",
-                "height": "sm",
-                "action": {
-                    "type": "uri",
-                    "label": "📞 撥打電話",
-                    "uri": f"tel:{customer_data['phone']}"
-                }
-            })
-        
-        # 網站按鈕
-        if customer_data.get('website'):
-            footer_contents.append({
-                "type": "button",
-                "style": "secondary",
-                "height": "sm",
-                "action": {
-                    "type": "uri",
-                    "label": "🌐 官方網站",
-                    "uri": customer_data['website']
-                },
-                "margin": "sm"
-            })
-        
-        # Facebook按鈕
-        if customer_data.get('facebook_url'):
-            footer_contents.append({
-                "type": "button",
-                "style": "secondary",
-                "height": "sm",
-                "action": {
-                    "type": "uri",
-                    "label": "📘 Facebook",
-                    "uri": customer_data['facebook_url']
-                },
-                "margin": "sm"
-            })
-        
-        # Google地圖按鈕
-        if customer_data.get('google_map_url'):
-            footer_contents.append({
-                "type": "button",
-                "style": "secondary",
-                "height": "sm",
-                "action": {
-                    "type": "uri",
-                    "label": "📍 地圖位置",
-                    "uri": customer_data['google_map_url']
-                },
-                "margin": "sm"
-            })
-        
-        # 如果有按鈕才加入footer
-        if footer_contents:
-            flex_message["contents"]["footer"]["contents"] = footer_contents
-            flex_message["contents"]["footer"]["spacing"] = "sm"
-            flex_message["contents"]["footer"]["paddingAll"] = "20px"
-        
-        return flex_message
+        """建立電子名片的Flex Message（快取結果，回傳值不可修改）"""
+        return flex_message_cache.get(customer_data)
+    
+    def create_business_card_flex_json(self, customer_data):
+        """建立序列化後的電子名片Flex Message（UTF-8 JSON bytes）"""
+        return flex_message_cache.get_json(customer_data)
+    
+    def business_card_messages(self, customer):
+        """建立要發送給客戶的電子名片訊息"""
+        return [self.create_business_card_flex_message(flex_fields(customer))]
+    
+    def business_card_messages_json(self, customer):
+        """建立已序列化的電子名片訊息陣列，可直接傳給發送方法"""
+        return b'[' + self.create_business_card_flex_json(flex_fields(customer)) + b']'
     
     def send_business_card(self, customer):
         """發送電子名片給客戶"""
         if not customer.line_user_id:
             raise ValueError("客戶沒有LINE User ID")
         
-        # 建立名片資料
-        customer_data = {
-            'name': customer.name,
-            'position': customer.position,
-            'company': customer.company,
-            'phone': customer.phone,
-            'website': customer.website,
-            'facebook_url': customer.facebook_url,
-            'google_map_url': customer.google_map_url
-        }
-        
-        # 建立Flex Message
-        flex_message = self.create_business_card_flex_message(customer_data)
-        
         # 發送訊息
-        messages = [flex_message]
-        return self.send_push_message(customer.line_user_id, messages)
-
+        return self.send_push_message(customer.line_user_id, self.business_card_messages_json(customer))
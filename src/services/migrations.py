@@ -0,0 +1,142 @@
+"""
+資料庫結構遷移
+啟動時先以 create_all 建立新增的資料表，再依序執行尚未套用的遷移並記錄在 schema_migrations。
+遷移只處理 create_all 無法處理的變更（例如為既有資料表補上索引），可在 SQLite 與 PostgreSQL 上執行。
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, text
+from sqlalchemy.exc import IntegrityError
+
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    'schema_migrations', migration_metadata,
+    Column('version', String(50), primary_key=True),
+    Column('description', String(200)),
+    Column('applied_at', DateTime, default=datetime.utcnow)
+)
+
+# 常用查詢條件的索引：(索引名稱, 資料表, 欄位)
+HOT_LOOKUP_INDEXES = (
+    ('ix_published_cards_customer_active', 'published_cards', ('customer_id', 'is_active')),
+    ('ix_published_cards_card_id', 'published_cards', ('card_id',)),
+    ('ix_published_cards_share_url', 'published_cards', ('share_url',)),
+    ('ix_customers_name_phone', 'customers', ('name', 'phone')),
+    ('ix_user_sessions_token_active', 'user_sessions', ('session_token', 'is_active')),
+    ('ix_auth_users_username', 'auth_users', ('username',)),
+)
+
+# 過期會話清理使用的索引
+SESSION_EXPIRY_INDEXES = (
+    ('ix_user_sessions_expires_at', 'user_sessions', ('expires_at',)),
+)
+
+
+def existing_indexes(conn, table):
+    """資料表現有的索引（含唯一限制）：[(欄位 tuple, 是否唯一)]"""
+    inspector = inspect(conn)
+    indexes = [(tuple(index['column_names']), bool(index.get('unique'))) for index in inspector.get_indexes(table)]
+    indexes += [(tuple(constraint['column_names']), True) for constraint in inspector.get_unique_constraints(table)]
+    primary_key = inspector.get_pk_constraint(table).get('constrained_columns') or []
+    if primary_key:
+        indexes.append((tuple(primary_key), True))
+    return indexes
+
+
+def index_covers(indexes, columns):
+    """既有索引是否已能用於以 columns 等值查詢
+
+    前導欄位相同的索引，或欄位為 columns 前綴的唯一索引（最多一筆，其餘條件不影響效能）
+    """
+    columns = tuple(columns)
+    for index_columns, unique in indexes:
+        if index_columns[:len(columns)] == columns:
+            return True
+        if unique and columns[:len(index_columns)] == index_columns:
+            return True
+    return False
+
+
+def create_indexes(conn, indexes):
+    """建立索引；資料表或欄位不存在、或已有可用索引時略過"""
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    quote = conn.dialect.identifier_preparer.quote
+    created = []
+    for name, table, columns in indexes:
+        if table not in tables:
+            continue
+        table_columns = {column['name'] for column in inspector.get_columns(table)}
+        if not table_columns.issuperset(columns) or index_covers(existing_indexes(conn, table), columns):
+            continue
+        conn.execute(text(
+            f'CREATE INDEX IF NOT EXISTS {quote(name)} ON {quote(table)} ({", ".join(quote(column) for column in columns)})'
+        ))
+        created.append(name)
+    return created
+
+
+def add_column(conn, table, column, ddl):
+    """為既有資料表新增欄位；資料表不存在或已有該欄位時略過"""
+    inspector = inspect(conn)
+    if table not in inspector.get_table_names():
+        return False
+    if column in {c['name'] for c in inspector.get_columns(table)}:
+        return False
+    quote = conn.dialect.identifier_preparer.quote
+    conn.execute(text(f'ALTER TABLE {quote(table)} ADD COLUMN {quote(column)} {ddl}'))
+    return True
+
+
+def add_hot_lookup_indexes(conn):
+    create_indexes(conn, HOT_LOOKUP_INDEXES)
+
+
+def add_session_generation(conn):
+    add_column(conn, 'auth_users', 'session_generation', 'INTEGER NOT NULL DEFAULT 0')
+
+
+def add_session_expiry_index(conn):
+    create_indexes(conn, SESSION_EXPIRY_INDEXES)
+
+
+# 依序套用的遷移：(版本, 說明, 函式)
+MIGRATIONS = (
+    ('0001_hot_lookup_indexes', '常用查詢條件索引', add_hot_lookup_indexes),
+    ('0002_auth_session_generation', '用戶簽章令牌撤銷世代', add_session_generation),
+    ('0003_session_expiry_index', '過期會話清理索引', add_session_expiry_index),
+)
+
+
+def applied_versions(conn):
+    return {row[0] for row in conn.execute(schema_migrations.select().with_only_columns(schema_migrations.c.version))}
+
+
+def run_migrations(db, migrations=MIGRATIONS):
+    """建立資料表並套用尚未執行的遷移，回傳本次套用的版本
+
+    需在應用程式 context 中呼叫；多個程序同時啟動時，同一個遷移只會記錄一次
+    """
+    engine = db.engine
+    with engine.begin() as conn:
+        db.metadata.create_all(conn)
+        migration_metadata.create_all(conn)
+
+    applied = []
+    for version, description, migrate in migrations:
+        with engine.connect() as conn:
+            if version in applied_versions(conn):
+                continue
+        try:
+            with engine.begin() as conn:
+                migrate(conn)
+                conn.execute(schema_migrations.insert().values(
+                    version=version, description=description, applied_at=datetime.utcnow()
+                ))
+            applied.append(version)
+        except IntegrityError:
+            # 其他程序已先套用
+            continue
+    return applied
@@ -0,0 +1,88 @@
+"""
+公開名片頁的渲染結果快取
+以 card_id 為鍵、內容版本（名片與客戶的更新時間）為驗證，LRU 淘汰並限制總記憶體用量。
+"""
+
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class PageCache:
+    """LRU 頁面快取，同時限制筆數與總位元組數"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        """取得快取頁面；不存在或版本不符時回傳 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['version'] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['html']
+
+    def set(self, key, version, html, customer_id=None):
+        """存入頁面，超過上限時淘汰最久未使用的頁面"""
+        size = len(html.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = {
+                'version': version,
+                'html': html,
+                'size': size,
+                'customer_id': customer_id
+            }
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate(self, key):
+        """移除指定名片的快取"""
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_customer(self, customer_id):
+        """移除指定客戶所有名片的快取"""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry['customer_id'] == customer_id]
+            for key in keys:
+                self._remove(key)
+
+    def clear(self):
+        """清除所有快取"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size(self):
+        """目前快取的總位元組數"""
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry['size']
+
+
+# 公開名片頁快取
+card_page_cache = PageCache()
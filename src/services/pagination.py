@@ -0,0 +1,172 @@
+"""
+列表分頁工具
+提供 keyset 游標分頁、欄位投影與總筆數快取
+"""
+
+import base64
+import binascii
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DEFAULT_COUNT_CACHE_ENTRIES = 256  # 每個搜尋字串一筆，超過時淘汰最久未使用的
+
+
+def model_columns(model):
+    """取得模型的欄位對照表 {欄位名稱: 欄位屬性}"""
+    return {column.key: getattr(model, column.key) for column in model.__table__.columns}
+
+
+def is_paginated(args):
+    """判斷請求是否要求分頁（未帶分頁參數時維持舊版一次回傳全部）"""
+    return 'limit' in args or 'cursor' in args
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE):
+    """解析每頁筆數"""
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit 必須是整數')
+    if limit < 1:
+        raise ValueError('limit 必須大於 0')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_fields(value, allowed, required=('id',), ignored=()):
+    """解析 fields= 參數，回傳欄位名稱列表（未指定時回傳全部欄位）
+
+    ignored 中的欄位不回傳也不視為錯誤（其他版本的 API 才有的欄位）
+    """
+    if not value:
+        return list(allowed)
+
+    fields = list(required)
+    for name in value.split(','):
+        name = name.strip()
+        if not name or name in fields or name in ignored:
+            continue
+        if name not in allowed:
+            raise ValueError(f'不支援的欄位: {name}')
+        fields.append(name)
+    return fields
+
+
+def encode_cursor(values):
+    """將游標值編碼為不透明字串"""
+    raw = json.dumps(values, separators=(',', ':'), default=serialize_value)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """解碼游標字串"""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise ValueError('無效的游標')
+    if not isinstance(values, dict) or 'id' not in values:
+        raise ValueError('無效的游標')
+    return values
+
+
+def serialize_value(value):
+    """將日期時間欄位轉為 ISO 字串"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def row_to_dict(row, fields):
+    """將投影查詢的結果列轉為字典，只輸出指定欄位"""
+    mapping = row._mapping
+    return {name: serialize_value(mapping[name]) for name in fields}
+
+
+def keyset_paginate(query, id_column, sort_column=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """以 keyset 方式分頁
+
+    sort_column 為 None 時依 id 遞增排序；否則依 (sort_column, id) 遞減排序，
+    適合「最近更新」列表。查詢結果必須包含 id 與排序欄位。
+    回傳 (rows, next_cursor)，沒有下一頁時 next_cursor 為 None。
+    """
+    position = decode_cursor(cursor) if cursor else None
+
+    if sort_column is None:
+        if position:
+            query = query.filter(id_column > position['id'])
+        query = query.order_by(id_column.asc())
+    else:
+        if position:
+            sort_value = position.get('sort')
+            if isinstance(sort_value, str):
+                sort_value = datetime.fromisoformat(sort_value)
+            query = query.filter(
+                (sort_column < sort_value) |
+                ((sort_column == sort_value) & (id_column < position['id']))
+            )
+        query = query.order_by(sort_column.desc(), id_column.desc())
+
+    # 多取一筆以判斷是否還有下一頁
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]._mapping
+    values = {'id': last[id_column.key]}
+    if sort_column is not None:
+        values['sort'] = last[sort_column.key]
+    return rows, encode_cursor(values)
+
+
+class CountCache:
+    """總筆數快取，避免每次翻頁都執行 COUNT(*)
+
+    鍵通常是用戶輸入的搜尋字串，以 max_entries 限制筆數（LRU），記憶體用量不會無限成長
+    """
+
+    def __init__(self, ttl=30, max_entries=DEFAULT_COUNT_CACHE_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """取得快取的筆數，過期或不存在時呼叫 loader 重新計算"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                del self._entries[key]
+
+        value = loader()
+        with self._lock:
+            self._entries[key] = (value, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self):
+        """資料異動後清除所有快取"""
+        with self._lock:
+            self._entries.clear()
+
+
+def get_count_cache(app, name):
+    """取得綁定在應用程式上的總筆數快取"""
+    caches = app.extensions.setdefault('count_caches', {})
+    if name not in caches:
+        caches[name] = CountCache(ttl=app.config.get('COUNT_CACHE_TTL', 30),
+                                  max_entries=app.config.get('COUNT_CACHE_MAX_ENTRIES', DEFAULT_COUNT_CACHE_ENTRIES))
+    return caches[name]
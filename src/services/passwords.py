@@ -0,0 +1,202 @@
+"""
+密碼雜湊
+兩個應用程式入口共用的密碼雜湊：演算法與成本可設定（預設 argon2，未安裝 argon2-cffi 時為 scrypt），
+登入時若雜湊使用舊的參數（或舊版無鹽 SHA-256）會自動重新雜湊。
+雜湊計算在有上限的執行緒池中進行，同時排隊的數量超過上限時拋出 HashingBusy，
+大量登入請求不會佔滿所有 worker 執行緒。
+
+設定（環境變數，於匯入時讀取；在 app.config 設定這些項目的應用程式需呼叫 init_app）：
+    PASSWORD_HASH_METHOD        argon2 / scrypt / pbkdf2
+    PASSWORD_SCRYPT_N           scrypt 成本（2 的次方，預設 32768）
+    PASSWORD_PBKDF2_ITERATIONS  PBKDF2 次數（預設 600000）
+    PASSWORD_ARGON2_TIME_COST / PASSWORD_ARGON2_MEMORY_COST
+    PASSWORD_HASH_WORKERS       雜湊執行緒數（預設 CPU 數，最多 4）
+    PASSWORD_HASH_MAX_PENDING   同時處理與排隊的上限（預設執行緒數 × 8）
+"""
+
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+try:
+    import argon2
+except ImportError:
+    argon2 = None
+
+DEFAULT_METHOD = 'argon2' if argon2 else 'scrypt'
+DEFAULT_SCRYPT_N = 2 ** 15
+DEFAULT_SCRYPT_R = 8
+DEFAULT_SCRYPT_P = 1
+DEFAULT_PBKDF2_ITERATIONS = 600000
+DEFAULT_ARGON2_TIME_COST = 3
+DEFAULT_ARGON2_MEMORY_COST = 65536  # KiB
+DEFAULT_TIMEOUT = 10.0  # 秒
+
+
+class HashingBusy(Exception):
+    """等待雜湊的請求過多"""
+
+
+def _is_legacy_sha256(hashed):
+    return len(hashed) == 64 and all(c in '0123456789abcdef' for c in hashed)
+
+
+class PasswordHasher:
+    """可設定演算法與成本的密碼雜湊
+
+    max_workers 為 0 時在呼叫端執行緒直接計算（不使用執行緒池）
+    """
+
+    def __init__(self, method=DEFAULT_METHOD, scrypt_n=DEFAULT_SCRYPT_N, scrypt_r=DEFAULT_SCRYPT_R,
+                 scrypt_p=DEFAULT_SCRYPT_P, pbkdf2_iterations=DEFAULT_PBKDF2_ITERATIONS,
+                 argon2_time_cost=DEFAULT_ARGON2_TIME_COST, argon2_memory_cost=DEFAULT_ARGON2_MEMORY_COST,
+                 max_workers=None, max_pending=None, timeout=DEFAULT_TIMEOUT):
+        if method == 'argon2':
+            if argon2 is None:
+                raise ValueError('PASSWORD_HASH_METHOD=argon2 需要安裝 argon2-cffi')
+            self._argon2 = argon2.PasswordHasher(time_cost=argon2_time_cost, memory_cost=argon2_memory_cost)
+            self.method_string = '$argon2id$'
+        elif method == 'scrypt':
+            self._argon2 = None
+            self.method_string = f'scrypt:{scrypt_n}:{scrypt_r}:{scrypt_p}'
+        elif method == 'pbkdf2':
+            self._argon2 = None
+            self.method_string = f'pbkdf2:sha256:{pbkdf2_iterations}'
+        else:
+            raise ValueError(f'不支援的密碼雜湊演算法: {method}')
+        self.method = method
+
+        if max_workers is None:
+            max_workers = min(4, os.cpu_count() or 1)
+        self.max_workers = max_workers
+        self.max_pending = max_pending or max(1, max_workers) * 8
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        def setting(name, default, convert=int):
+            value = config.get(name)
+            return convert(value) if value not in (None, '') else default
+
+        return cls(
+            method=setting('PASSWORD_HASH_METHOD', DEFAULT_METHOD, str),
+            scrypt_n=setting('PASSWORD_SCRYPT_N', DEFAULT_SCRYPT_N),
+            pbkdf2_iterations=setting('PASSWORD_PBKDF2_ITERATIONS', DEFAULT_PBKDF2_ITERATIONS),
+            argon2_time_cost=setting('PASSWORD_ARGON2_TIME_COST', DEFAULT_ARGON2_TIME_COST),
+            argon2_memory_cost=setting('PASSWORD_ARGON2_MEMORY_COST', DEFAULT_ARGON2_MEMORY_COST),
+            max_workers=setting('PASSWORD_HASH_WORKERS', None),
+            max_pending=setting('PASSWORD_HASH_MAX_PENDING', None),
+            timeout=setting('PASSWORD_HASH_TIMEOUT', DEFAULT_TIMEOUT, float)
+        )
+
+    def hash(self, password):
+        """以目前的設定雜湊密碼"""
+        return self._run(self._hash, password)
+
+    def verify(self, password, hashed):
+        """檢查密碼"""
+        return self._run(self._verify, password, hashed)
+
+    def verify_and_update(self, password, hashed):
+        """檢查密碼，需要時同時重新雜湊
+
+        回傳 (是否正確, 新雜湊)；不需重新雜湊時新雜湊為 None
+        """
+        return self._run(self._verify_and_update, password, hashed)
+
+    def needs_rehash(self, hashed):
+        """雜湊是否使用舊的演算法或參數"""
+        if hashed.startswith('$argon2'):
+            return self._argon2 is None or self._argon2.check_needs_rehash(hashed)
+        return hashed.split('$', 1)[0] != self.method_string
+
+    def _hash(self, password):
+        if self._argon2 is not None:
+            return self._argon2.hash(password)
+        return generate_password_hash(password, method=self.method_string)
+
+    def _verify(self, password, hashed):
+        if not hashed:
+            return False
+        if hashed.startswith('$argon2'):
+            if argon2 is None:
+                return False
+            try:
+                return argon2.PasswordHasher().verify(hashed, password)
+            except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHashError):
+                return False
+        if _is_legacy_sha256(hashed):
+            # 舊版 src/main.py 的無鹽 SHA-256
+            return hmac.compare_digest(hashed, hashlib.sha256(password.encode()).hexdigest())
+        try:
+            return check_password_hash(hashed, password)
+        except ValueError:
+            return False
+
+    def _verify_and_update(self, password, hashed):
+        if not self._verify(password, hashed):
+            return False, None
+        if self.needs_rehash(hashed):
+            return True, self._hash(password)
+        return True, None
+
+    def _run(self, func, *args):
+        """在執行緒池中執行，超過排隊上限時拋出 HashingBusy"""
+        if not self.max_workers:
+            return func(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy('登入請求過多，請稍後再試')
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HashingBusy('登入請求過多，請稍後再試')
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix='password-hash')
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+_hasher = PasswordHasher.from_config(os.environ)
+
+
+def get_password_hasher():
+    """目前使用的密碼雜湊"""
+    return _hasher
+
+
+def set_password_hasher(hasher):
+    """替換密碼雜湊設定，回傳原本的設定"""
+    global _hasher
+    previous, _hasher = _hasher, hasher
+    return previous
+
+
+def init_app(app):
+    """依應用程式設定建立密碼雜湊（app.config 中未設定的項目使用環境變數）"""
+    keys = [key for key in app.config if key.startswith('PASSWORD_')]
+    if keys:
+        config = dict(os.environ)
+        config.update({key: app.config[key] for key in keys})
+        set_password_hasher(PasswordHasher.from_config(config))
+    return get_password_hasher()
@@ -0,0 +1,152 @@
+"""
+角色權限表
+啟動時將「角色 → 權限」編譯為每個角色一個位元遮罩，權限檢查只需一次字典查詢與位元運算。
+可由 JSON 設定檔（PERMISSIONS_FILE）新增角色或調整權限，不必修改程式：
+
+    {
+        "permissions": ["customer_management", "card_design", ...],
+        "roles": {
+            "admin": {"name": "管理員", "permissions": ["customer_management", "card_design", ...]},
+            "auditor": {"name": "稽核人員", "permissions": ["view_statistics"]}
+        }
+    }
+
+"permissions" 可省略（依各角色出現的順序）；角色的 "permissions" 也可寫成 {權限: true/false}。
+"""
+
+import json
+import os
+from types import MappingProxyType
+
+DEFAULT_PERMISSIONS_FILE = os.path.join(os.path.dirname(__file__), '..', 'config', 'permissions.json')
+
+# 內建角色（未提供設定檔時使用）
+DEFAULT_ROLES = {
+    'admin': {
+        'name': '管理員',
+        'permissions': [
+            'customer_management', 'card_design', 'card_publish', 'card_import', 'line_config',
+            'user_management', 'system_settings', 'view_statistics', 'export_data'
+        ]
+    },
+    'developer': {
+        'name': '程序員',
+        'permissions': [
+            'customer_management', 'card_design', 'card_publish', 'card_import', 'line_config',
+            'system_settings', 'view_statistics', 'export_data'
+        ]
+    },
+    'sales': {
+        'name': '業務員',
+        'permissions': ['customer_management', 'card_publish', 'view_statistics']
+    },
+    'designer': {
+        'name': '美工人員',
+        'permissions': ['card_design', 'card_publish', 'card_import']
+    }
+}
+
+DEFAULT_PERMISSION_NAMES = (
+    'customer_management', 'card_design', 'card_publish', 'card_import', 'line_config',
+    'user_management', 'system_settings', 'view_statistics', 'export_data'
+)
+
+
+class PermissionTable:
+    """編譯後的唯讀權限表
+
+    default_role 為未知角色沿用的角色；None 表示未知角色沒有任何權限
+    """
+
+    __slots__ = ('permissions', 'roles', 'role_names', 'default_role', '_bits', '_masks', '_views')
+
+    def __init__(self, roles, permissions=None, default_role=None):
+        if permissions is None:
+            permissions = []
+            for spec in roles.values():
+                for name in _granted(spec.get('permissions', ())):
+                    if name not in permissions:
+                        permissions.append(name)
+        self.permissions = tuple(permissions)
+        self._bits = MappingProxyType({name: 1 << i for i, name in enumerate(self.permissions)})
+
+        masks = {}
+        views = {}
+        for role, spec in roles.items():
+            granted = frozenset(_granted(spec.get('permissions', ())))
+            unknown = granted - self._bits.keys()
+            if unknown:
+                raise ValueError(f'角色 {role} 含未定義的權限: {", ".join(sorted(unknown))}')
+            masks[role] = sum(self._bits[name] for name in granted)
+            views[role] = MappingProxyType({name: name in granted for name in self.permissions})
+        if default_role is not None and default_role not in masks:
+            raise ValueError(f'未定義的預設角色: {default_role}')
+
+        self.roles = tuple(roles)
+        self.role_names = MappingProxyType({role: spec.get('name', role) for role, spec in roles.items()})
+        self.default_role = default_role
+        self._masks = MappingProxyType(masks)
+        self._views = MappingProxyType(views)
+
+    def has(self, role, permission):
+        """角色是否有指定權限"""
+        mask = self._masks.get(role)
+        if mask is None:
+            mask = self._masks.get(self.default_role, 0)
+        return bool(mask & self._bits.get(permission, 0))
+
+    def view(self, role):
+        """角色的 {權限: 是否允許}（唯讀，多個呼叫端共用）；未知角色為空"""
+        view = self._views.get(role)
+        if view is None:
+            view = self._views.get(self.default_role, MappingProxyType({}))
+        return view
+
+    def role_name(self, role, default='未知角色'):
+        return self.role_names.get(role, default)
+
+    @classmethod
+    def from_file(cls, path, default_role=None):
+        """由 JSON 設定檔載入"""
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return cls(config['roles'], permissions=config.get('permissions'), default_role=default_role)
+
+
+def _granted(permissions):
+    if isinstance(permissions, dict):
+        return [name for name, allowed in permissions.items() if allowed]
+    return list(permissions)
+
+
+def load_permission_table(path=None, default_role=None):
+    """載入權限表：指定的設定檔（PERMISSIONS_FILE）、預設設定檔（存在時）或內建角色"""
+    path = path or os.getenv('PERMISSIONS_FILE')
+    if path:
+        return PermissionTable.from_file(path, default_role=default_role)
+    if os.path.exists(DEFAULT_PERMISSIONS_FILE):
+        return PermissionTable.from_file(DEFAULT_PERMISSIONS_FILE, default_role=default_role)
+    return PermissionTable(DEFAULT_ROLES, permissions=DEFAULT_PERMISSION_NAMES, default_role=default_role)
+
+
+_table = load_permission_table()
+
+
+def get_permission_table():
+    """目前使用的權限表"""
+    return _table
+
+
+def set_permission_table(table):
+    """替換權限表（重新載入設定檔時），回傳原本的權限表"""
+    global _table
+    previous, _table = _table, table
+    return previous
+
+
+def init_app(app):
+    """應用程式設定了 PERMISSIONS_FILE 時改用該設定檔"""
+    path = app.config.get('PERMISSIONS_FILE')
+    if path:
+        set_permission_table(load_permission_table(path))
+    return get_permission_table()
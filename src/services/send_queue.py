@@ -0,0 +1,240 @@
+"""
+LINE 批量發送工作佇列
+工作與發送單位存放在資料庫（send_jobs／send_tasks），由一或多個 worker 以租約領取處理。
+每個發送單位在送出前先標記為 sending 並提交，送出時帶固定的 X-Line-Retry-Key；
+worker 中斷後由其他 worker 接手重送時，LINE 對已接受的請求回傳 409，不會重複投遞。
+"""
+
+import json
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, or_, update
+
+from src.models.user import db
+from src.models.customer import Customer
+from src.models.send_job import SendJob, SendTask
+from src.services.line_push import PushSender
+
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_CHUNK_SIZE = 64
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+def prepare_card_jobs(customer_ids, line_service, shared_message=None):
+    """查詢客戶並建立推播工作
+
+    回傳 (customers, results, jobs)：results 先填入無法發送的客戶，
+    可發送的客戶以 None 佔位；重複的客戶ID只發送一次
+    """
+    customers = {
+        customer.id: customer
+        for customer in Customer.query.filter(Customer.id.in_(customer_ids))
+    }
+    results = {}
+    jobs = []
+
+    for customer_id in customer_ids:
+        customer = customers.get(customer_id)
+        if not customer:
+            results[customer_id] = {
+                'customer_id': customer_id,
+                'success': False,
+                'error': '客戶不存在'
+            }
+        elif not customer.line_user_id:
+            results[customer_id] = {
+                'customer_id': customer_id,
+                'customer_name': customer.name,
+                'success': False,
+                'error': '客戶沒有設定LINE User ID'
+            }
+        elif customer_id not in results:
+            results[customer_id] = None
+            jobs.append({
+                'key': customer_id,
+                'to': customer.line_user_id,
+                'messages': [shared_message] if shared_message else line_service.business_card_messages_json(customer)
+            })
+
+    return customers, results, jobs
+
+
+def encode_messages(messages):
+    """將訊息轉為儲存用的 JSON 文字"""
+    if isinstance(messages, (bytes, bytearray)):
+        return bytes(messages).decode('utf-8')
+    return json.dumps(messages, ensure_ascii=False)
+
+
+def enqueue_card_batch(customer_ids, line_service, sender, shared_message=None):
+    """建立批量發送工作並寫入資料庫，回傳 SendJob（尚未發送）"""
+    customer_ids = list(dict.fromkeys(customer_ids))
+    customers, results, jobs = prepare_card_jobs(customer_ids, line_service, shared_message)
+
+    job = SendJob(
+        id=uuid.uuid4().hex,
+        status='queued',
+        total=len(customer_ids),
+        customer_order=json.dumps(customer_ids)
+    )
+    db.session.add(job)
+
+    for customer_id, result in results.items():
+        if result is not None:
+            db.session.add(SendTask(
+                job_id=job.id,
+                method='skip',
+                recipients=json.dumps([{
+                    'customer_id': customer_id,
+                    'customer_name': result.get('customer_name')
+                }], ensure_ascii=False),
+                recipient_count=1,
+                retry_key=str(uuid.uuid4()),
+                status='failed',
+                error=result['error']
+            ))
+
+    for unit in sender.plan(jobs):
+        recipients = [
+            {'customer_id': key, 'customer_name': customers[key].name, 'to': customers[key].line_user_id}
+            for key in unit['keys']
+        ]
+        db.session.add(SendTask(
+            job_id=job.id,
+            method=unit['method'],
+            recipients=json.dumps(recipients, ensure_ascii=False),
+            recipient_count=len(recipients),
+            messages=encode_messages(unit['messages']),
+            retry_key=unit['retry_key'],
+            status='pending'
+        ))
+
+    db.session.commit()
+    return job
+
+
+class SendJobWorker:
+    """領取並處理批量發送工作的 worker
+
+    需在應用程式 context 中執行；line_service_factory 每次處理工作時建立 LineService
+    """
+
+    def __init__(self, app, line_service_factory, worker_id=None):
+        self.app = app
+        self.line_service_factory = line_service_factory
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}'
+        self.lease = timedelta(seconds=app.config.get('LINE_JOB_LEASE_SECONDS', DEFAULT_LEASE_SECONDS))
+        self.chunk_size = app.config.get('LINE_JOB_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+    def claim(self):
+        """領取一個排隊中或租約已過期的工作，回傳工作ID；沒有工作時回傳 None"""
+        while True:
+            now = datetime.utcnow()
+            claimable = or_(
+                SendJob.status == 'queued',
+                and_(SendJob.status == 'running', SendJob.locked_until < now)
+            )
+            job_id = db.session.query(SendJob.id).filter(claimable).order_by(SendJob.created_at).limit(1).scalar()
+            if job_id is None:
+                db.session.rollback()
+                return None
+
+            # 條件式 UPDATE：多個 worker 同時領取時只有一個會成功
+            claimed = db.session.execute(
+                update(SendJob)
+                .where(SendJob.id == job_id, claimable)
+                .values(
+                    status='running',
+                    locked_by=self.worker_id,
+                    locked_until=now + self.lease,
+                    started_at=func.coalesce(SendJob.started_at, now)
+                )
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                return job_id
+
+    def process(self, job_id):
+        """處理工作中尚未完成的發送單位，直到全部完成或失去租約"""
+        sender = PushSender.from_config(self.line_service_factory(), self.app.config)
+
+        while True:
+            tasks = (
+                SendTask.query
+                .filter(SendTask.job_id == job_id, SendTask.status.in_(('pending', 'sending')))
+                .order_by(SendTask.id)
+                .limit(self.chunk_size)
+                .all()
+            )
+            if not tasks:
+                self._finish(job_id)
+                return
+
+            # 先記錄「發送中」再送出；中斷後重送時以相同的 retry key 避免重複投遞
+            for task in tasks:
+                task.status = 'sending'
+            db.session.commit()
+
+            units = [self._unit(task) for task in tasks]
+            for task, outcome in zip(tasks, sender.run(units)):
+                task.attempts += outcome['attempts']
+                task.status = 'sent' if outcome['success'] else 'failed'
+                task.error = outcome.get('error')
+
+            if not self._renew(job_id):
+                db.session.commit()
+                return
+            db.session.commit()
+
+    def run_once(self):
+        """領取並處理一個工作，回傳處理的工作ID"""
+        job_id = self.claim()
+        if job_id is not None:
+            self.process(job_id)
+        return job_id
+
+    def run_forever(self, poll_interval=DEFAULT_POLL_INTERVAL, stop_event=None):
+        """持續處理工作；佇列為空時每隔 poll_interval 秒檢查一次"""
+        while stop_event is None or not stop_event.is_set():
+            try:
+                job_id = self.run_once()
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception('處理批量發送工作失敗')
+                job_id = None
+            finally:
+                db.session.remove()
+            if job_id is None:
+                if stop_event is not None:
+                    stop_event.wait(poll_interval)
+                else:
+                    time.sleep(poll_interval)
+
+    def _unit(self, task):
+        recipients = json.loads(task.recipients)
+        return {
+            'method': task.method,
+            'to': [r['to'] for r in recipients] if task.method == 'multicast' else recipients[0]['to'],
+            'messages': task.messages.encode('utf-8'),
+            'retry_key': task.retry_key
+        }
+
+    def _renew(self, job_id):
+        """延長租約；租約已被其他 worker 接手時回傳 False"""
+        return db.session.execute(
+            update(SendJob)
+            .where(SendJob.id == job_id, SendJob.locked_by == self.worker_id)
+            .values(locked_until=datetime.utcnow() + self.lease)
+        ).rowcount == 1
+
+    def _finish(self, job_id):
+        db.session.execute(
+            update(SendJob)
+            .where(SendJob.id == job_id, SendJob.locked_by == self.worker_id)
+            .values(status='completed', finished_at=datetime.utcnow(), locked_by=None, locked_until=None)
+        )
+        db.session.commit()
@@ -0,0 +1,73 @@
+"""
+登入會話快取
+以會話令牌為鍵快取 (用戶ID, 角色, 到期時間)，驗證登入與權限時不必每次查詢資料庫。
+登出、停用用戶、修改密碼或角色時需呼叫 invalidate／invalidate_user；
+多個程序各自有快取，其他程序的變更最多延遲 ttl 秒生效。
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_TTL = 60.0  # 秒
+
+CachedSession = namedtuple('CachedSession', ['user_id', 'role', 'expires_at'])
+
+
+class SessionCache:
+    """會話令牌的 TTL／LRU 快取"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token):
+        """取得快取的會話；不存在、超過 ttl 或會話已到期時回傳 None"""
+        with self._lock:
+            item = self._entries.get(token)
+            if item is not None:
+                entry, cached_at = item
+                if time.monotonic() - cached_at < self.ttl and datetime.utcnow() <= entry.expires_at:
+                    self._entries.move_to_end(token)
+                    self.hits += 1
+                    return entry
+                del self._entries[token]
+            self.misses += 1
+            return None
+
+    def set(self, token, entry):
+        """存入會話，超過上限時淘汰最久未使用的項目"""
+        with self._lock:
+            self._entries[token] = (entry, time.monotonic())
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token):
+        """移除指定令牌"""
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def invalidate_user(self, user_id):
+        """移除指定用戶的所有會話"""
+        with self._lock:
+            tokens = [token for token, (entry, _) in self._entries.items() if entry.user_id == user_id]
+            for token in tokens:
+                del self._entries[token]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# 應用程式共用的會話快取
+session_cache = SessionCache()
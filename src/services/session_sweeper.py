@@ -0,0 +1,147 @@
+"""
+過期會話清理
+登入會話（user_sessions）到期或登出後不再使用，但資料列不會自動刪除。
+背景執行緒定期以小批次刪除超過保留期限的會話，每批各自提交並稍作停頓，
+不會長時間持有寫入鎖；同時清除已到期的簽章令牌撤銷紀錄（revoked_session_tokens）。
+"""
+
+import atexit
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+
+from src.models.auth_user import RevokedSessionToken, UserSession
+
+DEFAULT_RETENTION_DAYS = 7
+DEFAULT_SWEEP_INTERVAL = 3600.0
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_BATCH_PAUSE = 0.05  # 秒，批次之間讓出寫入鎖
+DEFAULT_MAX_BATCHES = 200  # 每次清理最多刪除的批次數
+
+
+class SessionSweeper:
+    """分批刪除過期會話的背景工作
+
+    會話（含已登出的）到期後仍保留 retention 供稽核，之後才刪除；
+    已登出的會話一樣以原本的到期時間計算，條件只用到 expires_at 索引
+    """
+
+    def __init__(self, engine, retention=timedelta(days=DEFAULT_RETENTION_DAYS), batch_size=DEFAULT_BATCH_SIZE,
+                 interval=DEFAULT_SWEEP_INTERVAL, batch_pause=DEFAULT_BATCH_PAUSE, max_batches=DEFAULT_MAX_BATCHES):
+        self.engine = engine
+        self.retention = retention
+        self.batch_size = batch_size
+        self.interval = interval
+        self.batch_pause = batch_pause
+        self.max_batches = max_batches
+        self.runs = 0
+        self.purged_sessions = 0
+        self.purged_tokens = 0
+        self.last_run = None
+        self.last_duration = None
+        self.last_purged = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._logger = None
+
+    def sweep_once(self, now=None):
+        """執行一次清理，回傳本次刪除的 {'sessions': 筆數, 'tokens': 筆數}"""
+        now = now or datetime.utcnow()
+        cutoff = now - self.retention
+        sessions = UserSession.__table__
+        tokens = RevokedSessionToken.__table__
+
+        started = time.monotonic()
+        purged = {
+            'sessions': self._purge(sessions, sessions.c.expires_at < cutoff),
+            'tokens': self._purge(tokens, tokens.c.expires_at < now)
+        }
+
+        self.runs += 1
+        self.purged_sessions += purged['sessions']
+        self.purged_tokens += purged['tokens']
+        self.last_run = now
+        self.last_duration = time.monotonic() - started
+        self.last_purged = purged
+        return purged
+
+    def metrics(self):
+        """清理統計與資料表目前的筆數"""
+        sessions = UserSession.__table__
+        now = datetime.utcnow()
+        with self.engine.connect() as connection:
+            table_rows = connection.execute(select(func.count()).select_from(sessions)).scalar()
+            active_rows = connection.execute(
+                select(func.count()).select_from(sessions)
+                .where(sessions.c.is_active == True, sessions.c.expires_at >= now)  # noqa: E712
+            ).scalar()
+            revoked_rows = connection.execute(select(func.count()).select_from(RevokedSessionToken.__table__)).scalar()
+        return {
+            'runs': self.runs,
+            'purged_sessions': self.purged_sessions,
+            'purged_tokens': self.purged_tokens,
+            'last_run': self.last_run.isoformat() if self.last_run else None,
+            'last_duration_ms': round(self.last_duration * 1000, 1) if self.last_duration is not None else None,
+            'last_purged': self.last_purged,
+            'retention_days': self.retention.total_seconds() / 86400,
+            'table_rows': table_rows,
+            'active_sessions': active_rows,
+            'revoked_tokens': revoked_rows
+        }
+
+    def _purge(self, table, condition):
+        """每批刪除最多 batch_size 筆並各自提交，回傳刪除總數"""
+        primary_key = list(table.primary_key.columns)[0]
+        total = 0
+        for batch in range(self.max_batches):
+            if batch and self.batch_pause:
+                time.sleep(self.batch_pause)
+            with self.engine.begin() as connection:
+                ids = connection.execute(
+                    select(primary_key).where(condition).limit(self.batch_size)
+                ).scalars().all()
+                if not ids:
+                    break
+                connection.execute(delete(table).where(primary_key.in_(ids)))
+            total += len(ids)
+            if len(ids) < self.batch_size:
+                break
+        return total
+
+    def start(self, logger=None):
+        """啟動背景執行緒"""
+        if self._thread is not None:
+            return
+        self._logger = logger
+        self._thread = threading.Thread(target=self._run, name='session-sweeper', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep_once()
+            except Exception:
+                if self._logger is not None:
+                    self._logger.exception('清理過期會話失敗')
+
+
+def init_session_sweeper(app, db):
+    """建立會話清理並依 SESSION_SWEEP_INTERVAL 啟動背景清理（0 表示不啟動）"""
+    with app.app_context():
+        engine = db.engine
+    sweeper = SessionSweeper(
+        engine,
+        retention=timedelta(days=app.config.get('SESSION_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)),
+        batch_size=app.config.get('SESSION_SWEEP_BATCH_SIZE', DEFAULT_BATCH_SIZE),
+        interval=app.config.get('SESSION_SWEEP_INTERVAL', DEFAULT_SWEEP_INTERVAL)
+    )
+    if sweeper.interval:
+        sweeper.start(app.logger)
+    app.extensions['session_sweeper'] = sweeper
+    return sweeper
@@ -0,0 +1,172 @@
+"""
+簽章登入令牌
+AUTH_SESSION_MODE = 'token' 時，登入不寫入 user_sessions，而是簽發含用戶ID、角色、撤銷世代與令牌ID 的
+簽章令牌（itsdangerous），驗證只需檢查簽章與記憶體中的撤銷資料，不必查詢資料庫。
+
+撤銷方式：
+- 登出：令牌ID 寫入 revoked_session_tokens，到期後即可刪除
+- 停用用戶、修改密碼或角色：遞增 auth_users.session_generation，舊世代的令牌全部失效
+每個程序每隔 refresh_interval 秒從資料庫重新載入撤銷資料，其他程序的變更最多延遲這段時間生效。
+世代只會遞增（停用與重新啟用也會遞增），重新載入時與記憶體中的資料取較新的世代合併，
+載入期間本程序記錄的變更不會被較舊的資料庫快照覆蓋。
+"""
+
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from src.models.user import db
+from src.models.auth_user import AuthUser, RevokedSessionToken
+from src.services.session_cache import CachedSession
+
+TOKEN_SALT = 'auth-session-token'
+DEFAULT_MAX_AGE = 24 * 3600  # 秒
+DEFAULT_REFRESH_INTERVAL = 60.0  # 秒
+
+
+def session_mode(config):
+    """登入會話模式：'database'（user_sessions 資料表，預設）或 'token'（簽章令牌）"""
+    return config.get('AUTH_SESSION_MODE', 'database')
+
+
+class SessionTokenManager:
+    """簽發與驗證簽章令牌
+
+    驗證時使用記憶體中的用戶世代與已撤銷令牌ID；需在應用程式 context 中呼叫（過期時重新載入）
+    """
+
+    def __init__(self, secret_key, max_age=DEFAULT_MAX_AGE, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        self.serializer = URLSafeTimedSerializer(secret_key, salt=TOKEN_SALT)
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self._generations = {}  # 用戶ID -> (目前世代, 是否啟用)
+        self._revoked = {}  # 令牌ID -> 到期時間
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config['SECRET_KEY'],
+            max_age=config.get('AUTH_TOKEN_MAX_AGE', DEFAULT_MAX_AGE),
+            refresh_interval=config.get('AUTH_TOKEN_REFRESH_INTERVAL', DEFAULT_REFRESH_INTERVAL)
+        )
+
+    def issue(self, user):
+        """為用戶簽發令牌，回傳 (令牌, 到期時間)"""
+        token = self.serializer.dumps({
+            'uid': user.id,
+            'role': user.role,
+            'gen': user.session_generation or 0,
+            'jti': secrets.token_hex(16)
+        })
+        self._remember(user.id, user.session_generation or 0, True)
+        return token, datetime.utcnow() + timedelta(seconds=self.max_age)
+
+    def verify(self, token):
+        """驗證令牌，回傳 CachedSession；無效、過期或已撤銷時回傳 None"""
+        payload, issued_at = self._decode(token)
+        if payload is None:
+            return None
+
+        self._refresh_if_stale()
+        user_id = payload['uid']
+        with self._lock:
+            if payload['jti'] in self._revoked:
+                return None
+            state = self._generations.get(user_id)
+        if state is None:
+            # 其他程序剛建立的用戶
+            state = self._load_generation(user_id)
+        if state is None or not state[1] or state[0] != payload['gen']:
+            return None
+
+        expires_at = issued_at.replace(tzinfo=None) + timedelta(seconds=self.max_age)
+        return CachedSession(user_id, payload['role'], expires_at)
+
+    def revoke(self, token):
+        """撤銷單一令牌（登出），需由呼叫端提交交易"""
+        payload, issued_at = self._decode(token)
+        if payload is None:
+            return False
+        expires_at = issued_at.replace(tzinfo=None) + timedelta(seconds=self.max_age)
+        db.session.merge(RevokedSessionToken(jti=payload['jti'], user_id=payload['uid'], expires_at=expires_at))
+        with self._lock:
+            self._revoked[payload['jti']] = expires_at
+        return True
+
+    def set_generation(self, user_id, generation, is_active=True):
+        """記錄用戶的新世代與啟用狀態（AuthUser.revoke_sessions 提交後呼叫）"""
+        self._remember(user_id, generation, is_active)
+
+    def refresh(self):
+        """從資料庫重新載入用戶世代與未到期的已撤銷令牌
+
+        查詢後才記錄的較新世代（本程序的 set_generation 或 issue）優先於查詢結果
+        """
+        now = datetime.utcnow()
+        generations = {
+            user_id: (generation or 0, bool(is_active))
+            for user_id, generation, is_active in db.session.query(
+                AuthUser.id, AuthUser.session_generation, AuthUser.is_active
+            )
+        }
+        revoked = dict(
+            db.session.query(RevokedSessionToken.jti, RevokedSessionToken.expires_at)
+            .filter(RevokedSessionToken.expires_at > now)
+        )
+        with self._lock:
+            for user_id, state in self._generations.items():
+                if user_id in generations and state > generations[user_id]:
+                    generations[user_id] = state
+            self._generations = generations
+            self._revoked = revoked
+            self._loaded_at = time.monotonic()
+
+    def _refresh_if_stale(self):
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at >= self.refresh_interval:
+            self.refresh()
+
+    def _load_generation(self, user_id):
+        """查詢單一用戶的 (世代, 是否啟用)；用戶不存在時回傳 None"""
+        row = db.session.query(AuthUser.session_generation, AuthUser.is_active).filter(AuthUser.id == user_id).first()
+        if row is None:
+            return None
+        return self._remember(user_id, row[0] or 0, bool(row[1]))
+
+    def _remember(self, user_id, generation, is_active):
+        """記錄用戶狀態，只接受不比目前舊的世代；回傳記錄後的 (世代, 是否啟用)"""
+        state = (generation or 0, bool(is_active))
+        with self._lock:
+            current = self._generations.get(user_id)
+            if current is None or state >= current:
+                self._generations[user_id] = state
+            return self._generations[user_id]
+
+    def _decode(self, token):
+        try:
+            payload, issued_at = self.serializer.loads(token, max_age=self.max_age, return_timestamp=True)
+        except BadSignature:  # 包含 SignatureExpired
+            return None, None
+        if not isinstance(payload, dict) or not {'uid', 'role', 'gen', 'jti'} <= payload.keys():
+            return None, None
+        return payload, issued_at
+
+
+def get_session_tokens(app):
+    """取得應用程式共用的令牌管理器（首次呼叫時建立）"""
+    manager = app.extensions.get('session_tokens')
+    if manager is None:
+        with _create_lock:
+            manager = app.extensions.get('session_tokens')
+            if manager is None:
+                manager = SessionTokenManager.from_config(app.config)
+                app.extensions['session_tokens'] = manager
+    return manager
+
+
+_create_lock = threading.Lock()
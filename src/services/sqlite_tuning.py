@@ -0,0 +1,134 @@
+"""
+SQLite 連線設定與維護
+每條新連線套用 PRAGMA 設定（WAL、synchronous=NORMAL、mmap、快取、busy_timeout 等），
+讓公開名片頁的寫入與後台編輯可以同時進行；背景執行緒定期做 WAL checkpoint 與 PRAGMA optimize。
+"""
+
+import atexit
+import threading
+import time
+
+from sqlalchemy import event
+
+# 預設的 PRAGMA 設定；busy_timeout 放在最前面，切換 journal_mode 時也會等待鎖
+DEFAULT_PRAGMAS = {
+    'busy_timeout': 5000,  # 毫秒
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -65536,  # 負值為 KiB，約 64 MiB
+    'mmap_size': 268435456,  # 256 MiB
+    'temp_store': 'MEMORY',
+}
+
+# 記憶體資料庫不支援的設定
+FILE_ONLY_PRAGMAS = ('journal_mode', 'mmap_size')
+
+DEFAULT_CHECKPOINT_INTERVAL = 300.0
+DEFAULT_OPTIMIZE_INTERVAL = 3600.0
+
+
+def sqlite_pragmas(config):
+    """合併預設值與 SQLITE_PRAGMAS 設定；值為 None 的項目不套用"""
+    pragmas = dict(DEFAULT_PRAGMAS)
+    pragmas.update(config.get('SQLITE_PRAGMAS') or {})
+    return {name: value for name, value in pragmas.items() if value is not None}
+
+
+def is_memory_database(engine):
+    database = engine.url.database
+    return not database or database == ':memory:' or database.startswith('file::memory:')
+
+
+def install_pragmas(engine, pragmas):
+    """在 engine 建立新連線時套用 PRAGMA；非 SQLite 資料庫回傳 False"""
+    if engine.dialect.name != 'sqlite':
+        return False
+    if is_memory_database(engine):
+        pragmas = {name: value for name, value in pragmas.items() if name not in FILE_ONLY_PRAGMAS}
+    statements = [f'PRAGMA {name}={value}' for name, value in pragmas.items()]
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    # 已建立的連線不會觸發 connect 事件，丟棄後重新建立（記憶體資料庫丟棄連線會遺失資料，略過）
+    if not is_memory_database(engine):
+        engine.dispose()
+    return True
+
+
+class SQLiteMaintenance:
+    """定期執行 WAL checkpoint 與 PRAGMA optimize 的背景工作"""
+
+    def __init__(self, engine, checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL,
+                 optimize_interval=DEFAULT_OPTIMIZE_INTERVAL):
+        self.engine = engine
+        self.checkpoint_interval = checkpoint_interval
+        self.optimize_interval = optimize_interval
+        self.last_checkpoint = None
+        self._last_optimize = time.monotonic()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def checkpoint(self):
+        """將 WAL 寫回主資料庫（PASSIVE 不會阻擋讀寫），回傳 (busy, log 頁數, 已寫回頁數)"""
+        with self.engine.connect() as connection:
+            result = connection.exec_driver_sql('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+        self.last_checkpoint = tuple(result) if result else None
+        return self.last_checkpoint
+
+    def optimize(self):
+        """讓 SQLite 依查詢紀錄更新需要的統計資訊"""
+        with self.engine.connect() as connection:
+            connection.exec_driver_sql('PRAGMA optimize')
+        self._last_optimize = time.monotonic()
+
+    def run_once(self):
+        self.checkpoint()
+        if time.monotonic() - self._last_optimize >= self.optimize_interval:
+            self.optimize()
+
+    def start(self, logger=None):
+        """啟動背景執行緒"""
+        if self._thread is not None:
+            return
+        self._logger = logger
+        self._thread = threading.Thread(target=self._run, name='sqlite-maintenance', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.checkpoint_interval):
+            try:
+                self.run_once()
+            except Exception:
+                if self._logger is not None:
+                    self._logger.exception('SQLite 維護失敗')
+
+
+def init_sqlite(app, db):
+    """為應用程式的 SQLite 資料庫套用 PRAGMA 設定並啟動定期維護"""
+    with app.app_context():
+        engine = db.engine
+    if not install_pragmas(engine, sqlite_pragmas(app.config)):
+        return None
+
+    interval = app.config.get('SQLITE_CHECKPOINT_INTERVAL', DEFAULT_CHECKPOINT_INTERVAL)
+    if is_memory_database(engine) or not interval:
+        return None
+    maintenance = SQLiteMaintenance(
+        engine,
+        checkpoint_interval=interval,
+        optimize_interval=app.config.get('SQLITE_OPTIMIZE_INTERVAL', DEFAULT_OPTIMIZE_INTERVAL)
+    )
+    maintenance.start(app.logger)
+    app.extensions['sqlite_maintenance'] = maintenance
+    return maintenance
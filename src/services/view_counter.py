@@ -0,0 +1,124 @@
+"""
+瀏覽次數寫回緩衝
+公開名片頁每次瀏覽只在記憶體累加，定時或累積一定次數後以單一批次 UPDATE 寫回資料庫，
+避免每次瀏覽都佔用 SQLite 的寫入鎖。
+"""
+
+import atexit
+import threading
+from collections import Counter
+
+from flask import current_app, has_app_context
+from sqlalchemy import bindparam, func, update
+
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_FLUSH_THRESHOLD = 100
+
+
+class ViewCounter:
+    """以 key 欄位（例如 card_id）彙總瀏覽次數的寫回緩衝
+
+    每個行程各自緩衝；寫回時使用 view_count = view_count + n，
+    因此多個 worker 同時寫回也不會互相覆蓋。
+    """
+
+    def __init__(self, db, table, key_column, count_column='view_count'):
+        self.db = db
+        self.table = table
+        self.key_column = key_column
+        self.count_column = count_column
+        self._pending = Counter()
+        self._total = 0
+        self._lock = threading.Lock()
+        self._app = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def increment(self, key, amount=1):
+        """累加瀏覽次數，回傳此 key 尚未寫回的次數"""
+        with self._lock:
+            self._pending[key] += amount
+            self._total += amount
+            buffered = self._pending[key]
+            total = self._total
+
+        self._ensure_started()
+        if total >= self._config('VIEW_COUNT_FLUSH_THRESHOLD', DEFAULT_FLUSH_THRESHOLD):
+            self.flush()
+        return buffered
+
+    def pending(self, key):
+        """取得此 key 尚未寫回的次數"""
+        with self._lock:
+            return self._pending.get(key, 0)
+
+    def flush(self):
+        """將緩衝的次數以單一批次 UPDATE 寫回，回傳寫回的 key 數量"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch = self._pending
+            self._pending = Counter()
+            self._total = 0
+
+        count = self.table.c[self.count_column]
+        values = {count: func.coalesce(count, 0) + bindparam('_amount')}
+        # 瀏覽不算內容異動：onupdate 欄位（updated_at）維持原值，頁面快取與 ETag 才不會失效
+        values.update({column: column for column in self.table.c
+                       if column.onupdate is not None and column is not count})
+        statement = update(self.table).where(
+            self.table.c[self.key_column] == bindparam('_key')
+        ).values(values)
+        params = [{'_key': key, '_amount': amount} for key, amount in batch.items()]
+
+        try:
+            if has_app_context():
+                self._execute(statement, params)
+            else:
+                with self._app.app_context():
+                    self._execute(statement, params)
+        except Exception:
+            # 寫回失敗時放回緩衝，下次再試
+            with self._lock:
+                self._pending.update(batch)
+                self._total += sum(batch.values())
+            raise
+
+        return len(params)
+
+    def shutdown(self):
+        """停止背景寫回並將剩餘次數寫回"""
+        self._stop.set()
+        if self._app is not None:
+            try:
+                self.flush()
+            except Exception:
+                self._app.logger.exception('瀏覽次數寫回失敗')
+
+    def _execute(self, statement, params):
+        with self.db.engine.begin() as connection:
+            connection.execute(statement, params)
+
+    def _config(self, name, default):
+        app = current_app if has_app_context() else self._app
+        return app.config.get(name, default) if app is not None else default
+
+    def _ensure_started(self):
+        """第一次瀏覽時啟動背景寫回執行緒，並在程式結束時寫回"""
+        if self._thread is not None or not has_app_context():
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._app = current_app._get_current_object()
+            self._thread = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+            self._thread.start()
+        atexit.register(self.shutdown)
+
+    def _run(self):
+        interval = self._config('VIEW_COUNT_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                self._app.logger.exception('瀏覽次數寫回失敗')
@@ -45,6 +45,11 @@ function initializeEventListeners() {
     elements.refreshBtn.addEventListener('click', loadCustomers);
     elements.testConnectionBtn.addEventListener('click', testLineConnection);
     
+    // 客戶複選框（事件委派，分頁載入的項目也適用）
+    elements.customersContainer.addEventListener('change', (e) => {
+        if (e.target.classList.contains('customer-checkbox')) handleCustomerSelect(e);
+    });
+    
     // 表單提交
     elements.customerForm.addEventListener('submit', handleCustomerSubmit);
     
@@ -72,15 +77,43 @@ function initializeEventListeners() {
     });
 }
 
-// 載入客戶資料
+// 客戶列表只需要的欄位與每頁筆數
+const CUSTOMER_LIST_FIELDS = 'name,company,phone,email,line_user_id,contract_end_date,has_published_card';
+const CUSTOMER_PAGE_SIZE = 200;
+let customerLoadGeneration = 0;
+
+// 載入客戶資料（依游標分頁，邊載入邊顯示）
 async function loadCustomers() {
+    const generation = ++customerLoadGeneration;
+    
     try {
         showLoading();
-        const response = await fetch(`${API_BASE}/customers`);
-        if (!response.ok) throw new Error('載入客戶資料失敗');
+        customers = [];
+        let cursor = null;
+        
+        do {
+            const params = new URLSearchParams({
+                fields: CUSTOMER_LIST_FIELDS,
+                limit: CUSTOMER_PAGE_SIZE
+            });
+            if (cursor) params.set('cursor', cursor);
+            
+            const response = await fetch(`${API_BASE}/customers?${params}`);
+            if (!response.ok) throw new Error('載入客戶資料失敗');
+            
+            const page = await response.json();
+            // 載入期間若重新整理，放棄舊的載入流程
+            if (generation !== customerLoadGeneration) return;
+            
+            if (customers.length === 0) {
+                renderCustomers(page);
+            } else {
+                appendCustomers(page);
+            }
+            customers = customers.concat(page);
+            cursor = response.headers.get('X-Next-Cursor');
+        } while (cursor);
         
-        customers = await response.json();
-        renderCustomers(customers);
         updateSelectedCount();
     } catch (error) {
         console.error('載入客戶資料錯誤:', error);
@@ -100,12 +133,21 @@ function renderCustomers(customerList) {
         return;
     }
     
-    const html = customerList.map(customer => {
-        const hasCard = customer.has_published_card;
-        const cardStatus = hasCard ? '已上架' : '未上架';
-        const cardStatusClass = hasCard ? 'status-published' : 'status-unpublished';
-        
-        return `
+    elements.customersContainer.innerHTML = customerList.map(renderCustomerCard).join('');
+}
+
+// 在列表尾端加入客戶，不重繪已顯示的項目
+function appendCustomers(customerList) {
+    elements.customersContainer.insertAdjacentHTML('beforeend', customerList.map(renderCustomerCard).join(''));
+}
+
+// 產生單一客戶卡片的HTML
+function renderCustomerCard(customer) {
+    const hasCard = customer.has_published_card;
+    const cardStatus = hasCard ? '已上架' : '未上架';
+    const cardStatusClass = hasCard ? 'status-published' : 'status-unpublished';
+    
+    return `
         <div class="customer-card" data-customer-id="${customer.id}">
             <input type="checkbox" class="customer-checkbox" 
                    data-customer-id="${customer.id}"
@@ -163,14 +205,6 @@ function renderCustomers(customerList) {
             </div>
         </div>
     `;
-    }).join('');
-    
-    elements.customersContainer.innerHTML = html;
-    
-    // 綁定複選框事件
-    document.querySelectorAll('.customer-checkbox').forEach(checkbox => {
-        checkbox.addEventListener('change', handleCustomerSelect);
-    });
 }
 
 // 顯示載入中
@@ -293,13 +327,21 @@ async function handleBatchSend() {
 }
 
 // 開啟客戶模態框
-function openCustomerModal(customerId = null) {
+async function openCustomerModal(customerId = null) {
     editingCustomerId = customerId;
     
     if (customerId) {
-        // 編輯模式
-        const customer = customers.find(c => c.id === customerId);
-        if (!customer) return;
+        // 編輯模式：列表只載入部分欄位，編輯時取得完整資料
+        let customer;
+        try {
+            const response = await fetch(`${API_BASE}/customers/${customerId}`);
+            if (!response.ok) throw new Error('載入客戶資料失敗');
+            customer = await response.json();
+        } catch (error) {
+            console.error('載入客戶資料錯誤:', error);
+            showNotification('載入客戶資料失敗', 'error');
+            return;
+        }
         
         elements.modalTitle.textContent = '編輯客戶';
         fillCustomerForm(customer);
@@ -779,38 +821,3 @@ async function viewCard(customerId) {
         showNotification(error.message, 'error');
     }
 }
-
-// 更新客戶資料API，加入名片狀態檢查
-async function loadCustomers() {
-    try {
-        showLoading();
-        
-        const response = await fetch(`${API_BASE}/customers`);
-        if (!response.ok) throw new Error('載入客戶資料失敗');
-        
-        const data = await response.json();
-        customers = data;
-        
-        // 檢查每個客戶的名片狀態
-        for (let customer of customers) {
-            try {
-                const cardResponse = await fetch(`${API_BASE}/cards/get-by-customer/${customer.id}`);
-                customer.has_published_card = cardResponse.ok;
-            } catch {
-                customer.has_published_card = false;
-            }
-        }
-        
-        renderCustomers(customers);
-    } catch (error) {
-        console.error('載入客戶錯誤:', error);
-        showNotification('載入客戶資料失敗', 'error');
-        elements.customersContainer.innerHTML = `
-            <div class="error">
-                <i class="fas fa-exclamation-triangle"></i>
-                載入失敗，請重新整理頁面
-            </div>
-        `;
-    }
-}
-
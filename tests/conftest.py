@@ -0,0 +1,85 @@
+"""
+共用測試夾具
+以藍圖組成的測試應用程式：各測試模組覆寫 blueprints / app_config 等夾具，
+指定要註冊的藍圖與額外設定；app 夾具負責建立記憶體資料庫與資料表，測試結束後移除。
+需要測試資料的模組以同名夾具 app(app) 包裝後寫入。
+"""
+import pytest
+from flask import Flask
+from src.models.user import db
+from src.services.migrations import run_migrations
+
+BASE_CONFIG = {
+    'TESTING': True,
+    'SECRET_KEY': 'test-secret',
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+    'SQLALCHEMY_TRACK_MODIFICATIONS': False
+}
+
+
+def create_test_app(blueprints=(), config=None):
+    """建立註冊指定藍圖的應用程式（blueprints 為 [(藍圖, url_prefix)]）"""
+    app = Flask(__name__)
+    app.config.update(BASE_CONFIG)
+    app.config.update(config or {})
+    db.init_app(app)
+    for blueprint, url_prefix in blueprints:
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
+    return app
+
+
+@pytest.fixture
+def blueprints():
+    """要註冊的藍圖 [(藍圖, url_prefix)]"""
+    return []
+
+
+@pytest.fixture
+def app_config():
+    """額外的應用程式設定"""
+    return {}
+
+
+@pytest.fixture
+def use_migrations():
+    """以 run_migrations 建立資料表（含索引與版本紀錄），否則使用 db.create_all()"""
+    return False
+
+
+@pytest.fixture
+def push_app_context():
+    """測試期間是否維持應用程式 context
+
+    需要每個請求各自使用 context 的測試（flask.g 不可跨請求保留、串流回應）覆寫為 False
+    """
+    return True
+
+
+@pytest.fixture
+def app(blueprints, app_config, use_migrations, push_app_context):
+    """建立測試應用程式與記憶體資料庫"""
+    app = create_test_app(blueprints, app_config)
+    context = app.app_context()
+    context.push()
+    if use_migrations:
+        run_migrations(db)
+    else:
+        db.create_all()
+    if not push_app_context:
+        context.pop()
+
+    yield app
+
+    if not push_app_context:
+        context = app.app_context()
+        context.push()
+    db.session.remove()
+    db.drop_all()
+    context.pop()
+
+
+@pytest.fixture
+def client(app):
+    """建立測試客戶端"""
+    with app.test_client() as client:
+        yield client
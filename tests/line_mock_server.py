@@ -0,0 +1,128 @@
+"""
+本機模擬 LINE Messaging API 伺服器（測試與效能測試用）
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockLineServer:
+    """在背景執行緒啟動的模擬 LINE API
+
+    - latency: 每個請求的模擬延遲（秒）
+    - failures: 依序套用到前幾個請求的錯誤狀態碼，例如 [429, 500]
+    - fail_users: 永遠回傳 400 的 LINE User ID
+    - 與 LINE 相同，已接受過的 X-Line-Retry-Key 再次送出時回傳 409
+    """
+
+    def __init__(self, latency=0.0, failures=None, fail_users=None, retry_after=None):
+        self.latency = latency
+        self.failures = list(failures or [])
+        self.fail_users = set(fail_users or [])
+        self.retry_after = retry_after
+        self.requests = []
+        self.delivered = []
+        self.accepted_keys = set()
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/v2/bot'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def requests_to(self, path):
+        """取得送到指定路徑的請求內容"""
+        with self._lock:
+            return [body for request_path, body in self.requests if request_path.endswith(path)]
+
+    def delivered_to(self, path):
+        """取得實際投遞（回應 200）的請求內容"""
+        with self._lock:
+            return [body for request_path, body in self.delivered if request_path.endswith(path)]
+
+    def _record(self, path, body):
+        with self._lock:
+            self.requests.append((path, body))
+            return self.failures.pop(0) if self.failures else None
+
+    def _accept(self, path, body, retry_key):
+        """記錄投遞；retry key 已被接受過時回傳 False"""
+        with self._lock:
+            if retry_key and retry_key in self.accepted_keys:
+                return False
+            if retry_key:
+                self.accepted_keys.add(retry_key)
+            self.delivered.append((path, body))
+            return True
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # keep-alive 連線上避免 Nagle 與延遲 ACK 造成的 40 ms 等待
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self._respond(200, {'userId': 'Ubot', 'basicId': '@mock', 'displayName': 'Mock Bot'})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                status = server._record(self.path, body)
+                if server.latency:
+                    time.sleep(server.latency)
+
+                recipients = body.get('to')
+                recipients = recipients if isinstance(recipients, list) else [recipients]
+                if status is None and server.fail_users.intersection(recipients):
+                    status = 400
+
+                if status:
+                    headers = {'Retry-After': str(server.retry_after)} if status == 429 and server.retry_after else {}
+                    self._respond(status, {'message': 'mock error'}, headers)
+                elif server._accept(self.path, body, self.headers.get('X-Line-Retry-Key')):
+                    self._respond(200, {})
+                else:
+                    self._respond(409, {'message': 'The retry key is already accepted'},
+                                  {'X-Line-Accepted-Request-Id': 'mock-request-id'})
+
+            def _respond(self, status, payload, headers=None):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
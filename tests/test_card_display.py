@@ -0,0 +1,212 @@
+"""
+公開名片頁快取與條件式請求測試
+"""
+import pytest
+import json
+from src.models.user import db
+from src.models.customer import Customer
+from src.models.published_card import PublishedCard, view_counter
+from src.routes.card_display import card_display_bp
+from src.routes.card_publisher import card_publisher_bp
+from src.routes.customer import customer_bp
+from src.services.page_cache import PageCache, card_page_cache
+
+
+@pytest.fixture
+def blueprints():
+    return [(card_display_bp, None), (card_publisher_bp, '/api'), (customer_bp, '/api')]
+
+
+@pytest.fixture
+def app_config():
+    return {'VIEW_COUNT_FLUSH_THRESHOLD': 1000}
+
+
+@pytest.fixture
+def app(app):
+    """寫入一張已發布的名片"""
+    customer = Customer(name='鍾師富', company='詠順工程行', phone='0986372099')
+    db.session.add(customer)
+    db.session.flush()
+    db.session.add(PublishedCard(
+        customer_id=customer.id,
+        card_id='abc12345',
+        title='鍾師富的電子名片',
+        card_data='{}',
+        share_url='http://localhost/card/abc12345'
+    ))
+    db.session.commit()
+    card_page_cache.clear()
+    yield app
+    view_counter.flush()
+    card_page_cache.clear()
+
+
+class TestCardPageCache:
+    """名片頁快取整合測試"""
+
+    def test_second_request_hits_cache(self, client):
+        """測試第二次請求使用快取頁面"""
+        first = client.get('/card/abc12345').get_data(as_text=True)
+        hits = card_page_cache.hits
+        second = client.get('/card/abc12345').get_data(as_text=True)
+
+        assert card_page_cache.hits == hits + 1
+        assert first == second
+
+    def test_customer_update_invalidates_page(self, client):
+        """測試更新客戶資料後頁面重新渲染"""
+        client.get('/card/abc12345')
+        customer = Customer.query.first()
+
+        client.put(f'/api/customers/{customer.id}',
+                   data=json.dumps({'company': '詠順抓漏工程'}),
+                   content_type='application/json')
+
+        assert '詠順抓漏工程' in client.get('/card/abc12345').get_data(as_text=True)
+
+    def test_unpublish_removes_page(self, client):
+        """測試下架後不再提供快取頁面"""
+        client.get('/card/abc12345')
+        customer = Customer.query.first()
+
+        client.post(f'/api/cards/unpublish/{customer.id}')
+
+        assert client.get('/card/abc12345').status_code == 404
+        assert len(card_page_cache) == 0
+
+
+class TestConditionalGet:
+    """ETag / Last-Modified 條件式請求測試"""
+
+    def test_validators_and_cache_control(self, client):
+        """測試回應帶有快取標頭"""
+        response = client.get('/card/abc12345')
+
+        assert response.status_code == 200
+        assert response.headers['ETag'].startswith('"')
+        assert 'Last-Modified' in response.headers
+        assert response.headers['Cache-Control'].startswith('public')
+
+    def test_if_none_match_returns_304(self, client):
+        """測試 ETag 相符時回傳 304 且不重新渲染"""
+        etag = client.get('/card/abc12345').headers['ETag']
+        card_page_cache.clear()
+
+        response = client.get('/card/abc12345', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+        assert len(card_page_cache) == 0
+
+    def test_if_modified_since_returns_304(self, client):
+        """測試 Last-Modified 未變動時回傳 304"""
+        last_modified = client.get('/card/abc12345').headers['Last-Modified']
+
+        response = client.get('/card/abc12345', headers={'If-Modified-Since': last_modified})
+
+        assert response.status_code == 304
+
+    def test_customer_update_changes_etag(self, client):
+        """測試客戶資料更新後 ETag 改變"""
+        etag = client.get('/card/abc12345').headers['ETag']
+        customer = Customer.query.first()
+        client.put(f'/api/customers/{customer.id}',
+                   data=json.dumps({'company': '詠順抓漏工程'}),
+                   content_type='application/json')
+
+        response = client.get('/card/abc12345', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_every_request_counts_a_view(self, client):
+        """測試不執行 JavaScript 的請求與 304 也記錄瀏覽，頁尾次數另外取得"""
+        etag = client.get('/card/abc12345').headers['ETag']
+        assert client.get('/card/abc12345', headers={'If-None-Match': etag}).status_code == 304
+
+        response = client.get('/card/abc12345/view')
+        assert json.loads(response.data)['view_count'] == 2
+        assert response.headers['Cache-Control'] == 'no-store'
+        assert json.loads(client.get('/card/abc12345/view').data)['view_count'] == 2
+        assert client.get('/card/missing/view').status_code == 404
+
+    def test_view_count_flush_keeps_etag(self, client):
+        """測試瀏覽次數寫回不改變 updated_at，快取頁面與 304 仍然有效"""
+        etag = client.get('/card/abc12345').headers['ETag']
+        view_counter.flush()
+        misses = card_page_cache.misses
+
+        response = client.get('/card/abc12345', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert card_page_cache.misses == misses
+
+    def test_template_change_changes_etag(self, client, monkeypatch):
+        """測試樣板內容改變時 ETag 隨之改變，不需手動調整版本"""
+        etag = client.get('/card/abc12345').headers['ETag']
+        loader = client.application.jinja_env.loader
+        get_source = loader.get_source
+
+        def changed_source(environment, template):
+            source, filename, uptodate = get_source(environment, template)
+            return source + '<!-- changed -->', filename, uptodate
+
+        monkeypatch.setattr(loader, 'get_source', changed_source)
+        client.application.extensions['card_page_version']['mtime'] = 0
+
+        response = client.get('/card/abc12345', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+
+class TestCardEscaping:
+    """名片頁跳脫測試"""
+
+    def test_customer_fields_are_escaped(self, client):
+        """測試客戶資料中的 HTML 與 JavaScript 不會在公開名片頁執行"""
+        customer = Customer.query.first()
+        client.put(f'/api/customers/{customer.id}', data=json.dumps({
+            'name': '<script>alert(1)</script>',
+            'company': "詠順'); alert(2); ('",
+            'website': 'javascript:alert(3)'
+        }), content_type='application/json')
+
+        html = client.get('/card/abc12345').get_data(as_text=True)
+
+        assert '<script>alert(1)</script>' not in html
+        assert '&lt;script&gt;alert(1)&lt;/script&gt;' in html
+        assert "alert(2); ('" not in html
+        assert '\\u0027); alert(2); (\\u0027' in html
+        assert '官方網站' not in html
+        assert 'window.open("javascript' not in html
+
+
+class TestPageCache:
+    """PageCache 單元測試"""
+
+    def test_version_mismatch_is_a_miss(self):
+        cache = PageCache()
+        cache.set('a', 1, '<html>')
+        assert cache.get('a', 1) == '<html>'
+        assert cache.get('a', 2) is None
+
+    def test_evicts_least_recently_used_by_size(self):
+        cache = PageCache(max_bytes=10)
+        cache.set('a', 1, '1234')
+        cache.set('b', 1, '1234')
+        cache.get('a', 1)
+        cache.set('c', 1, '1234')
+
+        assert cache.get('b', 1) is None
+        assert cache.get('a', 1) == '1234'
+        assert cache.size == 8
+
+    def test_invalidate_customer(self):
+        cache = PageCache()
+        cache.set('a', 1, 'x', customer_id=1)
+        cache.set('b', 1, 'y', customer_id=2)
+        cache.invalidate_customer(1)
+
+        assert len(cache) == 1
+        assert cache.get('b', 1) == 'y'
@@ -0,0 +1,174 @@
+"""
+客戶資料匯出測試
+"""
+import pytest
+import csv
+import gzip
+import io
+import json
+from datetime import date
+from src.models.user import db
+from src.models.auth_user import AuthUser
+from src.models.customer import Customer
+from src.routes.auth import auth_bp
+from src.routes.customer import customer_bp
+from src.services.customer_export import csv_escape_formula, csv_unescape_formula, vcard_fold
+from src.services.session_cache import session_cache
+
+
+@pytest.fixture
+def blueprints():
+    return [(auth_bp, '/api/auth'), (customer_bp, '/api')]
+
+
+@pytest.fixture
+def app_config():
+    return {'CUSTOMER_EXPORT_BATCH_SIZE': 7}
+
+
+@pytest.fixture
+def push_app_context():
+    # 串流回應在請求結束後才產生內容，每個請求使用各自的應用程式 context
+    return False
+
+
+@pytest.fixture
+def app(app):
+    """寫入用戶與客戶"""
+    with app.app_context():
+        for username, role in (('admin', 'admin'), ('sales', 'sales')):
+            user = AuthUser(username=username, email=f'{username}@example.com', full_name=username, role=role)
+            user.set_password('password123')
+            db.session.add(user)
+        for i in range(25):
+            db.session.add(Customer(name=f'客戶{i}', phone=f'09{i:08d}', company=f'公司{i}'))
+        db.session.add(Customer(
+            name='王, 小明', email='ming@example.com', address='台北市信義區;測試路1號',
+            website='https://example.com/a,b', notes='第一行\n' + '很長的備註' * 20,
+            contract_end_date=date(2026, 6, 30)
+        ))
+        db.session.commit()
+    session_cache.clear()
+    yield app
+    session_cache.clear()
+
+
+def login(app, username):
+    client = app.test_client()
+    response = client.post('/api/auth/login',
+                           data=json.dumps({'username': username, 'password': 'password123'}),
+                           content_type='application/json')
+    assert response.status_code == 200
+    return client
+
+
+class TestCustomerExport:
+    """匯出端點測試"""
+
+    def test_requires_export_permission(self, app):
+        """測試未登入與沒有 export_data 權限的用戶無法匯出"""
+        assert app.test_client().get('/api/customers/export').status_code == 401
+        assert login(app, 'sales').get('/api/customers/export').status_code == 403
+
+    def test_csv_export(self, app):
+        """測試 CSV 匯出為串流回應，欄位名稱與匯入相同"""
+        response = login(app, 'admin').get('/api/customers/export')
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        assert 'attachment; filename="customers-' in response.headers['Content-Disposition']
+
+        text = response.data.decode('utf-8')
+        assert text.startswith('\ufeff')
+        rows = list(csv.DictReader(io.StringIO(text[1:])))
+        assert len(rows) == 26
+        assert rows[0]['name'] == '客戶0'
+        assert rows[-1]['name'] == '王, 小明'
+        assert rows[-1]['notes'].startswith('第一行\n')
+        assert rows[-1]['contract_end_date'] == '2026-06-30'
+        assert rows[0]['email'] == ''
+
+    def test_ndjson_export_with_fields(self, app):
+        """測試 NDJSON 匯出與欄位篩選"""
+        client = login(app, 'admin')
+        response = client.get('/api/customers/export?format=ndjson&fields=name,phone')
+
+        lines = response.data.decode('utf-8').splitlines()
+        assert response.mimetype == 'application/x-ndjson'
+        assert len(lines) == 26
+        assert json.loads(lines[1]) == {'id': 2, 'name': '客戶1', 'phone': '0900000001'}
+
+        assert client.get('/api/customers/export?format=ndjson&fields=password').status_code == 400
+        assert client.get('/api/customers/export?format=xml').status_code == 400
+
+    def test_vcard_export(self, app):
+        """測試多聯絡人 vCard 的跳脫與折行"""
+        response = login(app, 'admin').get('/api/customers/export?format=vcf')
+
+        data = response.data.decode('utf-8')
+        assert response.mimetype == 'text/vcard'
+        assert data.count('BEGIN:VCARD\r\n') == 26
+        assert 'FN:王\\, 小明\r\n' in data
+        assert 'ADR;TYPE=WORK:;;台北市信義區\\;測試路1號;;;;\r\n' in data
+        assert 'URL:https://example.com/a,b\r\n' in data
+        assert all(len(line.encode('utf-8')) <= 75 for line in data.split('\r\n'))
+        unfolded = data.replace('\r\n ', '')
+        assert 'NOTE:第一行\\n' + '很長的備註' * 20 + '\r\n' in unfolded
+
+    def test_gzip_when_accepted(self, app):
+        """測試用戶端接受 gzip 時即時壓縮"""
+        client = login(app, 'admin')
+        plain = client.get('/api/customers/export?format=ndjson').data
+        response = client.get('/api/customers/export?format=ndjson', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.vary
+        assert gzip.decompress(response.data) == plain
+
+        response = client.get('/api/customers/export', headers={'Accept-Encoding': 'gzip;q=0'})
+        assert 'Content-Encoding' not in response.headers
+
+    def test_csv_formulas_escaped(self, app):
+        """測試以公式字元開頭的文字加上 ' 前綴，可關閉；重新匯入時還原"""
+        with app.app_context():
+            db.session.add(Customer(name='=HYPERLINK("http://evil.example","點我")', phone='+886912345678',
+                                    company='@SUM(A1)', notes='-2+3'))
+            db.session.commit()
+        client = login(app, 'admin')
+
+        text = client.get('/api/customers/export?fields=name,phone,company,notes').data.decode('utf-8')
+        row = list(csv.DictReader(io.StringIO(text[1:])))[-1]
+        assert row == {'id': '27', 'name': '\'=HYPERLINK("http://evil.example","點我")', 'phone': "'+886912345678",
+                       'company': "'@SUM(A1)", 'notes': "'-2+3"}
+
+        app.config['CUSTOMER_EXPORT_CSV_ESCAPE_FORMULAS'] = False
+        text = client.get('/api/customers/export?fields=name,phone').data.decode('utf-8')
+        assert list(csv.DictReader(io.StringIO(text[1:])))[-1]['phone'] == '+886912345678'
+
+
+class TestCsvFormulaEscape:
+    """CSV 公式跳脫測試"""
+
+    def test_escape_round_trip(self):
+        """測試跳脫後可還原，一般文字不變"""
+        for value in ('=1+1', '+886912345678', '-5', '@A1', '\t=1', '王小明', "'單引號", ''):
+            assert csv_unescape_formula(csv_escape_formula(value)) == value
+        assert csv_escape_formula('王小明') == '王小明'
+        assert csv_escape_formula('=1+1') == "'=1+1"
+
+
+class TestVcardFold:
+    """vCard 折行測試"""
+
+    def test_fold_keeps_multibyte_characters(self):
+        """測試折行不切斷中文字，每行不超過 75 個位元組"""
+        line = 'NOTE:' + '客戶備註abc' * 30
+        folded = vcard_fold(line)
+
+        parts = folded[:-2].split('\r\n')
+        assert len(parts) > 1
+        assert all(len(part.encode('utf-8')) <= 75 for part in parts)
+        assert all(part.startswith(' ') for part in parts[1:])
+        assert folded[:-2].replace('\r\n ', '') == line
+        assert vcard_fold('FN:王小明') == 'FN:王小明\r\n'
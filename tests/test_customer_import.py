@@ -0,0 +1,176 @@
+"""
+客戶批次匯入測試
+"""
+import pytest
+import io
+import json
+from datetime import date
+from sqlalchemy import event
+from src.models.user import db
+from src.models.auth_user import AuthUser
+from src.models.customer import Customer
+from src.routes.auth import auth_bp
+from src.routes.customer import customer_bp
+from src.services.customer_import import CustomerImporter, iter_csv
+
+
+@pytest.fixture
+def blueprints():
+    return [(auth_bp, '/api/auth'), (customer_bp, '/api')]
+
+
+@pytest.fixture
+def app_config():
+    return {'CUSTOMER_IMPORT_CHUNK_SIZE': 100}
+
+
+@pytest.fixture
+def app(app):
+    """寫入可匯入客戶的用戶與沒有客戶管理權限的用戶"""
+    for username, role in (('sales', 'sales'), ('designer', 'designer')):
+        user = AuthUser(username=username, email=f'{username}@example.com', full_name=username, role=role)
+        user.set_password('password123')
+        db.session.add(user)
+    db.session.commit()
+    return app
+
+
+def login(app, username='sales'):
+    client = app.test_client()
+    response = client.post('/api/auth/login',
+                           data=json.dumps({'username': username, 'password': 'password123'}),
+                           content_type='application/json')
+    assert response.status_code == 200
+    return client
+
+
+def upload(client, content, filename='customers.csv', query=''):
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return client.post(f'/api/customers/bulk{query}',
+                       data={'file': (io.BytesIO(content), filename)},
+                       content_type='multipart/form-data')
+
+
+class TestBulkImport:
+    """批次匯入端點測試"""
+
+    def test_requires_customer_management(self, app):
+        """測試未登入與沒有客戶管理權限的用戶無法匯入"""
+        assert upload(app.test_client(), 'name\n客戶甲\n').status_code == 401
+        assert upload(login(app, 'designer'), 'name\n客戶甲\n').status_code == 403
+        assert Customer.query.count() == 0
+
+    def test_import_with_row_errors(self, app):
+        """測試有效資料列寫入，無效資料列回報列號與原因"""
+        content = (
+            '\ufeff姓名,電話,Email,合約到期日,未知欄位\n'
+            '王小明,0912345678,ming@example.com,2025/12/31,x\n'
+            ',0900000000,,,\n'
+            '\n'
+            '陳大華,0922222222,not-an-email,,\n'
+            '林美玲,,,2025-13-01,\n'
+            '"張, 志強",0933333333,,20260105,\n'
+        )
+        response = upload(login(app), content)
+
+        assert response.status_code == 200
+        result = json.loads(response.data)
+        assert result['total'] == 5
+        assert result['inserted'] == 2
+        assert result['failed'] == 3
+        assert [e['row'] for e in result['errors']] == [3, 5, 6]
+        assert result['ignored_columns'] == ['未知欄位']
+
+        customers = Customer.query.order_by(Customer.id).all()
+        assert [c.name for c in customers] == ['王小明', '張, 志強']
+        assert customers[0].contract_end_date == date(2025, 12, 31)
+        assert customers[1].contract_end_date == date(2026, 1, 5)
+        assert customers[0].created_at is not None
+
+    def test_chunked_executemany(self, app):
+        """測試每批以一次 INSERT 寫入"""
+        content = 'name,phone\n' + ''.join(f'客戶{i},09{i:08d}\n' for i in range(250))
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith('INSERT INTO customers'):
+                statements.append(executemany)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = upload(login(app), content)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        assert json.loads(response.data)['inserted'] == 250
+        assert statements == [True, True, True]
+        assert Customer.query.count() == 250
+
+    def test_raw_csv_body_and_dry_run(self, app):
+        """測試直接上傳 text/csv 內容，以及只驗證不寫入"""
+        client = login(app)
+        body = 'name,company\n客戶甲,甲公司\n客戶乙,乙公司\n'.encode('utf-8')
+
+        response = client.post('/api/customers/bulk?dry_run=1', data=body, content_type='text/csv')
+        assert json.loads(response.data)['inserted'] == 2
+        assert Customer.query.count() == 0
+
+        response = client.post('/api/customers/bulk', data=body, content_type='text/csv')
+        assert json.loads(response.data)['inserted'] == 2
+        assert Customer.query.count() == 2
+
+    def test_count_cache_invalidated(self, app):
+        """測試匯入後列表總筆數立即更新"""
+        client = login(app)
+        response = client.get('/api/customers?limit=10')
+        assert response.headers['X-Total-Count'] == '0'
+
+        upload(client, 'name\n客戶甲\n客戶乙\n')
+        response = client.get('/api/customers?limit=10')
+        assert response.headers['X-Total-Count'] == '2'
+
+    def test_rejects_invalid_files(self, app):
+        """測試缺少姓名欄位、空檔案與不支援的編碼"""
+        client = login(app)
+        assert upload(client, 'phone\n0912345678\n').status_code == 400
+        assert upload(client, '').status_code == 400
+        assert upload(client, 'name\n客戶\n', query='?encoding=nope').status_code == 400
+        assert client.post('/api/customers/bulk', data='{}', content_type='application/json').status_code == 400
+
+    def test_exported_formula_prefix_removed(self, app):
+        """測試匯出 CSV 時加上的公式跳脫前綴在匯入時去掉"""
+        content = "name,phone,notes\n'=王小明,'+886912345678,'單引號開頭\n"
+        assert json.loads(upload(login(app), content).data)['inserted'] == 1
+
+        customer = Customer.query.one()
+        assert (customer.name, customer.phone, customer.notes) == ('=王小明', '+886912345678', "'單引號開頭")
+
+    def test_legacy_encoding(self, app):
+        """測試以 cp950 編碼的 CSV（舊版 Excel 匯出）"""
+        response = upload(login(app), '姓名,公司\n王小明,測試公司\n'.encode('cp950'), query='?encoding=cp950')
+
+        assert json.loads(response.data)['inserted'] == 1
+        assert Customer.query.one().company == '測試公司'
+
+
+class TestCustomerImporter:
+    """匯入器測試"""
+
+    def test_errors_are_capped(self, app):
+        """測試錯誤訊息數量有上限，避免大檔案的錯誤清單佔用記憶體"""
+        importer = CustomerImporter(db.engine, Customer.__table__, max_errors=5)
+        content = 'name,email\n' + 'x,bad\n' * 50
+
+        result = importer.run(iter_csv(io.BytesIO(content.encode('utf-8'))))
+        assert result['failed'] == 50
+        assert len(result['errors']) == 5
+        assert result['errors_truncated']
+
+    def test_field_length_validated(self, app):
+        """測試超過欄位長度的值回報為該列的錯誤"""
+        importer = CustomerImporter(db.engine, Customer.__table__)
+        result = importer.run([['name', 'phone'], ['客戶', '0' * 21], ['客戶二', '0912']])
+
+        assert result['inserted'] == 1
+        assert 'phone' in result['errors'][0]['error']
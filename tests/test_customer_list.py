@@ -0,0 +1,160 @@
+"""
+客戶列表查詢效能測試（藍圖版 routes/customer.py）
+"""
+import pytest
+import json
+from sqlalchemy import event
+from src.models.user import db
+from src.models.customer import Customer
+from src.models.published_card import PublishedCard
+from src.routes.customer import customer_bp
+from src.services.pagination import CountCache
+
+
+@pytest.fixture
+def blueprints():
+    return [(customer_bp, '/api')]
+
+
+def seed_customers(count):
+    """建立指定數量的客戶，偶數客戶附帶已發布名片"""
+    for i in range(count):
+        customer = Customer(name=f'客戶{i}', phone=f'09{i:08d}')
+        db.session.add(customer)
+        db.session.flush()
+        if i % 2 == 0:
+            db.session.add(PublishedCard(
+                customer_id=customer.id,
+                card_id=f'card{customer.id}',
+                title=f'客戶{i}的電子名片',
+                card_data='{}',
+                share_url=f'http://localhost/card/card{customer.id}'
+            ))
+    db.session.commit()
+
+
+def count_queries(app, func):
+    """計算執行 func 期間發出的 SQL 數量"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        result = func()
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return result, len(statements)
+
+
+class TestCustomerListQueries:
+    """客戶列表查詢數量測試"""
+
+    def test_has_published_card_flag(self, app):
+        """測試名片旗標正確"""
+        seed_customers(4)
+        client = app.test_client()
+
+        data = json.loads(client.get('/api/customers').data)
+        flags = {c['name']: c['has_published_card'] for c in data}
+        assert flags == {'客戶0': True, '客戶1': False, '客戶2': True, '客戶3': False}
+
+    def test_inactive_card_not_counted(self, app):
+        """測試已下架名片不計入"""
+        seed_customers(1)
+        PublishedCard.query.update({'is_active': False})
+        db.session.commit()
+        client = app.test_client()
+
+        data = json.loads(client.get('/api/customers').data)
+        assert data[0]['has_published_card'] is False
+
+    def test_constant_query_count(self, app):
+        """測試查詢數量不隨客戶數量增加"""
+        client = app.test_client()
+
+        seed_customers(5)
+        db.session.expire_all()
+        _, small = count_queries(app, lambda: client.get('/api/customers'))
+
+        seed_customers(200)
+        db.session.expire_all()
+        response, large = count_queries(app, lambda: client.get('/api/customers'))
+
+        assert len(json.loads(response.data)) == 205
+        assert small == large
+        assert large <= 2
+
+
+class TestCustomerListPagination:
+    """客戶列表分頁與欄位投影測試"""
+
+    def test_keyset_pages_cover_all_rows(self, app):
+        """測試依游標翻頁可取得全部客戶且不重複"""
+        seed_customers(7)
+        client = app.test_client()
+
+        ids = []
+        url = '/api/customers?limit=3'
+        while True:
+            response = client.get(url)
+            assert response.headers['X-Total-Count'] == '7'
+            ids.extend(c['id'] for c in json.loads(response.data))
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+            url = f'/api/customers?limit=3&cursor={cursor}'
+
+        assert ids == sorted(ids)
+        assert len(ids) == 7
+
+    def test_sort_by_updated_at(self, app):
+        """測試依更新時間排序翻頁"""
+        seed_customers(5)
+        client = app.test_client()
+
+        first = client.get('/api/customers?limit=2&sort=updated_at&fields=name')
+        second = client.get(f"/api/customers?limit=10&sort=updated_at&fields=name&cursor={first.headers['X-Next-Cursor']}")
+
+        names = [c['name'] for c in json.loads(first.data) + json.loads(second.data)]
+        assert names == ['客戶4', '客戶3', '客戶2', '客戶1', '客戶0']
+
+    def test_fields_projection(self, app):
+        """測試只回傳指定欄位"""
+        seed_customers(2)
+        client = app.test_client()
+
+        data = json.loads(client.get('/api/customers?fields=name,has_published_card').data)
+        assert set(data[0]) == {'id', 'name', 'has_published_card'}
+
+    def test_invalid_arguments(self, app):
+        """測試不合法的參數"""
+        client = app.test_client()
+
+        assert client.get('/api/customers?fields=password').status_code == 400
+        assert client.get('/api/customers?limit=abc').status_code == 400
+        assert client.get('/api/customers?cursor=not-a-cursor').status_code == 400
+
+
+class TestCountCache:
+    """總筆數快取測試"""
+
+    def test_entries_are_bounded(self):
+        """測試不同搜尋字串的快取筆數有上限，淘汰最久未使用的項目"""
+        cache = CountCache(ttl=60, max_entries=3)
+        for term in ('a', 'b', 'c'):
+            cache.get(term, lambda: 1)
+        cache.get('a', lambda: 2)  # 命中，成為最近使用
+        cache.get('d', lambda: 4)
+
+        assert list(cache._entries) == ['c', 'a', 'd']
+        assert cache.get('a', lambda: 99) == 1
+        assert cache.get('b', lambda: 5) == 5
+
+    def test_expired_entry_reloaded(self):
+        """測試過期項目重新計算"""
+        cache = CountCache(ttl=0)
+        assert cache.get('x', lambda: 1) == 1
+        assert cache.get('x', lambda: 2) == 2
@@ -0,0 +1,73 @@
+"""
+客戶全文檢索測試
+"""
+import pytest
+import json
+from src.models.user import db
+from src.models.customer import Customer
+from src.routes.customer import customer_bp
+from src.services.customer_search import fts_match_clause, search_customer_ids
+
+
+@pytest.fixture
+def blueprints():
+    return [(customer_bp, '/api')]
+
+
+@pytest.fixture
+def app(app):
+    """寫入搜尋用的客戶"""
+    for name, company, notes in [
+        ('鍾師富', '詠順工程行', '抓漏專家'),
+        ('王小明', '明日科技有限公司', None),
+        ('李大華', '大華工程顧問', '詠順工程行的合作夥伴'),
+    ]:
+        db.session.add(Customer(name=name, company=company, notes=notes))
+    db.session.commit()
+    return app
+
+
+def search(client, query):
+    response = client.get('/api/customers/search', query_string={'q': query})
+    assert response.status_code == 200
+    return [c['name'] for c in json.loads(response.data)]
+
+
+class TestCustomerSearch:
+    """全文檢索API測試"""
+
+    def test_ranked_results(self, client):
+        """測試依相關度排序，公司名稱相符優先於備註相符"""
+        assert search(client, '詠順工程') == ['鍾師富', '李大華']
+
+    def test_index_follows_update_and_delete(self, client):
+        """測試修改與刪除後索引同步"""
+        customer = Customer.query.filter_by(name='王小明').first()
+        customer.company = '詠順工程行台北分公司'
+        db.session.commit()
+        assert '王小明' in search(client, '詠順工程')
+
+        db.session.delete(customer)
+        db.session.commit()
+        assert '王小明' not in search(client, '詠順工程')
+
+    def test_short_query_falls_back_to_like(self, client):
+        """測試少於三個字的查詢改用 LIKE"""
+        assert search(client, '小明') == ['王小明']
+
+    def test_search_customer_ids_uses_index(self, client):
+        """測試全文索引可用時回傳排序後的ID"""
+        ids = search_customer_ids(db.session, Customer.__table__, '工程行')
+        assert ids is not None and len(ids) == 2
+
+
+class TestMatchClause:
+    """MATCH 語法轉換測試"""
+
+    def test_quotes_terms(self):
+        assert fts_match_clause('詠順工程 0986') == '"詠順工程" AND "0986"'
+        assert fts_match_clause('a"bc') == '"a""bc"'
+
+    def test_short_terms(self):
+        assert fts_match_clause('王') is None
+        assert fts_match_clause('  ') is None
@@ -0,0 +1,84 @@
+"""
+電子名片 Flex Message 快取測試
+"""
+import json
+from flask import Flask
+from src.services.flex_builder import FlexMessageCache, build_business_card_flex_message
+from src.services.line_service import LineService
+from tests.line_mock_server import MockLineServer
+
+CUSTOMER = {
+    'name': '鍾師富',
+    'position': '負責人',
+    'company': '詠順工程行',
+    'phone': '0912-345-678',
+    'website': 'https://example.com',
+    'email': 'owner@example.com'
+}
+
+
+class TestFlexMessageCache:
+    """Flex Message 快取測試"""
+
+    def test_same_fields_reuse_cached_message(self):
+        """測試相同欄位只建立一次"""
+        cache = FlexMessageCache()
+        first = cache.get(CUSTOMER)
+        second = cache.get(dict(CUSTOMER))
+
+        assert first is second
+        assert first == build_business_card_flex_message(CUSTOMER)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_unused_fields_do_not_affect_key(self):
+        """測試名片未使用的欄位變更時仍命中快取"""
+        cache = FlexMessageCache()
+        cache.get(CUSTOMER)
+        cache.get(dict(CUSTOMER, email='other@example.com', notes='備註'))
+
+        assert cache.hits == 1
+
+    def test_changed_fields_rebuild_message(self):
+        """測試名片欄位變更時重新建立"""
+        cache = FlexMessageCache()
+        cache.get(CUSTOMER)
+        message = cache.get(dict(CUSTOMER, phone='02-1234-5678'))
+
+        assert cache.misses == 2
+        assert message['contents']['footer']['contents'][0]['action']['uri'] == 'tel:02-1234-5678'
+
+    def test_lru_eviction(self):
+        """測試超過上限時淘汰最久未使用的項目"""
+        cache = FlexMessageCache(max_entries=2)
+        for name in ('A', 'B', 'A', 'C'):
+            cache.get(dict(CUSTOMER, name=name))
+
+        assert len(cache) == 2
+        cache.get(dict(CUSTOMER, name='A'))
+        cache.get(dict(CUSTOMER, name='B'))
+        assert cache.misses == 4
+
+    def test_serialized_json_matches_message(self):
+        """測試快取的 JSON bytes 與 dict 內容一致"""
+        cache = FlexMessageCache()
+
+        assert json.loads(cache.get_json(CUSTOMER)) == cache.get(CUSTOMER)
+
+
+class TestPreSerializedSend:
+    """已序列化訊息的發送測試"""
+
+    def test_push_accepts_serialized_messages(self):
+        """測試 bytes 訊息直接拼接進請求內容"""
+        with MockLineServer() as server:
+            app = Flask(__name__)
+            app.config['LINE_CHANNEL_ACCESS_TOKEN'] = 'test-token'
+            app.config['LINE_API_BASE_URL'] = server.base_url
+            with app.app_context():
+                line_service = LineService()
+                payload = b'[' + line_service.create_business_card_flex_json(CUSTOMER) + b']'
+                line_service.send_push_message('U0001', payload)
+
+            body = server.requests_to('/message/push')[0]
+            assert body['to'] == 'U0001'
+            assert body['messages'] == [build_business_card_flex_message(CUSTOMER)]
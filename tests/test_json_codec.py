@@ -0,0 +1,87 @@
+"""
+JSON 編解碼層測試
+"""
+import pytest
+import json
+from datetime import datetime
+from flask import Flask, jsonify
+from src.services import json_codec
+
+
+class TestJsonCodec:
+    """編解碼測試"""
+
+    def test_round_trip_keeps_unicode(self):
+        """測試中文不跳脫且可還原"""
+        data = {'name': '鍾師富', 'tags': ['水電', 1, None, True]}
+        raw = json_codec.dumps_bytes(data)
+
+        assert '鍾師富'.encode('utf-8') in raw
+        assert json_codec.loads(raw) == data
+        assert json.loads(json_codec.dumps(data)) == data
+
+    def test_sort_keys(self):
+        """測試 sort_keys 產生穩定輸出"""
+        assert json_codec.dumps({'b': 1, 'a': 2}, sort_keys=True) == '{"a":2,"b":1}'
+
+    def test_falls_back_for_unsupported_values(self):
+        """測試 orjson 不支援的大整數改用標準函式庫"""
+        assert json_codec.loads(json_codec.dumps_bytes({'n': 2 ** 70})) == {'n': 2 ** 70}
+
+    def test_default_handles_custom_types(self):
+        """測試 default 可處理自訂型別"""
+        raw = json_codec.dumps({'at': datetime(2024, 1, 2, 3, 4, 5)}, default=lambda value: value.isoformat())
+        assert json.loads(raw) == {'at': '2024-01-02T03:04:05'}
+
+
+class TestStdlibFallback:
+    """未安裝 orjson 時的標準函式庫實作測試"""
+
+    @pytest.fixture(autouse=True)
+    def without_orjson(self, monkeypatch):
+        monkeypatch.setattr(json_codec, 'orjson', None)
+
+    def test_round_trip_keeps_unicode(self):
+        """測試輸出與 orjson 相同：精簡、不跳脫中文"""
+        data = {'name': '鍾師富', 'tags': ['水電', 1, None, True], 'n': 2 ** 70}
+        raw = json_codec.dumps_bytes(data)
+
+        assert raw == '{"name":"鍾師富","tags":["水電",1,null,true],"n":1180591620717411303424}'.encode('utf-8')
+        assert json_codec.dumps(data) == raw.decode('utf-8')
+        assert json_codec.loads(raw) == data
+        assert json_codec.dumps({'b': 1, 'a': 2}, sort_keys=True) == '{"a":2,"b":1}'
+
+    def test_dumps_with_raw(self):
+        """測試拼接已序列化的欄位"""
+        raw = json_codec.dumps_with_raw({'id': 1}, {'flex': '{"type":"bubble"}'})
+        assert json.loads(raw) == {'id': 1, 'flex': {'type': 'bubble'}}
+
+    def test_jsonify(self):
+        """測試 Flask JSON 回應"""
+        app = Flask('fallback')
+        json_codec.init_app(app)
+
+        with app.app_context():
+            response = jsonify({'name': '名片'})
+
+        assert response.get_data() == '{"name":"名片"}'.encode('utf-8')
+
+
+class TestFlaskProvider:
+    """Flask JSON 回應測試"""
+
+    def test_jsonify_matches_flask_output(self):
+        """測試 jsonify 的結果與 Flask 預設相同（日期仍為 HTTP 日期格式）"""
+        payload = {'name': '名片', 'created_at': datetime(2024, 1, 2, 3, 4, 5), 'id': 7}
+        default_app = Flask('default')
+        codec_app = Flask('codec')
+        json_codec.init_app(codec_app)
+
+        with default_app.app_context():
+            expected = jsonify(payload).get_json()
+        with codec_app.app_context():
+            response = jsonify(payload)
+
+        assert response.mimetype == 'application/json'
+        assert response.get_json() == expected
+        assert '名片'.encode('utf-8') in response.get_data()
@@ -0,0 +1,87 @@
+"""
+LINE 設定檔快取與原子寫入測試
+"""
+import json
+import os
+import threading
+import pytest
+from src.services.line_config_store import LineConfigStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """建立使用暫存目錄的設定存取器"""
+    return LineConfigStore(tmp_path / 'config' / 'line_config.json')
+
+
+def write_raw(store, config):
+    os.makedirs(os.path.dirname(store.path), exist_ok=True)
+    with open(store.path, 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+
+
+class TestLineConfigStore:
+    """設定存取器測試"""
+
+    def test_missing_file_returns_empty_config(self, store):
+        """測試設定檔不存在時回傳空設定"""
+        assert store.load() == {}
+
+    def test_parsed_config_is_cached(self, store):
+        """測試檔案未變更時不重新讀取"""
+        write_raw(store, {'access_token': 'token-1', 'channel_secret': 'secret-1'})
+
+        for _ in range(5):
+            assert store.load()['access_token'] == 'token-1'
+        assert store.loads == 1
+
+    def test_reloads_when_file_changes(self, store):
+        """測試檔案被其他程序取代後重新讀取"""
+        write_raw(store, {'access_token': 'token-1'})
+        store.load()
+
+        replacement = store.path + '.new'
+        with open(replacement, 'w', encoding='utf-8') as f:
+            json.dump({'access_token': 'token-2'}, f)
+        os.replace(replacement, store.path)
+
+        assert store.load()['access_token'] == 'token-2'
+        assert store.loads == 2
+
+    def test_save_updates_cache_without_reload(self, store):
+        """測試寫入後直接更新快取，且不留下暫存檔"""
+        store.save({'access_token': 'token-3', 'channel_secret': 'secret-3'})
+
+        assert store.load()['access_token'] == 'token-3'
+        assert store.loads == 0
+        assert os.listdir(os.path.dirname(store.path)) == ['line_config.json']
+
+    def test_returned_config_is_a_copy(self, store):
+        """測試修改回傳值不影響快取"""
+        store.save({'access_token': 'token-4'})
+        store.load()['access_token'] = 'changed'
+
+        assert store.load()['access_token'] == 'token-4'
+
+    def test_readers_never_see_partial_writes(self, store):
+        """測試並行寫入時讀取端總是取得完整設定"""
+        store.save({'access_token': 'token-0', 'channel_secret': 'x' * 4096})
+        errors = []
+        done = threading.Event()
+
+        def reader():
+            while not done.is_set():
+                fresh = LineConfigStore(store.path).load()
+                if len(fresh.get('channel_secret', '')) != 4096:
+                    errors.append(fresh)
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for i in range(200):
+            store.save({'access_token': f'token-{i}', 'channel_secret': 'x' * 4096})
+        done.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
@@ -0,0 +1,78 @@
+"""
+LINE 共用 HTTP 連線池測試（使用本機模擬 LINE 伺服器）
+"""
+import pytest
+import requests
+from src.routes.line_config import line_config_bp
+from src.services.line_http import LineHTTPClient, get_line_http
+from src.services.line_service import LineService
+from tests.line_mock_server import MockLineServer
+
+
+@pytest.fixture
+def line_server():
+    """啟動模擬 LINE 伺服器"""
+    with MockLineServer() as server:
+        yield server
+
+
+@pytest.fixture
+def blueprints():
+    return [(line_config_bp, '/api')]
+
+
+@pytest.fixture
+def app_config(line_server, monkeypatch):
+    monkeypatch.setenv('LINE_CHANNEL_ACCESS_TOKEN', 'test-token')
+    return {'LINE_CHANNEL_ACCESS_TOKEN': 'test-token', 'LINE_API_BASE_URL': line_server.base_url}
+
+
+@pytest.fixture
+def app(app):
+    """測試結束後關閉連線池"""
+    yield app
+    if 'line_http' in app.extensions:
+        app.extensions['line_http'].close()
+
+
+class TestLineHTTPClient:
+    """連線池測試"""
+
+    def test_connections_are_reused(self, app, line_server):
+        """測試多次發送共用同一條 keep-alive 連線"""
+        with app.app_context():
+            for i in range(10):
+                LineService().send_push_message(f'U{i:04d}', [{'type': 'text', 'text': 'hi'}])
+            stats = get_line_http(app).stats()
+
+        assert len(line_server.requests_to('/message/push')) == 10
+        assert line_server.connections == 1
+        assert stats == {'requests': 10, 'connections': 1, 'reused': 9}
+
+    def test_services_share_one_client(self, app):
+        """測試同一應用程式的 LineService 共用連線池"""
+        with app.app_context():
+            assert LineService().http is LineService().http
+
+    def test_read_timeout(self, line_server):
+        """測試伺服器回應過慢時觸發讀取逾時"""
+        line_server.latency = 0.5
+        client = LineHTTPClient(read_timeout=0.1)
+
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            client.post(f'{line_server.base_url}/message/push', json={'to': 'U1', 'messages': []})
+        client.close()
+
+
+class TestConnectionCheck:
+    """LINE 設定頁的連線測試"""
+
+    def test_connection_uses_shared_client(self, app):
+        """測試連線測試經由共用連線池呼叫 Bot Info API"""
+        client = app.test_client()
+
+        response = client.post('/api/line/test-connection')
+
+        assert response.status_code == 200
+        assert response.get_json()['bot_info']['basicId'] == '@mock'
+        assert get_line_http(app).stats()['requests'] == 1
@@ -0,0 +1,157 @@
+"""
+LINE 批量推播測試（使用本機模擬 LINE 伺服器）
+"""
+import pytest
+import json
+import time
+from src.models.user import db
+from src.models.customer import Customer
+from src.routes.line_service import line_bp
+from src.services.line_push import PushSender, TokenBucket
+from tests.line_mock_server import MockLineServer
+
+
+@pytest.fixture
+def line_server():
+    """啟動模擬 LINE 伺服器"""
+    with MockLineServer() as server:
+        yield server
+
+
+@pytest.fixture
+def blueprints():
+    return [(line_bp, '/api')]
+
+
+@pytest.fixture
+def app_config(line_server):
+    return {
+        'LINE_CHANNEL_ACCESS_TOKEN': 'test-token',
+        'LINE_API_BASE_URL': line_server.base_url,
+        'LINE_PUSH_BACKOFF_BASE': 0.01
+    }
+
+
+@pytest.fixture
+def app(app):
+    """寫入有 LINE 帳號與沒有 LINE 帳號的客戶"""
+    for i in range(1, 11):
+        db.session.add(Customer(name=f'客戶{i}', line_user_id=f'U{i:04d}'))
+    db.session.add(Customer(name='沒有LINE的客戶'))
+    db.session.commit()
+    return app
+
+
+def send_batch(client, customer_ids, **extra):
+    response = client.post('/api/line/send-card-batch',
+                           data=json.dumps(dict(extra, customer_ids=customer_ids)),
+                           content_type='application/json')
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+
+class TestSendCardBatch:
+    """批量發送API測試"""
+
+    def test_reports_every_recipient_in_order(self, client, line_server):
+        """測試每位收件人都有結果且順序與請求相同"""
+        data = send_batch(client, [3, 1, 11, 999, 2])
+
+        assert [r['customer_id'] for r in data['results']] == [3, 1, 11, 999, 2]
+        assert [r['success'] for r in data['results']] == [True, True, False, False, True]
+        assert data['summary'] == {'total': 5, 'success': 3, 'error': 2}
+        assert sorted(body['to'] for body in line_server.requests_to('/message/push')) == ['U0001', 'U0002', 'U0003']
+
+    def test_retries_rate_limit_and_server_errors(self, client, line_server):
+        """測試 429 與 5xx 會重試"""
+        line_server.failures = [429, 503]
+
+        data = send_batch(client, [1])
+
+        assert data['results'][0]['success'] is True
+        assert data['results'][0]['attempts'] == 3
+
+    def test_client_errors_are_not_retried(self, client, line_server):
+        """測試 4xx 錯誤不重試"""
+        line_server.fail_users = {'U0002'}
+
+        data = send_batch(client, [1, 2])
+
+        assert data['results'][0]['success'] is True
+        assert data['results'][1]['success'] is False
+        assert data['results'][1]['attempts'] == 1
+
+    def test_shared_template_uses_multicast(self, client, line_server):
+        """測試共用範本的批量發送以一次 multicast 完成"""
+        template = {'type': 'flex', 'altText': '活動邀請', 'contents': {'type': 'bubble'}}
+
+        data = send_batch(client, [1, 2, 3, 11], flex_message=template)
+
+        assert [r['success'] for r in data['results']] == [True, True, True, False]
+        assert [r.get('method') for r in data['results'][:3]] == ['multicast'] * 3
+        assert line_server.requests_to('/message/push') == []
+        multicasts = line_server.requests_to('/message/multicast')
+        assert len(multicasts) == 1
+        assert multicasts[0]['to'] == ['U0001', 'U0002', 'U0003']
+        assert multicasts[0]['messages'] == [template]
+
+
+class TestMulticastPlan:
+    """multicast 分組測試"""
+
+    def test_identical_payloads_are_chunked_by_500(self):
+        """測試相同內容依 500 人一組分批，個人化內容仍使用 push"""
+        shared = [{'type': 'text', 'text': '電子名片'}]
+        jobs = [{'key': i, 'to': f'U{i}', 'messages': shared} for i in range(1200)]
+        jobs.append({'key': 'solo', 'to': 'Usolo', 'messages': [{'type': 'text', 'text': '個人訊息'}]})
+
+        units = PushSender(None).plan(jobs)
+
+        assert [(unit['method'], len(unit['keys'])) for unit in units] == [
+            ('multicast', 500), ('multicast', 500), ('multicast', 200), ('push', 1)
+        ]
+
+    def test_multicast_can_be_disabled(self):
+        """測試關閉 multicast 時全部使用 push"""
+        shared = [{'type': 'text', 'text': '電子名片'}]
+        jobs = [{'key': i, 'to': f'U{i}', 'messages': shared} for i in range(3)]
+
+        units = PushSender(None, use_multicast=False).plan(jobs)
+
+        assert [unit['method'] for unit in units] == ['push'] * 3
+
+    def test_multicast_has_its_own_rate_limit(self):
+        """測試 multicast 使用獨立的 token bucket，不佔用 push 的額度"""
+        class RecordingService:
+            def send_push_message(self, to, messages, retry_key=None):
+                pass
+
+            def send_multicast_message(self, to, messages, retry_key=None):
+                pass
+
+        sender = PushSender.from_config(RecordingService(), {
+            'LINE_PUSH_RATE_LIMIT': 1000, 'LINE_MULTICAST_RATE_LIMIT': 5
+        })
+        assert sender.bucket.rate == 1000
+        assert sender.multicast_bucket.rate == 5
+
+        shared = [{'type': 'text', 'text': '電子名片'}]
+        jobs = [{'key': i, 'to': f'U{i}', 'messages': shared} for i in range(4)]
+        sender.send(jobs)
+
+        assert sender.multicast_bucket._tokens < 5
+        assert sender.bucket._tokens == 1000
+
+
+class TestTokenBucket:
+    """速率限制測試"""
+
+    def test_limits_rate_after_burst(self):
+        bucket = TokenBucket(rate=50, capacity=5)
+        start = time.monotonic()
+        for _ in range(15):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        # 前 5 個立即取得，其餘 10 個以每秒 50 個的速率發放
+        assert elapsed >= 0.18
@@ -0,0 +1,71 @@
+"""
+單體版（src/main.py）客戶列表測試
+前端 script.js 與藍圖版共用同一組 fields=，單體版須能處理。
+"""
+import pytest
+import json
+import re
+import os
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from src import main
+from src.main import app, db, Customer, PublishedCard
+
+SCRIPT_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'static', 'script.js')
+
+
+def script_list_fields():
+    """script.js 載入客戶列表時要求的欄位"""
+    with open(SCRIPT_PATH, encoding='utf-8') as f:
+        return re.search(r"const CUSTOMER_LIST_FIELDS = '([^']+)'", f.read()).group(1)
+
+
+@pytest.fixture
+def client():
+    """單體版應用程式改用記憶體資料庫，不動到 src/database/app.db"""
+    engines = db._app_engines[app]
+    original = dict(engines)
+    engines[None] = create_engine('sqlite://', poolclass=StaticPool)
+    main.get_count_cache(app, 'customers').invalidate()
+    try:
+        with app.app_context():
+            db.create_all()
+            customers = [Customer(name='王小明', company='甲公司'), Customer(name='陳大華')]
+            db.session.add_all(customers)
+            db.session.flush()
+            db.session.add(PublishedCard(customer_id=customers[0].id, title='名片', card_data='{}',
+                                         share_url='/card/abc12345'))
+            db.session.commit()
+        with app.test_client() as client:
+            yield client
+    finally:
+        with app.app_context():
+            db.session.remove()
+        engines[None].dispose()
+        engines.clear()
+        engines.update(original)
+        main.get_count_cache(app, 'customers').invalidate()
+
+
+class TestMonolithCustomerList:
+    """單體版客戶列表測試"""
+
+    def test_script_list_fields(self, client):
+        """測試 script.js 要求的欄位可用：has_published_card 由 EXISTS 計算，單體版沒有的欄位略過"""
+        response = client.get(f'/api/customers?fields={script_list_fields()}&limit=200')
+
+        assert response.status_code == 200
+        assert response.headers['X-Total-Count'] == '2'
+        rows = json.loads(response.data)
+        assert [row['has_published_card'] for row in rows] == [True, False]
+        assert 'contract_end_date' not in rows[0]
+        assert rows[0]['company'] == '甲公司'
+
+    def test_unknown_field_rejected(self, client):
+        """測試兩個版本都沒有的欄位仍回傳 400"""
+        assert client.get('/api/customers?fields=name,password').status_code == 400
+
+    def test_default_fields_unchanged(self, client):
+        """測試未指定 fields 時只回傳資料表欄位"""
+        rows = json.loads(client.get('/api/customers').data)
+        assert 'has_published_card' not in rows[0]
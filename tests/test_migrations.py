@@ -0,0 +1,77 @@
+"""
+資料庫遷移與索引測試（EXPLAIN QUERY PLAN）
+"""
+import pytest
+from datetime import datetime
+from sqlalchemy import inspect, text
+from src.models.user import db
+from src.models.customer import Customer
+from src.models.published_card import PublishedCard
+from src.models.auth_user import AuthUser, UserSession
+from src.services.migrations import MIGRATIONS, run_migrations
+
+
+@pytest.fixture
+def use_migrations():
+    return True
+
+
+def query_plan(query):
+    """取得 ORM 查詢的 SQLite 查詢計畫"""
+    sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).fetchall()
+    return ' | '.join(row[-1] for row in rows)
+
+
+HOT_QUERIES = {
+    'published_card_by_customer': lambda: PublishedCard.query.filter_by(customer_id=1, is_active=True),
+    'published_card_by_card_id': lambda: PublishedCard.query.filter_by(card_id='abc12345'),
+    'published_card_by_share_url': lambda: PublishedCard.query.filter_by(share_url='http://localhost/card/abc12345'),
+    'customer_by_name': lambda: Customer.query.filter_by(name='鍾師富'),
+    'customer_by_name_phone': lambda: Customer.query.filter_by(name='鍾師富', phone='0986372099'),
+    'session_by_token': lambda: UserSession.query.filter_by(session_token='token', is_active=True),
+    'user_by_username': lambda: AuthUser.query.filter_by(username='admin'),
+    'expired_sessions': lambda: UserSession.query.filter(UserSession.expires_at < datetime(2024, 1, 1)),
+}
+
+
+class TestMigrations:
+    """遷移測試"""
+
+    @pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+    def test_hot_query_uses_index(self, app, name):
+        """測試常用查詢都使用索引而非全表掃描"""
+        plan = query_plan(HOT_QUERIES[name]())
+
+        assert 'USING INDEX' in plan or 'USING COVERING INDEX' in plan, plan
+
+    def test_migrations_are_recorded_once(self, app):
+        """測試已套用的遷移不會重複執行"""
+        versions = db.session.execute(text('SELECT version FROM schema_migrations')).scalars().all()
+
+        assert versions == [version for version, _, _ in MIGRATIONS]
+        assert run_migrations(db) == []
+
+    def test_adds_indexes_to_existing_database(self, app):
+        """測試舊資料庫（未建立索引）啟動時補上索引"""
+        db.session.execute(text('DROP INDEX ix_customers_name_phone'))
+        db.session.execute(text('DELETE FROM schema_migrations'))
+        db.session.commit()
+        assert 'SCAN customers' in query_plan(Customer.query.filter_by(name='鍾師富'))
+
+        assert run_migrations(db) == [version for version, _, _ in MIGRATIONS]
+        names = {index['name'] for index in inspect(db.engine).get_indexes('customers')}
+        assert 'ix_customers_name_phone' in names
+
+    def test_adds_session_generation_column(self, app):
+        """測試舊的 auth_users 資料表補上 session_generation 欄位"""
+        db.session.execute(text('ALTER TABLE auth_users DROP COLUMN session_generation'))
+        db.session.execute(text("DELETE FROM schema_migrations WHERE version = '0002_auth_session_generation'"))
+        db.session.execute(text(
+            "INSERT INTO auth_users (username, email, password_hash, full_name, role) "
+            "VALUES ('admin', 'admin@example.com', 'x', '管理員', 'admin')"
+        ))
+        db.session.commit()
+
+        assert run_migrations(db) == ['0002_auth_session_generation']
+        assert AuthUser.query.filter_by(username='admin').one().session_generation == 0
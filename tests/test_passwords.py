@@ -0,0 +1,160 @@
+"""
+密碼雜湊測試
+"""
+import pytest
+import json
+import hashlib
+import threading
+from src.models.user import db
+from src.models.auth_user import AuthUser
+from src.routes.auth import auth_bp
+from src.services import passwords
+from src.services.passwords import HashingBusy, PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    """使用低成本參數的密碼雜湊（測試用）"""
+    hasher = PasswordHasher(method='scrypt', scrypt_n=2 ** 10, max_workers=2)
+    previous = passwords.set_password_hasher(hasher)
+    yield hasher
+    passwords.set_password_hasher(previous)
+    hasher.shutdown()
+
+
+@pytest.fixture
+def blueprints():
+    return [(auth_bp, '/api/auth')]
+
+
+@pytest.fixture
+def app(app, hasher):
+    """測試期間使用低成本的密碼雜湊"""
+    return app
+
+
+def login(client, username, password):
+    return client.post('/api/auth/login',
+                       data=json.dumps({'username': username, 'password': password}),
+                       content_type='application/json')
+
+
+class TestPasswordHasher:
+    """密碼雜湊測試"""
+
+    def test_hash_and_verify(self, hasher):
+        """測試雜湊含鹽且可驗證"""
+        first = hasher.hash('password123')
+        second = hasher.hash('password123')
+
+        assert first.startswith('scrypt:1024:8:1$')
+        assert first != second
+        assert hasher.verify('password123', first)
+        assert not hasher.verify('wrong', first)
+        assert not hasher.verify('password123', '')
+
+    def test_rehash_when_parameters_change(self, hasher):
+        """測試舊演算法、舊參數與舊版 SHA-256 雜湊需要重新雜湊"""
+        pbkdf2 = PasswordHasher(method='pbkdf2', pbkdf2_iterations=1000, max_workers=0).hash('password123')
+        weaker = PasswordHasher(method='scrypt', scrypt_n=2 ** 9, max_workers=0).hash('password123')
+        legacy = hashlib.sha256(b'password123').hexdigest()
+
+        for old in (pbkdf2, weaker, legacy):
+            assert hasher.needs_rehash(old)
+            valid, new_hash = hasher.verify_and_update('password123', old)
+            assert valid
+            assert new_hash.startswith(hasher.method_string + '$')
+            assert not hasher.needs_rehash(new_hash)
+
+        assert hasher.verify_and_update('wrong', legacy) == (False, None)
+        assert hasher.verify_and_update('password123', hasher.hash('password123'))[1] is None
+
+    def test_rejects_when_queue_full(self):
+        """測試排隊超過上限時拋出 HashingBusy，而不是無限等待"""
+        hasher = PasswordHasher(method='scrypt', scrypt_n=2 ** 10, max_workers=1, max_pending=1)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return True
+
+        worker = threading.Thread(target=hasher._run, args=(slow,))
+        worker.start()
+        try:
+            assert started.wait(5)
+            with pytest.raises(HashingBusy):
+                hasher.hash('password123')
+        finally:
+            release.set()
+            worker.join()
+        assert hasher.verify('password123', hasher.hash('password123'))
+        hasher.shutdown()
+
+    def test_unknown_method_rejected(self):
+        """測試不支援的演算法"""
+        with pytest.raises(ValueError):
+            PasswordHasher(method='md5')
+
+
+class TestLoginRehash:
+    """登入時重新雜湊測試"""
+
+    def test_legacy_hash_upgraded_on_login(self, app, hasher):
+        """測試舊版 SHA-256 密碼登入後改存新的雜湊"""
+        user = AuthUser(username='admin', email='admin@example.com', full_name='管理員', role='admin',
+                        password_hash=hashlib.sha256(b'password123').hexdigest())
+        db.session.add(user)
+        db.session.commit()
+
+        client = app.test_client()
+        assert login(client, 'admin', 'wrong').status_code == 401
+        assert login(client, 'admin', 'password123').status_code == 200
+
+        db.session.expire_all()
+        upgraded = AuthUser.query.filter_by(username='admin').one().password_hash
+        assert upgraded.startswith(hasher.method_string + '$')
+        assert login(app.test_client(), 'admin', 'password123').status_code == 200
+
+    def test_busy_login_returns_503(self, app, monkeypatch):
+        """測試雜湊排隊已滿時登入回傳 503"""
+        user = AuthUser(username='admin', email='admin@example.com', full_name='管理員', role='admin')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+
+        def busy(self, password):
+            raise HashingBusy('登入請求過多，請稍後再試')
+
+        monkeypatch.setattr(AuthUser, 'check_password', busy)
+        response = login(app.test_client(), 'admin', 'password123')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+
+    def test_busy_password_changes_return_503(self, app, monkeypatch):
+        """測試建立用戶、更新用戶與修改密碼在雜湊排隊已滿時同樣回傳 503"""
+        user = AuthUser(username='admin', email='admin@example.com', full_name='管理員', role='admin')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+        client = app.test_client()
+        assert login(client, 'admin', 'password123').status_code == 200
+
+        def busy(self, password):
+            raise HashingBusy('登入請求過多，請稍後再試')
+
+        monkeypatch.setattr(AuthUser, 'set_password', busy)
+        monkeypatch.setattr(AuthUser, 'check_password', busy)
+        new_user = {'username': 'sales', 'email': 'sales@example.com', 'password': 'password123',
+                    'full_name': '業務', 'role': 'sales'}
+        responses = [
+            client.post('/api/auth/users', data=json.dumps(new_user), content_type='application/json'),
+            client.put(f'/api/auth/users/{user.id}', data=json.dumps({'password': 'new-password'}),
+                       content_type='application/json'),
+            client.post('/api/auth/change-password',
+                        data=json.dumps({'old_password': 'password123', 'new_password': 'new-password'}),
+                        content_type='application/json')
+        ]
+        assert [response.status_code for response in responses] == [503, 503, 503]
+        assert all(response.headers['Retry-After'] == '1' for response in responses)
@@ -0,0 +1,102 @@
+"""
+角色權限表測試
+"""
+import pytest
+import json
+import os
+from flask import Flask
+from src.models.auth_user import AuthUser
+from src.services import permissions
+from src.services.permissions import PermissionTable, get_permission_table, load_permission_table
+
+
+@pytest.fixture
+def app():
+    """建立測試應用程式"""
+    return Flask(__name__)
+
+
+@pytest.fixture
+def restore_table():
+    """測試後還原權限表"""
+    table = get_permission_table()
+    yield
+    permissions.set_permission_table(table)
+
+
+class TestPermissionTable:
+    """權限表測試"""
+
+    def test_builtin_roles(self):
+        """測試內建角色的權限"""
+        table = get_permission_table()
+
+        assert table.has('admin', 'user_management')
+        assert not table.has('developer', 'user_management')
+        assert table.has('sales', 'card_publish')
+        assert not table.has('sales', 'card_design')
+        assert table.has('designer', 'card_import')
+        assert not table.has('designer', 'export_data')
+        assert not table.has('unknown', 'card_publish')
+        assert not table.has('admin', 'no_such_permission')
+
+    def test_user_permissions_use_table(self):
+        """測試 AuthUser 的權限與角色名稱來自權限表"""
+        user = AuthUser(role='sales')
+        permissions_dict = user.get_permissions()
+
+        assert list(permissions_dict) == list(get_permission_table().permissions)
+        assert permissions_dict['view_statistics'] is True
+        assert permissions_dict['line_config'] is False
+        assert user.has_permission('customer_management')
+        assert user.get_role_name() == '業務員'
+
+        # 回傳的 dict 可修改，不影響權限表
+        permissions_dict['line_config'] = True
+        assert not user.has_permission('line_config')
+
+    def test_default_role(self):
+        """測試未知角色沿用預設角色"""
+        table = PermissionTable({'viewer': {'permissions': ['read']}, 'editor': {'permissions': ['read', 'write']}},
+                                default_role='viewer')
+
+        assert table.permissions == ('read', 'write')
+        assert table.has('someone', 'read')
+        assert not table.has('someone', 'write')
+        assert dict(table.view('someone')) == {'read': True, 'write': False}
+
+    def test_undefined_permission_rejected(self):
+        """測試角色使用未定義的權限時拒絕載入"""
+        with pytest.raises(ValueError):
+            PermissionTable({'admin': {'permissions': ['typo']}}, permissions=['customer_management'])
+
+    def test_load_from_file(self, tmp_path, app, restore_table):
+        """測試由設定檔新增角色，不必修改程式"""
+        path = tmp_path / 'permissions.json'
+        path.write_text(json.dumps({
+            'roles': {
+                'admin': {'name': '管理員', 'permissions': {'user_management': True, 'view_statistics': True}},
+                'auditor': {'name': '稽核人員', 'permissions': ['view_statistics']}
+            }
+        }, ensure_ascii=False), encoding='utf-8')
+        app.config['PERMISSIONS_FILE'] = str(path)
+        table = permissions.init_app(app)
+
+        assert table is get_permission_table()
+        assert table.roles == ('admin', 'auditor')
+        assert table.has('auditor', 'view_statistics')
+        assert not table.has('auditor', 'user_management')
+        assert AuthUser(role='auditor').get_role_name() == '稽核人員'
+        assert load_permission_table(str(path)).view('auditor') == table.view('auditor')
+
+    def test_monolith_permissions_file(self):
+        """測試單體版（src/main.py）的角色設定檔，未知角色視為業務員"""
+        path = os.path.join(os.path.dirname(__file__), '..', 'src', 'config', 'permissions_monolith.json')
+        table = load_permission_table(path, default_role='sales')
+
+        assert table.roles == ('admin', 'developer', 'sales', 'designer')
+        assert table.has('admin', 'system_config')
+        assert not table.has('developer', 'user_management')
+        assert table.has('someone', 'statistics')
+        assert not table.has('someone', 'card_design')
+        assert table.role_name('designer') == '美工人員'
@@ -0,0 +1,84 @@
+"""
+上架名片列表測試
+"""
+import pytest
+import json
+from sqlalchemy import event
+from src.models.user import db
+from src.models.customer import Customer
+from src.models.published_card import PublishedCard
+from src.routes.card_publisher import card_publisher_bp
+
+
+@pytest.fixture
+def blueprints():
+    return [(card_publisher_bp, '/api')]
+
+
+@pytest.fixture
+def app(app):
+    """寫入五張已發布的名片"""
+    for i in range(5):
+        customer = Customer(name=f'客戶{i}', company='詠順工程行', notes='不應出現在列表')
+        db.session.add(customer)
+        db.session.flush()
+        db.session.add(PublishedCard(
+            customer_id=customer.id,
+            card_id=f'card{customer.id}',
+            title=f'客戶{i}的電子名片',
+            card_data=json.dumps({'type': 'flex', 'altText': f'客戶{i}'}, ensure_ascii=False),
+            share_url=f'http://localhost/card/card{customer.id}'
+        ))
+    db.session.commit()
+    return app
+
+
+def get_with_statements(app, url):
+    """發出請求並記錄執行的 SQL"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = app.test_client().get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200
+    return json.loads(response.data), statements
+
+
+class TestPublishedCardList:
+    """名片列表測試"""
+
+    def test_summary_uses_single_query_without_card_data(self, app):
+        """測試列表只發出一次查詢，且不讀取 card_data"""
+        db.session.expunge_all()
+        data, statements = get_with_statements(app, '/api/cards/published')
+
+        assert len(statements) == 1
+        assert 'card_data' not in statements[0]
+        assert len(data['cards']) == 5
+        card = data['cards'][0]
+        assert 'card_data' not in card
+        assert card['customer']['name'].startswith('客戶')
+        assert 'notes' not in card['customer']
+
+    def test_include_card_data_splices_raw_json(self, app):
+        """測試 include=card_data 時附上名片內容"""
+        db.session.expunge_all()
+        data, statements = get_with_statements(app, '/api/cards/published?include=card_data')
+
+        assert len(statements) == 1
+        alt_texts = sorted(card['card_data']['altText'] for card in data['cards'])
+        assert alt_texts == [f'客戶{i}' for i in range(5)]
+        assert data['success'] is True
+
+    def test_detail_endpoint_keeps_full_card(self, app):
+        """測試單張名片仍回傳完整資料"""
+        response = app.test_client().get('/api/cards/published/1')
+
+        card = json.loads(response.data)['card']
+        assert card['card_data'] == {'type': 'flex', 'altText': '客戶0'}
+        assert card['customer']['notes'] == '不應出現在列表'
@@ -0,0 +1,135 @@
+"""
+LINE 批量發送工作佇列測試（使用本機模擬 LINE 伺服器）
+"""
+import pytest
+import json
+from datetime import datetime, timedelta
+from src.models.user import db
+from src.models.customer import Customer
+from src.models.send_job import SendJob, SendTask
+from src.routes.line_service import line_bp
+from src.services.line_service import LineService
+from src.services.send_queue import SendJobWorker
+from tests.line_mock_server import MockLineServer
+
+
+@pytest.fixture
+def line_server():
+    """啟動模擬 LINE 伺服器"""
+    with MockLineServer() as server:
+        yield server
+
+
+@pytest.fixture
+def blueprints():
+    return [(line_bp, '/api')]
+
+
+@pytest.fixture
+def app_config(line_server):
+    return {
+        'LINE_CHANNEL_ACCESS_TOKEN': 'test-token',
+        'LINE_API_BASE_URL': line_server.base_url,
+        'LINE_PUSH_BACKOFF_BASE': 0.01,
+        'LINE_JOB_CHUNK_SIZE': 2
+    }
+
+
+@pytest.fixture
+def app(app):
+    """寫入有 LINE 帳號與沒有 LINE 帳號的客戶"""
+    for i in range(1, 6):
+        db.session.add(Customer(name=f'客戶{i}', line_user_id=f'U{i:04d}'))
+    db.session.add(Customer(name='沒有LINE的客戶'))
+    db.session.commit()
+    return app
+
+
+def create_job(client, customer_ids, **extra):
+    response = client.post('/api/line/send-jobs',
+                           data=json.dumps(dict(extra, customer_ids=customer_ids)),
+                           content_type='application/json')
+    assert response.status_code == 202
+    return json.loads(response.data)
+
+
+def poll(client, job_id):
+    response = client.get(f'/api/line/send-jobs/{job_id}?results=1')
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+
+class TestSendJobs:
+    """背景發送工作測試"""
+
+    def test_create_returns_job_id_without_sending(self, app, line_server):
+        """測試建立工作立即回傳，尚未呼叫 LINE API"""
+        client = app.test_client()
+        job = create_job(client, [1, 2, 6, 999])
+
+        assert job['status'] == 'queued'
+        assert job['progress'] == {'total': 4, 'sent': 0, 'failed': 2, 'pending': 2}
+        assert line_server.requests == []
+
+    def test_worker_processes_job(self, app, line_server):
+        """測試 worker 發送後可查詢進度與每位收件人的結果"""
+        client = app.test_client()
+        job = create_job(client, [3, 1, 6, 2])
+
+        assert SendJobWorker(app, LineService).run_once() == job['job_id']
+
+        data = poll(client, job['job_id'])
+        assert data['status'] == 'completed'
+        assert data['progress'] == {'total': 4, 'sent': 3, 'failed': 1, 'pending': 0}
+        assert [r['customer_id'] for r in data['results']] == [3, 1, 6, 2]
+        assert [r['status'] for r in data['results']] == ['sent', 'sent', 'failed', 'sent']
+        assert sorted(body['to'] for body in line_server.delivered_to('/message/push')) == ['U0001', 'U0002', 'U0003']
+
+    def test_shared_template_job_uses_multicast(self, app, line_server):
+        """測試共用範本的工作以 multicast 發送"""
+        client = app.test_client()
+        template = {'type': 'flex', 'altText': '活動邀請', 'contents': {'type': 'bubble'}}
+        job = create_job(client, [1, 2, 3, 4, 5], flex_message=template)
+
+        SendJobWorker(app, LineService).run_once()
+
+        assert poll(client, job['job_id'])['progress']['sent'] == 5
+        assert [len(body['to']) for body in line_server.delivered_to('/message/multicast')] == [5]
+
+    def test_active_job_is_not_claimed_twice(self, app):
+        """測試租約有效期間其他 worker 無法領取同一工作"""
+        job = create_job(app.test_client(), [1])
+
+        assert SendJobWorker(app, LineService).claim() == job['job_id']
+        assert SendJobWorker(app, LineService).claim() is None
+
+    def test_resume_after_crash_does_not_double_send(self, app, line_server, monkeypatch):
+        """測試 worker 在送出後、記錄結果前中斷，接手的 worker 不會重複投遞"""
+        client = app.test_client()
+        job = create_job(client, [1, 2, 3, 4, 5])
+
+        crashed = SendJobWorker(app, LineService, worker_id='crashed')
+        def crash(job_id):
+            raise RuntimeError('worker killed')
+        monkeypatch.setattr(crashed, '_renew', crash)
+        with pytest.raises(RuntimeError):
+            crashed.run_once()
+        db.session.rollback()
+        assert SendTask.query.filter_by(status='sending').count() == 2
+
+        # 租約過期後由其他 worker 接手
+        db.session.get(SendJob, job['job_id']).locked_until = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        assert SendJobWorker(app, LineService).run_once() == job['job_id']
+
+        data = poll(client, job['job_id'])
+        assert data['status'] == 'completed'
+        assert data['progress']['sent'] == 5
+        delivered = sorted(body['to'] for body in line_server.delivered_to('/message/push'))
+        assert delivered == ['U0001', 'U0002', 'U0003', 'U0004', 'U0005']
+        assert len(line_server.requests_to('/message/push')) == 7
+
+    def test_unknown_job_returns_404(self, app):
+        """測試查詢不存在的工作"""
+        response = app.test_client().get('/api/line/send-jobs/missing')
+        assert response.status_code == 404
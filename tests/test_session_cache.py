@@ -0,0 +1,166 @@
+"""
+登入會話快取測試
+"""
+import pytest
+import json
+from datetime import datetime, timedelta
+from flask import jsonify
+from sqlalchemy import event
+from src.models.user import db
+from src.models.auth_user import AuthUser
+from src.routes.auth import auth_bp, get_current_user, require_permission
+from src.services.session_cache import CachedSession, SessionCache, session_cache
+
+
+@pytest.fixture
+def blueprints():
+    return [(auth_bp, '/api/auth')]
+
+
+@pytest.fixture
+def push_app_context():
+    # 每個請求使用各自的應用程式 context（與實際執行時相同，flask.g 不會跨請求保留）
+    return False
+
+
+@pytest.fixture
+def app(app):
+    """加入需要權限的測試路由並寫入用戶"""
+    @app.route('/api/profile')
+    @require_permission('customer_management')
+    def profile():
+        # 同一個請求中多次取得用戶
+        return jsonify({'id': get_current_user().id, 'same': get_current_user() is get_current_user()})
+
+    with app.app_context():
+        for username, role in (('admin', 'admin'), ('sales', 'sales')):
+            user = AuthUser(username=username, email=f'{username}@example.com', full_name=username, role=role)
+            user.set_password('password123')
+            db.session.add(user)
+        db.session.commit()
+    session_cache.clear()
+    yield app
+    session_cache.clear()
+
+
+def user_id(app, username):
+    with app.app_context():
+        return AuthUser.query.filter_by(username=username).one().id
+
+
+def login(app, username):
+    client = app.test_client()
+    response = client.post('/api/auth/login',
+                           data=json.dumps({'username': username, 'password': 'password123'}),
+                           content_type='application/json')
+    assert response.status_code == 200
+    return client
+
+
+@pytest.fixture
+def statements(app):
+    """記錄執行的 SQL"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+class TestSessionCache:
+    """快取本身的測試"""
+
+    def test_ttl_and_expiry(self):
+        """測試超過 ttl 或會話到期後不再命中"""
+        cache = SessionCache(ttl=60)
+        cache.set('a', CachedSession(1, 'admin', datetime.utcnow() + timedelta(hours=1)))
+        cache.set('b', CachedSession(1, 'admin', datetime.utcnow() - timedelta(seconds=1)))
+        assert cache.get('a').role == 'admin'
+        assert cache.get('b') is None
+
+        cache.ttl = 0
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+    def test_lru_eviction_and_invalidate_user(self):
+        """測試超過上限時淘汰最久未使用的項目，並可移除用戶的所有會話"""
+        cache = SessionCache(max_entries=2)
+        expires_at = datetime.utcnow() + timedelta(hours=1)
+        cache.set('a', CachedSession(1, 'admin', expires_at))
+        cache.set('b', CachedSession(2, 'sales', expires_at))
+        cache.get('a')
+        cache.set('c', CachedSession(1, 'admin', expires_at))
+        assert cache.get('b') is None
+
+        cache.invalidate_user(1)
+        assert len(cache) == 0
+
+
+class TestCurrentUser:
+    """get_current_user 與快取失效測試"""
+
+    def test_cached_request_skips_session_query(self, app, statements):
+        """測試快取命中時只以主鍵載入用戶，且同一個請求只解析一次"""
+        client = login(app, 'admin')
+
+        statements.clear()
+        response = client.get('/api/profile')
+        assert response.status_code == 200
+        assert json.loads(response.data)['same'] is True
+        assert len(statements) == 2  # 會話（含用戶狀態）與用戶各一次
+
+        statements.clear()
+        assert client.get('/api/profile').status_code == 200
+        assert len(statements) == 1
+        assert 'user_sessions' not in statements[0]
+
+    def test_logout_invalidates_session(self, app):
+        """測試登出後舊的會話 cookie 立即失效"""
+        client = login(app, 'admin')
+        assert client.get('/api/auth/current-user').status_code == 200
+        cookie = client.get_cookie('session').value
+
+        client.post('/api/auth/logout')
+        client.set_cookie('session', cookie)
+        assert client.get('/api/auth/current-user').status_code == 401
+
+    def test_delete_user_invalidates_sessions(self, app):
+        """測試停用用戶後該用戶的會話立即失效"""
+        admin = login(app, 'admin')
+        sales = login(app, 'sales')
+        assert sales.get('/api/profile').status_code == 200
+
+        sales_id = user_id(app, 'sales')
+        assert admin.delete(f'/api/auth/users/{sales_id}').status_code == 200
+        assert sales.get('/api/profile').status_code == 401
+
+    def test_role_change_takes_effect(self, app):
+        """測試修改角色後權限立即更新"""
+        admin = login(app, 'admin')
+        sales = login(app, 'sales')
+        assert sales.get('/api/auth/users').status_code == 403
+
+        sales_id = user_id(app, 'sales')
+        response = admin.put(f'/api/auth/users/{sales_id}',
+                             data=json.dumps({'role': 'admin'}),
+                             content_type='application/json')
+        assert response.status_code == 200
+        assert sales.get('/api/auth/users').status_code == 200
+
+    def test_password_change_clears_cached_sessions(self, app):
+        """測試修改密碼後清除該用戶的快取"""
+        client = login(app, 'sales')
+        client.get('/api/profile')
+        assert len(session_cache) == 1
+
+        response = client.post('/api/auth/change-password',
+                               data=json.dumps({'old_password': 'password123', 'new_password': 'new-password'}),
+                               content_type='application/json')
+        assert response.status_code == 200
+        assert len(session_cache) == 0
+        assert client.get('/api/profile').status_code == 200
@@ -0,0 +1,99 @@
+"""
+過期會話清理測試
+"""
+import pytest
+import json
+from datetime import datetime, timedelta
+from src.models.user import db
+from src.models.auth_user import AuthUser, RevokedSessionToken, UserSession
+from src.routes.auth import auth_bp
+from src.services.session_sweeper import SessionSweeper, init_session_sweeper
+
+
+@pytest.fixture
+def blueprints():
+    return [(auth_bp, '/api/auth')]
+
+
+@pytest.fixture
+def app_config():
+    return {'SESSION_SWEEP_INTERVAL': 0, 'SESSION_RETENTION_DAYS': 7}
+
+
+@pytest.fixture
+def use_migrations():
+    return True
+
+
+@pytest.fixture
+def app(app):
+    """寫入各種狀態的會話"""
+    user = AuthUser(username='admin', email='admin@example.com', full_name='管理員', role='admin')
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+
+    now = datetime.utcnow()
+    rows = []
+    # 超過保留期限（含已登出的）、保留期限內、仍有效
+    for i in range(250):
+        rows.append({'expires_at': now - timedelta(days=30), 'is_active': i % 2 == 0})
+    for i in range(30):
+        rows.append({'expires_at': now - timedelta(days=1), 'is_active': False})
+    for i in range(20):
+        rows.append({'expires_at': now + timedelta(hours=12), 'is_active': True})
+    db.session.execute(UserSession.__table__.insert(), [
+        dict(row, user_id=user.id, session_token=f'token-{i}', created_at=row['expires_at'] - timedelta(days=1))
+        for i, row in enumerate(rows)
+    ])
+    db.session.add(RevokedSessionToken(jti='expired', user_id=user.id, expires_at=now - timedelta(minutes=1)))
+    db.session.add(RevokedSessionToken(jti='current', user_id=user.id, expires_at=now + timedelta(hours=1)))
+    db.session.commit()
+    return app
+
+
+class TestSessionSweeper:
+    """會話清理測試"""
+
+    def test_sweep_deletes_in_batches(self, app):
+        """測試分批刪除超過保留期限的會話，保留期限內的會話保留"""
+        sweeper = init_session_sweeper(app, db)
+        sweeper.batch_size = 100
+        sweeper.batch_pause = 0
+
+        assert sweeper.sweep_once() == {'sessions': 250, 'tokens': 1}
+        assert UserSession.query.count() == 50
+        assert [t.jti for t in RevokedSessionToken.query] == ['current']
+        assert sweeper.sweep_once() == {'sessions': 0, 'tokens': 0}
+
+        metrics = sweeper.metrics()
+        assert metrics['runs'] == 2
+        assert metrics['purged_sessions'] == 250
+        assert metrics['table_rows'] == 50
+        assert metrics['active_sessions'] == 20
+        assert metrics['retention_days'] == 7
+
+    def test_max_batches_bounds_each_run(self, app):
+        """測試每次清理最多刪除 max_batches 批，其餘留待下次"""
+        sweeper = SessionSweeper(db.engine, batch_size=50, batch_pause=0, max_batches=2, interval=0)
+
+        assert sweeper.sweep_once()['sessions'] == 100
+        assert sweeper.sweep_once()['sessions'] == 100
+        assert sweeper.sweep_once()['sessions'] == 50
+
+    def test_retention_window(self, app):
+        """測試保留期限可調整"""
+        sweeper = SessionSweeper(db.engine, retention=timedelta(0), batch_pause=0, interval=0)
+
+        assert sweeper.sweep_once()['sessions'] == 280
+
+    def test_metrics_endpoint(self, app):
+        """測試管理員可查詢會話統計"""
+        client = app.test_client()
+        client.post('/api/auth/login',
+                    data=json.dumps({'username': 'admin', 'password': 'password123'}),
+                    content_type='application/json')
+        response = client.get('/api/auth/sessions/metrics')
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['table_rows'] == 301
@@ -0,0 +1,158 @@
+"""
+簽章登入令牌測試（AUTH_SESSION_MODE = 'token'）
+"""
+import pytest
+import json
+import time
+from flask import jsonify
+from sqlalchemy import event
+from src.models.user import db
+from src.models.auth_user import AuthUser, UserSession
+from src.routes.auth import auth_bp, get_current_user, require_permission
+from src.services.session_tokens import SessionTokenManager, get_session_tokens
+
+
+@pytest.fixture
+def blueprints():
+    return [(auth_bp, '/api/auth')]
+
+
+@pytest.fixture
+def app_config():
+    return {'AUTH_SESSION_MODE': 'token'}
+
+
+@pytest.fixture
+def push_app_context():
+    return False
+
+
+@pytest.fixture
+def app(app):
+    """加入需要權限的測試路由並寫入用戶"""
+    @app.route('/api/role')
+    @require_permission('customer_management')
+    def role():
+        return jsonify({'ok': True})
+
+    @app.route('/api/profile')
+    @require_permission('customer_management')
+    def profile():
+        return jsonify({'id': get_current_user().id})
+
+    with app.app_context():
+        for username, role_name in (('admin', 'admin'), ('sales', 'sales')):
+            user = AuthUser(username=username, email=f'{username}@example.com', full_name=username, role=role_name)
+            user.set_password('password123')
+            db.session.add(user)
+        db.session.commit()
+    return app
+
+
+def login(app, username, password='password123'):
+    client = app.test_client()
+    response = client.post('/api/auth/login',
+                           data=json.dumps({'username': username, 'password': password}),
+                           content_type='application/json')
+    assert response.status_code == 200
+    return client, json.loads(response.data)['token']
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+class TestSessionTokens:
+    """簽章令牌測試"""
+
+    def test_login_does_not_write_sessions(self, app):
+        """測試登入不寫入 user_sessions，驗證不查詢資料庫"""
+        client, token = login(app, 'sales')
+        assert client.get('/api/role').status_code == 200
+
+        statements = []
+        with app.app_context():
+            assert UserSession.query.count() == 0
+            engine = db.engine
+        record = lambda *args: statements.append(args[2])
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            assert client.get('/api/role').status_code == 200
+            assert app.test_client().get('/api/role', headers=bearer(token)).status_code == 200
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        assert statements == []
+
+    def test_invalid_tokens_rejected(self, app, monkeypatch):
+        """測試竄改、其他金鑰簽發或過期的令牌無效"""
+        client, token = login(app, 'admin')
+        with app.app_context():
+            user = AuthUser.query.filter_by(username='admin').one()
+            other = SessionTokenManager('other-secret').issue(user)[0]
+            real_time = time.time
+            monkeypatch.setattr(time, 'time', lambda: real_time() - 25 * 3600)
+            expired = get_session_tokens(app).issue(user)[0]
+            monkeypatch.undo()
+
+        for bad in (token[:-2] + 'xx', other, expired):
+            assert app.test_client().get('/api/role', headers=bearer(bad)).status_code == 401
+
+    def test_logout_revokes_token_in_all_processes(self, app):
+        """測試登出後令牌失效，其他程序重新載入後也失效"""
+        client, token = login(app, 'admin')
+        other_process = SessionTokenManager(app.config['SECRET_KEY'])
+        with app.app_context():
+            assert other_process.verify(token).role == 'admin'
+
+        client.post('/api/auth/logout', headers=bearer(token))
+        assert app.test_client().get('/api/role', headers=bearer(token)).status_code == 401
+        with app.app_context():
+            other_process.refresh()
+            assert other_process.verify(token) is None
+
+    def test_deactivated_user_tokens_revoked(self, app):
+        """測試停用用戶後該用戶的所有令牌失效"""
+        admin, _ = login(app, 'admin')
+        sales, token = login(app, 'sales')
+        with app.app_context():
+            sales_id = AuthUser.query.filter_by(username='sales').one().id
+
+        assert admin.delete(f'/api/auth/users/{sales_id}').status_code == 200
+        assert sales.get('/api/role').status_code == 401
+        assert app.test_client().get('/api/role', headers=bearer(token)).status_code == 401
+
+    def test_password_change_reissues_token(self, app):
+        """測試修改密碼後舊令牌失效，目前的裝置取得新令牌"""
+        client, old_token = login(app, 'sales')
+        _, other_device = login(app, 'sales')
+
+        response = client.post('/api/auth/change-password',
+                               data=json.dumps({'old_password': 'password123', 'new_password': 'new-password'}),
+                               content_type='application/json')
+        assert response.status_code == 200
+        new_token = json.loads(response.data)['token']
+
+        assert client.get('/api/profile').status_code == 200
+        assert app.test_client().get('/api/role', headers=bearer(new_token)).status_code == 200
+        for token in (old_token, other_device):
+            assert app.test_client().get('/api/role', headers=bearer(token)).status_code == 401
+
+    def test_refresh_keeps_newer_generation(self, app):
+        """測試重新載入的資料庫快照較舊時，不會還原已遞增的世代"""
+        manager = SessionTokenManager(app.config['SECRET_KEY'])
+        with app.app_context():
+            user = AuthUser.query.filter_by(username='sales').one()
+            token = manager.issue(user)[0]
+            assert manager.verify(token) is not None
+
+            # 本程序記錄新世代時，其他程序的重新載入讀到的仍是提交前的資料
+            manager.set_generation(user.id, user.session_generation + 1)
+            manager.refresh()
+            assert manager.verify(token) is None
+
+            # 資料庫的世代較新（其他程序停用後重新啟用）時採用資料庫的值
+            user.session_generation += 2
+            db.session.commit()
+            manager.refresh()
+            assert manager.verify(manager.issue(user)[0]) is not None
+            assert manager.verify(token) is None
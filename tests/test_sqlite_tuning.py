@@ -0,0 +1,71 @@
+"""
+SQLite 連線設定測試
+"""
+import pytest
+from flask import Flask
+from sqlalchemy import text
+from src.models.user import db
+from src.services.sqlite_tuning import init_sqlite
+
+
+@pytest.fixture
+def app(tmp_path):
+    """建立使用檔案資料庫的應用程式"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp_path / "app.db"}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLITE_CHECKPOINT_INTERVAL'] = 3600
+    app.config['SQLITE_PRAGMAS'] = {'busy_timeout': 2500, 'mmap_size': None}
+    db.init_app(app)
+    yield app
+    maintenance = app.extensions.get('sqlite_maintenance')
+    if maintenance is not None:
+        maintenance.stop()
+    with app.app_context():
+        db.engine.dispose()
+
+
+def pragma(name):
+    return db.session.execute(text(f'PRAGMA {name}')).scalar()
+
+
+class TestSQLiteTuning:
+    """PRAGMA 設定測試"""
+
+    def test_pragmas_applied_to_connections(self, app):
+        """測試每條連線都套用設定，且可由設定覆寫或停用"""
+        init_sqlite(app, db)
+
+        with app.app_context():
+            assert pragma('journal_mode') == 'wal'
+            assert pragma('synchronous') == 1  # NORMAL
+            assert pragma('temp_store') == 2  # MEMORY
+            assert pragma('cache_size') == -65536
+            assert pragma('busy_timeout') == 2500
+            assert pragma('mmap_size') == 0
+
+    def test_maintenance_checkpoints_wal(self, app):
+        """測試定期維護執行 WAL checkpoint"""
+        maintenance = init_sqlite(app, db)
+
+        with app.app_context():
+            db.session.execute(text('CREATE TABLE t (id INTEGER PRIMARY KEY)'))
+            db.session.execute(text('INSERT INTO t VALUES (1)'))
+            db.session.commit()
+            db.session.remove()
+
+            busy, log_pages, checkpointed = maintenance.checkpoint()
+            assert busy == 0
+            assert log_pages == checkpointed
+            maintenance.optimize()
+
+    def test_memory_database_skips_maintenance(self):
+        """測試記憶體資料庫不啟動維護執行緒"""
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        db.init_app(app)
+
+        assert init_sqlite(app, db) is None
+        with app.app_context():
+            assert pragma('synchronous') == 1
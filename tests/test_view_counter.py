@@ -0,0 +1,100 @@
+"""
+名片瀏覽次數寫回緩衝測試
+"""
+import pytest
+from sqlalchemy import event
+from src.models.user import db
+from src.models.customer import Customer
+from src.models.published_card import PublishedCard, view_counter
+from src.routes.card_display import card_display_bp
+
+
+@pytest.fixture
+def blueprints():
+    return [(card_display_bp, None)]
+
+
+@pytest.fixture
+def app_config():
+    return {'VIEW_COUNT_FLUSH_INTERVAL': 3600, 'VIEW_COUNT_FLUSH_THRESHOLD': 1000}
+
+
+@pytest.fixture
+def app(app):
+    """寫入一張已有 10 次瀏覽的名片"""
+    customer = Customer(name='鍾師富', company='詠順工程行')
+    db.session.add(customer)
+    db.session.flush()
+    db.session.add(PublishedCard(
+        customer_id=customer.id,
+        card_id='abc12345',
+        title='鍾師富的電子名片',
+        card_data='{}',
+        share_url='http://localhost/card/abc12345',
+        view_count=10
+    ))
+    db.session.commit()
+    yield app
+    view_counter.flush()
+
+
+def persisted_count():
+    db.session.expire_all()
+    return PublishedCard.query.filter_by(card_id='abc12345').first().view_count
+
+
+class TestViewCounter:
+    """瀏覽次數緩衝測試"""
+
+    def test_views_are_buffered(self, app):
+        """測試瀏覽不會立即寫入資料庫，但回傳的次數包含緩衝次數"""
+        client = app.test_client()
+        for _ in range(3):
+            assert client.get('/card/abc12345').status_code == 200
+        response = client.get('/card/abc12345/view')
+
+        assert response.status_code == 200
+        assert response.get_json()['view_count'] == 13
+        assert persisted_count() == 10
+        assert view_counter.pending('abc12345') == 3
+
+    def test_flush_uses_single_update(self, app):
+        """測試寫回只執行一次批次 UPDATE"""
+        client = app.test_client()
+        for _ in range(5):
+            client.get('/card/abc12345')
+        view_counter.increment('missing-card')
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            view_counter.flush()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        assert len([s for s in statements if s.startswith('UPDATE')]) == 1
+        assert persisted_count() == 15
+        assert view_counter.pending('abc12345') == 0
+
+    def test_threshold_triggers_flush(self, app):
+        """測試累積達門檻時自動寫回"""
+        app.config['VIEW_COUNT_FLUSH_THRESHOLD'] = 2
+        client = app.test_client()
+        client.get('/card/abc12345')
+        assert persisted_count() == 10
+
+        client.get('/card/abc12345')
+        assert persisted_count() == 12
+
+    def test_failed_flush_keeps_counts(self, app, monkeypatch):
+        """測試寫回失敗時次數保留在緩衝"""
+        view_counter.increment('abc12345', 4)
+
+        def fail(statement, params):
+            raise RuntimeError('database is locked')
+        monkeypatch.setattr(view_counter, '_execute', fail)
+
+        with pytest.raises(RuntimeError):
+            view_counter.flush()
+        assert view_counter.pending('abc12345') == 4